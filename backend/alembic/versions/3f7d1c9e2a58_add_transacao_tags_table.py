@@ -0,0 +1,90 @@
+"""add transacao_tags table
+
+Revision ID: 3f7d1c9e2a58
+Revises: ea5baa68cfbb
+Create Date: 2026-10-19 10:05:00.000000
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "3f7d1c9e2a58"
+down_revision = "ea5baa68cfbb"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+TAG_SEPARADORES = re.compile(r"[,;#]")
+
+
+def _normalize_text(value: str) -> str:
+    normalized = unicodedata.normalize("NFKD", value)
+    ascii_only = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return ascii_only.strip().lower()
+
+
+def _parse_tags(tags: str | None) -> list[str]:
+    if not tags:
+        return []
+    resultado: list[str] = []
+    for parte in TAG_SEPARADORES.split(tags):
+        tag = " ".join(_normalize_text(parte).split())[:100]
+        if tag and tag not in resultado:
+            resultado.append(tag)
+    return resultado
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transacao_tags",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("transacao_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("tag", sa.String(length=100), nullable=False),
+        sa.ForeignKeyConstraint(["transacao_id"], ["transacoes.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("transacao_id", "tag", name="uq_transacao_tags_transacao_tag"),
+    )
+    op.create_index(op.f("ix_transacao_tags_id"), "transacao_tags", ["id"], unique=False)
+    op.create_index(op.f("ix_transacao_tags_transacao_id"), "transacao_tags", ["transacao_id"], unique=False)
+    op.create_index("ix_transacao_tags_user_tag", "transacao_tags", ["user_id", "tag"], unique=False)
+
+    # Backfill em lotes a partir do texto livre existente.
+    bind = op.get_bind()
+    ultimo_id = 0
+    while True:
+        linhas = bind.execute(
+            sa.text(
+                "SELECT id, user_id, tags FROM transacoes "
+                "WHERE id > :ultimo_id AND tags IS NOT NULL AND tags <> '' ORDER BY id LIMIT :limite"
+            ),
+            {"ultimo_id": ultimo_id, "limite": BATCH_SIZE},
+        ).fetchall()
+        if not linhas:
+            break
+        registros = [
+            {"transacao_id": linha.id, "user_id": linha.user_id, "tag": tag}
+            for linha in linhas
+            for tag in _parse_tags(linha.tags)
+        ]
+        if registros:
+            bind.execute(
+                sa.text(
+                    "INSERT INTO transacao_tags (transacao_id, user_id, tag) "
+                    "VALUES (:transacao_id, :user_id, :tag)"
+                ),
+                registros,
+            )
+        ultimo_id = linhas[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transacao_tags_user_tag", table_name="transacao_tags")
+    op.drop_index(op.f("ix_transacao_tags_transacao_id"), table_name="transacao_tags")
+    op.drop_index(op.f("ix_transacao_tags_id"), table_name="transacao_tags")
+    op.drop_table("transacao_tags")
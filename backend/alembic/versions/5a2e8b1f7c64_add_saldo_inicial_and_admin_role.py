@@ -0,0 +1,56 @@
+"""add saldo_inicial to contas and admin role
+
+Revision ID: 5a2e8b1f7c64
+Revises: c81e4a7d2b03
+Create Date: 2026-10-19 11:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "5a2e8b1f7c64"
+down_revision = "c81e4a7d2b03"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TYPE userrole ADD VALUE IF NOT EXISTS 'ADMIN'")
+
+    op.add_column("contas", sa.Column("saldo_inicial", sa.Float(), nullable=False, server_default="0"))
+    # Considera o saldo atual correto: saldo_inicial = saldo - impacto das transacoes liquidadas.
+    op.execute(
+        """
+        UPDATE contas c
+        SET saldo_inicial = COALESCE(c.saldo, 0) - COALESCE(t.impacto, 0)
+        FROM (
+            SELECT conta_id,
+                   SUM(
+                       CASE WHEN tipo = 'ENTRADA' THEN 1 ELSE -1 END
+                       * GREATEST(valor + valor_multa + valor_juros - valor_desconto, 0)
+                   ) AS impacto
+            FROM transacoes
+            WHERE status_liquidacao = 'LIQUIDADO'
+            GROUP BY conta_id
+        ) t
+        WHERE t.conta_id = c.id AND c.tipo <> 'CARTAO_CREDITO'
+        """
+    )
+    op.execute("UPDATE contas SET saldo_inicial = COALESCE(saldo, 0) WHERE tipo = 'CARTAO_CREDITO'")
+    op.execute(
+        """
+        UPDATE contas SET saldo_inicial = COALESCE(saldo, 0)
+        WHERE tipo <> 'CARTAO_CREDITO'
+          AND NOT EXISTS (
+              SELECT 1 FROM transacoes t
+              WHERE t.conta_id = contas.id AND t.status_liquidacao = 'LIQUIDADO'
+          )
+        """
+    )
+    op.alter_column("contas", "saldo_inicial", server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column("contas", "saldo_inicial")
+    # PostgreSQL nao permite remover valor de ENUM com seguranca sem recriar o tipo.
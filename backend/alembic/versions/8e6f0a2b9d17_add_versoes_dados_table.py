@@ -0,0 +1,35 @@
+"""add versoes_dados table
+
+Revision ID: 8e6f0a2b9d17
+Revises: d47b3e9a1f25
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "8e6f0a2b9d17"
+down_revision = "d47b3e9a1f25"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "versoes_dados",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("ano", sa.Integer(), nullable=False),
+        sa.Column("mes", sa.Integer(), nullable=False),
+        sa.Column("versao", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "ano", "mes", name="uq_versoes_dados_user_periodo"),
+    )
+    op.create_index(op.f("ix_versoes_dados_id"), "versoes_dados", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_versoes_dados_id"), table_name="versoes_dados")
+    op.drop_table("versoes_dados")
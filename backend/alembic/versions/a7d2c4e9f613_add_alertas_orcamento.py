@@ -0,0 +1,67 @@
+"""add alertas_orcamento and recompute orcamentos.valor_gasto
+
+Revision ID: a7d2c4e9f613
+Revises: e2b6a9d3c158
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a7d2c4e9f613"
+down_revision = "e2b6a9d3c158"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "alertas_orcamento",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("orcamento_id", sa.Integer(), nullable=False),
+        sa.Column("categoria_id", sa.Integer(), nullable=False),
+        sa.Column("mes", sa.Integer(), nullable=False),
+        sa.Column("ano", sa.Integer(), nullable=False),
+        sa.Column("limiar", sa.Integer(), nullable=False),
+        sa.Column("percentual", sa.Float(), nullable=False),
+        sa.Column("valor_gasto", sa.Numeric(14, 2), nullable=False),
+        sa.Column("valor_planejado", sa.Numeric(14, 2), nullable=False),
+        sa.Column("lido", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["orcamento_id"], ["orcamentos.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["categoria_id"], ["categorias.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_alertas_orcamento_id"), "alertas_orcamento", ["id"], unique=False)
+    op.create_index(op.f("ix_alertas_orcamento_orcamento_id"), "alertas_orcamento", ["orcamento_id"], unique=False)
+    op.create_index("ix_alertas_orcamento_user_id_id", "alertas_orcamento", ["user_id", "id"], unique=False)
+    op.alter_column("alertas_orcamento", "lido", server_default=None)
+
+    # valor_gasto passa a ser mantido por variacao: parte do valor correto de cada mes.
+    op.execute(
+        """
+        UPDATE orcamentos SET valor_gasto = COALESCE((
+            SELECT SUM(GREATEST(
+                t.valor + COALESCE(t.valor_multa, 0) + COALESCE(t.valor_juros, 0) - COALESCE(t.valor_desconto, 0),
+                0
+            ))
+            FROM transacoes t
+            WHERE t.user_id = orcamentos.user_id
+              AND t.categoria_id = orcamentos.categoria_id
+              AND t.tipo = 'SAIDA'
+              AND t.status_liquidacao <> 'CANCELADO'
+              AND EXTRACT(YEAR FROM t.data) = orcamentos.ano
+              AND EXTRACT(MONTH FROM t.data) = orcamentos.mes
+        ), 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_alertas_orcamento_user_id_id", table_name="alertas_orcamento")
+    op.drop_index(op.f("ix_alertas_orcamento_orcamento_id"), table_name="alertas_orcamento")
+    op.drop_index(op.f("ix_alertas_orcamento_id"), table_name="alertas_orcamento")
+    op.drop_table("alertas_orcamento")
@@ -0,0 +1,63 @@
+"""add updated_at columns and registros_excluidos for incremental sync
+
+Revision ID: b5c9e2d4a716
+Revises: 8e6f0a2b9d17
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b5c9e2d4a716"
+down_revision = "8e6f0a2b9d17"
+branch_labels = None
+depends_on = None
+
+TABELAS_NOVO_UPDATED_AT = ("contas", "categorias", "metas", "orcamentos")
+
+
+def upgrade() -> None:
+    for tabela in TABELAS_NOVO_UPDATED_AT:
+        op.add_column(
+            tabela,
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        )
+        op.execute(f"UPDATE {tabela} SET updated_at = coalesce(created_at, now())")
+
+    op.alter_column("transacoes", "updated_at", server_default=sa.text("now()"))
+    op.execute("UPDATE transacoes SET updated_at = coalesce(created_at, now()) WHERE updated_at IS NULL")
+
+    for tabela in (*TABELAS_NOVO_UPDATED_AT, "transacoes"):
+        op.create_index(f"ix_{tabela}_user_updated_at", tabela, ["user_id", "updated_at"], unique=False)
+
+    op.create_table(
+        "registros_excluidos",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("tabela", sa.String(length=30), nullable=False),
+        sa.Column("registro_id", sa.Integer(), nullable=False),
+        sa.Column("excluido_em", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_registros_excluidos_id"), "registros_excluidos", ["id"], unique=False)
+    op.create_index(
+        "ix_registros_excluidos_user_excluido_em",
+        "registros_excluidos",
+        ["user_id", "excluido_em"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_registros_excluidos_user_excluido_em", table_name="registros_excluidos")
+    op.drop_index(op.f("ix_registros_excluidos_id"), table_name="registros_excluidos")
+    op.drop_table("registros_excluidos")
+
+    for tabela in (*TABELAS_NOVO_UPDATED_AT, "transacoes"):
+        op.drop_index(f"ix_{tabela}_user_updated_at", table_name=tabela)
+
+    op.alter_column("transacoes", "updated_at", server_default=None)
+    for tabela in TABELAS_NOVO_UPDATED_AT:
+        op.drop_column(tabela, "updated_at")
@@ -0,0 +1,22 @@
+"""add categorias (user_id, tipo) index
+
+Revision ID: c3a8f5e1b942
+Revises: b5c9e2d4a716
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = "c3a8f5e1b942"
+down_revision = "b5c9e2d4a716"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_categorias_user_tipo", "categorias", ["user_id", "tipo"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_categorias_user_tipo", table_name="categorias")
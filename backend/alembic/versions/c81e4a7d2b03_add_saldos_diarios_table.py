@@ -0,0 +1,89 @@
+"""add saldos_diarios table
+
+Revision ID: c81e4a7d2b03
+Revises: 3f7d1c9e2a58
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from datetime import date, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "c81e4a7d2b03"
+down_revision = "3f7d1c9e2a58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "saldos_diarios",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("conta_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("data", sa.Date(), nullable=False),
+        sa.Column("variacao", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["conta_id"], ["contas.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("conta_id", "data", name="uq_saldos_diarios_conta_data"),
+    )
+    op.create_index(op.f("ix_saldos_diarios_id"), "saldos_diarios", ["id"], unique=False)
+
+    # Variacoes historicas: transacoes liquidadas agrupadas por conta e dia de liquidacao.
+    # Cartao de credito nao movimenta saldo (a fatura e paga pela conta de pagamento).
+    op.execute(
+        """
+        INSERT INTO saldos_diarios (conta_id, user_id, data, variacao)
+        SELECT t.conta_id, c.user_id, COALESCE(t.data_liquidacao, t.data),
+               SUM(
+                   CASE WHEN t.tipo = 'ENTRADA' THEN 1 ELSE -1 END
+                   * GREATEST(t.valor + t.valor_multa + t.valor_juros - t.valor_desconto, 0)
+               )
+        FROM transacoes t
+        JOIN contas c ON c.id = t.conta_id
+        WHERE t.status_liquidacao = 'LIQUIDADO' AND c.tipo <> 'CARTAO_CREDITO'
+        GROUP BY t.conta_id, c.user_id, COALESCE(t.data_liquidacao, t.data)
+        """
+    )
+
+    # Saldo de abertura: diferenca entre o saldo atual e as variacoes conhecidas,
+    # lancada antes do primeiro movimento para que o historico feche com Conta.saldo.
+    bind = op.get_bind()
+    contas = bind.execute(
+        sa.text(
+            """
+            SELECT c.id, c.user_id, COALESCE(c.saldo, 0) AS saldo, CAST(c.created_at AS DATE) AS criada_em,
+                   COALESCE(SUM(s.variacao), 0) AS total, MIN(s.data) AS primeira_data
+            FROM contas c
+            LEFT JOIN saldos_diarios s ON s.conta_id = c.id
+            GROUP BY c.id, c.user_id, c.saldo, c.created_at
+            """
+        )
+    ).fetchall()
+    aberturas = []
+    for conta in contas:
+        ajuste = round(conta.saldo - conta.total, 2)
+        if not ajuste:
+            continue
+        data_abertura = conta.criada_em
+        if conta.primeira_data is not None and (data_abertura is None or data_abertura >= conta.primeira_data):
+            data_abertura = conta.primeira_data - timedelta(days=1)
+        if data_abertura is None:
+            data_abertura = date.today()
+        aberturas.append({"conta_id": conta.id, "user_id": conta.user_id, "data": data_abertura, "variacao": ajuste})
+    if aberturas:
+        bind.execute(
+            sa.text(
+                "INSERT INTO saldos_diarios (conta_id, user_id, data, variacao) "
+                "VALUES (:conta_id, :user_id, :data, :variacao)"
+            ),
+            aberturas,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_saldos_diarios_id"), table_name="saldos_diarios")
+    op.drop_table("saldos_diarios")
@@ -0,0 +1,40 @@
+"""money columns to numeric(14,2)
+
+Revision ID: d47b3e9a1f25
+Revises: 5a2e8b1f7c64
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = "d47b3e9a1f25"
+down_revision = "5a2e8b1f7c64"
+branch_labels = None
+depends_on = None
+
+COLUNAS_MONETARIAS = {
+    "contas": ("saldo", "saldo_inicial", "limite_credito"),
+    "saldos_diarios": ("variacao",),
+    "transacoes": ("valor", "valor_multa", "valor_juros", "valor_desconto"),
+    "metas": ("valor_alvo", "valor_atual"),
+    "orcamentos": ("valor_planejado", "valor_gasto"),
+}
+
+
+def upgrade() -> None:
+    for tabela, colunas in COLUNAS_MONETARIAS.items():
+        alteracoes = ", ".join(
+            f"ALTER COLUMN {coluna} TYPE NUMERIC(14, 2) USING round({coluna}::numeric, 2)"
+            for coluna in colunas
+        )
+        op.execute(f"ALTER TABLE {tabela} {alteracoes}")
+
+
+def downgrade() -> None:
+    for tabela, colunas in COLUNAS_MONETARIAS.items():
+        alteracoes = ", ".join(
+            f"ALTER COLUMN {coluna} TYPE DOUBLE PRECISION USING {coluna}::double precision"
+            for coluna in colunas
+        )
+        op.execute(f"ALTER TABLE {tabela} {alteracoes}")
@@ -0,0 +1,106 @@
+"""add nome_normalizado to categorias with unique (user_id, tipo, nome_normalizado)
+
+Revision ID: d9f4b7c2e816
+Revises: c3a8f5e1b942
+Create Date: 2026-10-19 18:00:00.000000
+
+Categorias de um mesmo usuario cujos nomes so diferem por acento/caixa colidem no
+indice unico. Por padrao a migracao falha listando essas categorias, para o operador
+decidir (renomear ou mesclar a mao). Com `alembic -x categorias_duplicadas=renomear
+upgrade head` a mais antiga fica com o nome, as demais ganham " (2)", " (3)"... e cada
+renomeacao sai no log da migracao.
+
+"""
+import logging
+import unicodedata
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = "d9f4b7c2e816"
+down_revision = "c3a8f5e1b942"
+branch_labels = None
+depends_on = None
+
+TAMANHO_NOME = 100
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _normalize_text(value: str) -> str:
+    normalized = unicodedata.normalize("NFKD", value)
+    ascii_only = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return ascii_only.strip().lower()
+
+
+def _nome_com_sufixo(nome: str, numero: int) -> str:
+    sufixo = f" ({numero})"
+    return nome[: TAMANHO_NOME - len(sufixo)].rstrip() + sufixo
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    linhas = bind.execute(sa.text("SELECT id, user_id, tipo, nome FROM categorias ORDER BY id")).fetchall()
+
+    renomear = context.get_x_argument(as_dictionary=True).get("categorias_duplicadas") == "renomear"
+
+    # Nomes que so diferem por acento/caixa passariam a colidir no indice unico.
+    usados: dict[tuple, object] = {}
+    atualizacoes = []
+    colisoes = []
+    for linha in linhas:
+        nome = linha.nome
+        normalizado = _normalize_text(nome)
+        if linha.user_id is not None:
+            chave = (linha.user_id, linha.tipo, normalizado)
+            if chave in usados:
+                colisoes.append((linha, usados[chave]))
+            numero = 2
+            while (linha.user_id, linha.tipo, normalizado) in usados:
+                nome = _nome_com_sufixo(linha.nome, numero)
+                normalizado = _normalize_text(nome)
+                numero += 1
+            usados[(linha.user_id, linha.tipo, normalizado)] = linha
+        atualizacoes.append({"id": linha.id, "nome": nome, "nome_normalizado": normalizado})
+
+    if colisoes and not renomear:
+        detalhes = "\n".join(
+            f"  categoria {linha.id} {linha.nome!r} (usuario {linha.user_id}, {linha.tipo}) "
+            f"colide com a categoria {original.id} {original.nome!r}"
+            for linha, original in colisoes
+        )
+        raise RuntimeError(
+            f"{len(colisoes)} categoria(s) com nome duplicado apos normalizacao:\n{detalhes}\n"
+            "Renomeie ou mescle essas categorias e rode a migracao de novo, ou use "
+            "`alembic -x categorias_duplicadas=renomear upgrade head` para acrescentar um sufixo numerico."
+        )
+    novos_nomes = {a["id"]: a["nome"] for a in atualizacoes}
+    for linha, _ in colisoes:
+        logger.warning(
+            "categoria %s (usuario %s, %s) renomeada de %r para %r",
+            linha.id, linha.user_id, linha.tipo, linha.nome, novos_nomes[linha.id],
+        )
+
+    op.add_column("categorias", sa.Column("nome_normalizado", sa.String(length=100), nullable=True))
+
+    if atualizacoes:
+        bind.execute(
+            sa.text("UPDATE categorias SET nome = :nome, nome_normalizado = :nome_normalizado WHERE id = :id"),
+            atualizacoes,
+        )
+
+    op.alter_column("categorias", "nome_normalizado", nullable=False)
+    op.drop_index("ix_categorias_user_tipo", table_name="categorias")
+    op.create_index(
+        "uq_categorias_user_tipo_nome_normalizado",
+        "categorias",
+        ["user_id", "tipo", "nome_normalizado"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_categorias_user_tipo_nome_normalizado", table_name="categorias")
+    op.create_index("ix_categorias_user_tipo", "categorias", ["user_id", "tipo"], unique=False)
+    op.drop_column("categorias", "nome_normalizado")
@@ -0,0 +1,142 @@
+"""add faturas (credit card statement totals)
+
+Revision ID: e2b6a9d3c158
+Revises: d9f4b7c2e816
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from calendar import monthrange
+from datetime import date, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "e2b6a9d3c158"
+down_revision = "d9f4b7c2e816"
+branch_labels = None
+depends_on = None
+
+
+def _safe_date_with_day(year: int, month: int, day: int) -> date:
+    return date(year, month, min(day, monthrange(year, month)[1]))
+
+
+def _shift_month(base: date, months: int) -> date:
+    month_index = (base.month - 1) + months
+    return date(base.year + (month_index // 12), (month_index % 12) + 1, 1)
+
+
+def _fechamento_da_data(data: date, dia_fechamento: int) -> date:
+    fechamento = _safe_date_with_day(data.year, data.month, dia_fechamento)
+    if data <= fechamento:
+        return fechamento
+    proximo_mes = _shift_month(data, 1)
+    return _safe_date_with_day(proximo_mes.year, proximo_mes.month, dia_fechamento)
+
+
+def _vencimento(periodo_fim: date, dia_vencimento: int) -> date:
+    if dia_vencimento > periodo_fim.day:
+        return _safe_date_with_day(periodo_fim.year, periodo_fim.month, dia_vencimento)
+    proximo_mes = _shift_month(periodo_fim, 1)
+    return _safe_date_with_day(proximo_mes.year, proximo_mes.month, dia_vencimento)
+
+
+def _centavos(valor) -> int:
+    return int(round(float(valor or 0) * 100))
+
+
+def upgrade() -> None:
+    op.create_table(
+        "faturas",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("conta_id", sa.Integer(), nullable=False),
+        sa.Column("periodo_inicio", sa.Date(), nullable=False),
+        sa.Column("periodo_fim", sa.Date(), nullable=False),
+        sa.Column("data_vencimento", sa.Date(), nullable=False),
+        sa.Column("quantidade_itens", sa.Integer(), nullable=False),
+        sa.Column("itens_em_aberto", sa.Integer(), nullable=False),
+        sa.Column("valor_total", sa.Numeric(14, 2), nullable=False),
+        sa.Column("valor_em_aberto", sa.Numeric(14, 2), nullable=False),
+        sa.Column("valor_pago", sa.Numeric(14, 2), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["conta_id"], ["contas.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("conta_id", "periodo_fim", name="uq_faturas_conta_periodo_fim"),
+    )
+    op.create_index(op.f("ix_faturas_id"), "faturas", ["id"], unique=False)
+
+    bind = op.get_bind()
+    cartoes = bind.execute(
+        sa.text(
+            "SELECT id, user_id, dia_fechamento, dia_vencimento FROM contas "
+            "WHERE tipo = 'CARTAO_CREDITO' AND dia_fechamento IS NOT NULL AND dia_vencimento IS NOT NULL"
+        )
+    ).fetchall()
+
+    faturas = []
+    for cartao in cartoes:
+        itens = bind.execute(
+            sa.text(
+                "SELECT data, status_liquidacao, valor, valor_multa, valor_juros, valor_desconto "
+                "FROM transacoes WHERE conta_id = :conta_id AND tipo = 'SAIDA' "
+                "AND status_liquidacao <> 'CANCELADO' ORDER BY data, id"
+            ),
+            {"conta_id": cartao.id},
+        ).fetchall()
+
+        por_fechamento: dict[date, dict] = {}
+        for item in itens:
+            fechamento = _fechamento_da_data(item.data, cartao.dia_fechamento)
+            acumulado = por_fechamento.setdefault(
+                fechamento, {"quantidade": 0, "em_aberto": 0, "total": 0, "aberto": 0, "pago": 0}
+            )
+            centavos = max(
+                0,
+                _centavos(item.valor)
+                + _centavos(item.valor_multa)
+                + _centavos(item.valor_juros)
+                - _centavos(item.valor_desconto),
+            )
+            acumulado["quantidade"] += 1
+            acumulado["total"] += centavos
+            if item.status_liquidacao in ("PREVISTO", "ATRASADO"):
+                acumulado["em_aberto"] += 1
+                acumulado["aberto"] += centavos
+            elif item.status_liquidacao == "LIQUIDADO":
+                acumulado["pago"] += centavos
+
+        for fechamento, acumulado in por_fechamento.items():
+            mes_antes = _shift_month(fechamento, -1)
+            fechamento_anterior = _safe_date_with_day(mes_antes.year, mes_antes.month, cartao.dia_fechamento)
+            faturas.append(
+                {
+                    "user_id": cartao.user_id,
+                    "conta_id": cartao.id,
+                    "periodo_inicio": fechamento_anterior + timedelta(days=1),
+                    "periodo_fim": fechamento,
+                    "data_vencimento": _vencimento(fechamento, cartao.dia_vencimento),
+                    "quantidade_itens": acumulado["quantidade"],
+                    "itens_em_aberto": acumulado["em_aberto"],
+                    "valor_total": acumulado["total"] / 100,
+                    "valor_em_aberto": acumulado["aberto"] / 100,
+                    "valor_pago": acumulado["pago"] / 100,
+                }
+            )
+
+    if faturas:
+        bind.execute(
+            sa.text(
+                "INSERT INTO faturas (user_id, conta_id, periodo_inicio, periodo_fim, data_vencimento, "
+                "quantidade_itens, itens_em_aberto, valor_total, valor_em_aberto, valor_pago) VALUES "
+                "(:user_id, :conta_id, :periodo_inicio, :periodo_fim, :data_vencimento, "
+                ":quantidade_itens, :itens_em_aberto, :valor_total, :valor_em_aberto, :valor_pago)"
+            ),
+            faturas,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_faturas_id"), table_name="faturas")
+    op.drop_table("faturas")
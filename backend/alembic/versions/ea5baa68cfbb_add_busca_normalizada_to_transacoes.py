@@ -0,0 +1,61 @@
+"""add busca_normalizada to transacoes
+
+Revision ID: ea5baa68cfbb
+Revises: b0e2d5a8c4f1
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "ea5baa68cfbb"
+down_revision = "b0e2d5a8c4f1"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _normalize_text(value: str) -> str:
+    normalized = unicodedata.normalize("NFKD", value)
+    ascii_only = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return ascii_only.strip().lower()
+
+
+def upgrade() -> None:
+    op.add_column("transacoes", sa.Column("busca_normalizada", sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    ultimo_id = 0
+    while True:
+        linhas = bind.execute(
+            sa.text(
+                "SELECT id, descricao, observacoes, tags FROM transacoes "
+                "WHERE id > :ultimo_id ORDER BY id LIMIT :limite"
+            ),
+            {"ultimo_id": ultimo_id, "limite": BATCH_SIZE},
+        ).fetchall()
+        if not linhas:
+            break
+        bind.execute(
+            sa.text("UPDATE transacoes SET busca_normalizada = :busca WHERE id = :id"),
+            [
+                {"id": linha.id, "busca": _normalize_text(" ".join(p for p in (linha.descricao, linha.observacoes, linha.tags) if p))}
+                for linha in linhas
+            ],
+        )
+        ultimo_id = linhas[-1].id
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX ix_transacoes_busca_normalizada_trgm "
+        "ON transacoes USING gin (busca_normalizada gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_transacoes_busca_normalizada_trgm")
+    op.drop_column("transacoes", "busca_normalizada")
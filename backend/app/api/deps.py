@@ -1,6 +1,8 @@
+import hashlib
 from dataclasses import dataclass
+from datetime import date
 
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.db.session import get_db
@@ -9,6 +11,9 @@ from app.models.user import User
 from app.models import DelegacaoStatus
 from app.crud.crud_user import get_user_by_email
 from app.crud.crud_delegacao import get_active_delegacao
+from app.crud.crud_versao import obter_versao_usuario
+from app.services.catalogo_categorias import catalogo_categorias
+from app.services.export_cache import etag_corresponde
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
@@ -137,3 +142,47 @@ async def get_access_context(
         delegated=True,
         can_write=delegacao.can_write,
     )
+
+
+def verificar_etag_listagem(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context),
+) -> dict[str, str]:
+    """
+    ETag fraco das listagens, derivado da versao dos dados do usuario (sem serializar o corpo).
+
+    Inclui a rota e a query string (filtros e paginacao) e o dia atual, pois o status
+    "atrasado" das transacoes depende da data. Com `If-None-Match` correspondente
+    responde 304; caso contrario devolve os headers, ja aplicados a `response`.
+    """
+    user_id = access_ctx.effective_user.id
+    return _aplicar_etag(request, response, f"{user_id}-{obter_versao_usuario(db, user_id)}")
+
+
+def verificar_etag_categorias(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context),
+) -> dict[str, str]:
+    """
+    ETag da listagem de categorias: versao do usuario mais a do catalogo de categorias padrao.
+
+    As categorias padrao (`user_id` NULL) nao entram na versao de nenhum usuario; sem a
+    versao do catalogo, um reseed continuaria respondendo 304 com a lista antiga.
+    """
+    user_id = access_ctx.effective_user.id
+    versao = f"{user_id}-{obter_versao_usuario(db, user_id)}-{catalogo_categorias.versao(db)}"
+    return _aplicar_etag(request, response, versao)
+
+
+def _aplicar_etag(request: Request, response: Response, versao: str) -> dict[str, str]:
+    consulta = hashlib.sha256(f"{request.url.path}?{request.url.query}".encode("utf-8")).hexdigest()[:16]
+    etag = f'W/"{versao}-{date.today():%Y%m%d}-{consulta}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_corresponde(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return headers
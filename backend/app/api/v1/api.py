@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, categorias, metas, orcamentos, transacoes, contas, delegacoes, relatorios
+from app.api.v1.endpoints import admin, auth, categorias, metas, orcamentos, transacoes, contas, delegacoes, eventos, exportacoes, relatorios, sync
 
 api_router = APIRouter()
 
@@ -11,3 +11,7 @@ api_router.include_router(orcamentos.router, prefix="/orcamentos", tags=["orcame
 api_router.include_router(transacoes.router, prefix="/transacoes", tags=["transacoes"])
 api_router.include_router(delegacoes.router, prefix="/delegacoes", tags=["delegacoes"])
 api_router.include_router(relatorios.router, prefix="/relatorios", tags=["relatorios"])
+api_router.include_router(exportacoes.router, prefix="/exportacoes", tags=["exportacoes"])
+api_router.include_router(sync.router, prefix="/sync", tags=["sync"])
+api_router.include_router(eventos.router, prefix="/eventos", tags=["eventos"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
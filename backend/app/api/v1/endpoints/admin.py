@@ -0,0 +1,44 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_admin
+from app.crud import crud_reconciliacao
+from app.db.session import get_db
+from app.models import User
+from app.schemas.admin import DivergenciaSaldoResponse, ReconciliacaoSaldosResponse
+
+router = APIRouter()
+
+
+@router.post("/reconciliacao-saldos", response_model=ReconciliacaoSaldosResponse)
+def reconciliar_saldos(
+    corrigir: bool = False,
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin),
+):
+    """
+    Compara `Conta.saldo` com o saldo recalculado a partir das transações liquidadas.
+
+    Com `corrigir=true`, grava o saldo esperado nas contas divergentes (em lotes).
+    """
+    total_contas, divergencias = crud_reconciliacao.calcular_divergencias(db, user_id=user_id)
+    corrigidas = crud_reconciliacao.corrigir_divergencias(db, divergencias) if corrigir else 0
+    return ReconciliacaoSaldosResponse(
+        total_contas=total_contas,
+        total_divergencias=len(divergencias),
+        corrigidas=corrigidas,
+        divergencias=[
+            DivergenciaSaldoResponse(
+                conta_id=d.conta_id,
+                user_id=d.user_id,
+                conta_nome=d.conta_nome,
+                saldo_atual=d.saldo_atual,
+                saldo_esperado=d.saldo_esperado,
+                diferenca=d.diferenca,
+            )
+            for d in divergencias
+        ],
+    )
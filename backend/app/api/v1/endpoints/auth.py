@@ -9,7 +9,7 @@ from app.crud.crud_user import create_user, authenticate_user, get_user_by_email
 from app.core.security import create_access_token
 from app.core.config import settings
 from app.api.deps import get_current_active_user
-from app.models.user import User
+from app.models.user import User, UserRole
 
 router = APIRouter()
 
@@ -25,6 +25,12 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
     
+    if user_in.role != UserRole.USER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Registration of this role is not allowed"
+        )
+
     # Cria usuário
     user = create_user(
         db=db,
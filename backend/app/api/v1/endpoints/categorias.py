@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.session import get_db
-from app.api.deps import AccessContext, get_access_context
+from app.api.deps import AccessContext, get_access_context, verificar_etag_categorias
 from app.schemas.categoria import (
     CategoriaCreate,
     CategoriaUpdate,
@@ -14,7 +14,7 @@ from app.crud import crud_categoria as crud
 
 router = APIRouter()
 
-@router.get("", response_model=List[CategoriaResponse])
+@router.get("", response_model=List[CategoriaResponse], dependencies=[Depends(verificar_etag_categorias)])
 def listar_categorias(
     db: Session = Depends(get_db),
     access_ctx: AccessContext = Depends(get_access_context)
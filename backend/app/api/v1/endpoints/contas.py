@@ -1,76 +1,165 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import date, timedelta
-from calendar import monthrange
-import uuid
 
+from app.core.money import de_centavos, para_centavos, valor_efetivo_centavos
 from app.db.session import get_db
-from app.api.deps import AccessContext, get_access_context
+from app.api.deps import AccessContext, get_access_context, verificar_etag_listagem
 from app.schemas.conta import (
     ContaCreate,
     ContaUpdate,
     ContaResponse,
+    ContaResumoResponse,
+    CartaoResumoResponse,
+    CartoesResumoResponse,
     FaturaResumoResponse,
     FaturaItemResponse,
+    FaturaPeriodoResponse,
+    FaturasResponse,
     PagarFaturaRequest,
+    PagarFaturasRequest,
+    PagamentoFaturasResponse,
+    FaturaPagaResponse,
+    SaldoHistoricoPonto,
+    SaldoHistoricoResponse,
 )
 from app.models import Conta, TipoConta, Transacao, TipoTransacao, StatusLiquidacao
 
 from app.crud import crud_conta as crud
+from app.crud import crud_fatura, crud_saldo
 
 router = APIRouter()
 
 
-def _safe_date_with_day(year: int, month: int, day: int) -> date:
-    return date(year, month, min(day, monthrange(year, month)[1]))
-
-
-def _shift_month(base: date, months: int) -> date:
-    month_index = (base.month - 1) + months
-    year = base.year + (month_index // 12)
-    month = (month_index % 12) + 1
-    return date(year, month, 1)
+def _valor_efetivo(transacao: Transacao) -> float:
+    return de_centavos(
+        valor_efetivo_centavos(transacao.valor, transacao.valor_multa, transacao.valor_juros, transacao.valor_desconto)
+    )
 
+def _obter_cartao(db: Session, conta_id: int, user_id: int) -> Conta:
+    conta = crud.get_conta(db, conta_id, user_id)
+    if not conta:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conta não encontrada")
+    if conta.tipo != TipoConta.CARTAO_CREDITO:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Conta não é cartão de crédito")
+    if conta.dia_fechamento is None or conta.dia_vencimento is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cartão sem fechamento/vencimento configurado")
+    return conta
 
-def _calcular_periodo_fatura(ref_date: date, dia_fechamento: int) -> tuple[date, date]:
-    fechamento_mes_atual = _safe_date_with_day(ref_date.year, ref_date.month, dia_fechamento)
-    if ref_date.day >= fechamento_mes_atual.day:
-        periodo_fim = fechamento_mes_atual
-    else:
-        mes_anterior = _shift_month(ref_date, -1)
-        periodo_fim = _safe_date_with_day(mes_anterior.year, mes_anterior.month, dia_fechamento)
 
-    mes_antes = _shift_month(periodo_fim, -1)
-    fechamento_anterior = _safe_date_with_day(mes_antes.year, mes_antes.month, dia_fechamento)
-    periodo_inicio = fechamento_anterior + timedelta(days=1)
-    return periodo_inicio, periodo_fim
+def _obter_conta_pagamento(db: Session, conta_id: int, user_id: int) -> Conta:
+    conta = crud.get_conta(db, conta_id, user_id)
+    if not conta:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conta de pagamento não encontrada")
+    if conta.tipo == TipoConta.CARTAO_CREDITO:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Pagamento deve sair de conta não cartão")
+    return conta
 
 
-def _calcular_vencimento_fatura(periodo_fim: date, dia_vencimento: int) -> date:
-    if dia_vencimento > periodo_fim.day:
-        return _safe_date_with_day(periodo_fim.year, periodo_fim.month, dia_vencimento)
-    proximo_mes = _shift_month(periodo_fim, 1)
-    return _safe_date_with_day(proximo_mes.year, proximo_mes.month, dia_vencimento)
+def _pagamento_fatura(paga: crud_fatura.FaturaPaga) -> FaturaPagaResponse:
+    """Resultado do pagamento de um cartao, montado das linhas do UPDATE ... RETURNING."""
+    return FaturaPagaResponse(
+        conta_id=paga.conta.id,
+        conta_nome=paga.conta.nome,
+        periodo_inicio=paga.periodo_inicio,
+        periodo_fim=paga.periodo_fim,
+        data_vencimento_fatura=paga.data_vencimento,
+        itens_pagos=paga.quantidade_itens,
+        valor_pago=de_centavos(paga.valor_centavos),
+        itens=[
+            FaturaItemResponse(
+                transacao_id=item.id,
+                descricao=item.descricao,
+                data=item.data,
+                data_vencimento=item.data_vencimento,
+                status_liquidacao=StatusLiquidacao.LIQUIDADO.value,
+                valor=item.valor,
+                valor_multa=item.valor_multa or 0,
+                valor_juros=item.valor_juros or 0,
+                valor_desconto=item.valor_desconto or 0,
+                valor_efetivo=de_centavos(
+                    valor_efetivo_centavos(item.valor, item.valor_multa, item.valor_juros, item.valor_desconto)
+                ),
+            )
+            for item in paga.itens
+        ],
+    )
 
 
-def _valor_efetivo(transacao: Transacao) -> float:
-    return max(
-        0.0,
-        (transacao.valor or 0)
-        + (transacao.valor_multa or 0)
-        + (transacao.valor_juros or 0)
-        - (transacao.valor_desconto or 0),
+def _resposta_pagamento(conta_pagamento: Conta, pagas: List[crud_fatura.FaturaPaga]) -> PagamentoFaturasResponse:
+    return PagamentoFaturasResponse(
+        conta_pagamento_id=conta_pagamento.id,
+        saldo_conta_pagamento=conta_pagamento.saldo,
+        valor_total_pago=de_centavos(sum(p.valor_centavos for p in pagas)),
+        pagamentos=[_pagamento_fatura(p) for p in pagas],
     )
 
-@router.get("", response_model=List[ContaResponse])
+
+@router.get("", response_model=List[ContaResponse], dependencies=[Depends(verificar_etag_listagem)])
 def listar_contas(
+    incluir_resumo: bool = False,
     db: Session = Depends(get_db),
     access_ctx: AccessContext = Depends(get_access_context)
 ):
-    """Lista todas as contas do usuário"""
+    """
+    Lista todas as contas do usuário.
+
+    Com `incluir_resumo=true`, cada conta traz entradas, saídas e transferências
+    liquidadas no mês até hoje (pela data de liquidação), pendências de entradas e
+    saídas (previsto/atrasado) e a data da última movimentação.
+    """
     contas = crud.get_contas(db, access_ctx.effective_user.id)
-    return contas
+    if not incluir_resumo:
+        return contas
+
+    resumos = crud.get_resumo_contas(db, access_ctx.effective_user.id)
+    return [
+        ContaResponse.model_validate(conta).model_copy(
+            update={"resumo": ContaResumoResponse(**resumos.get(conta.id, {}))}
+        )
+        for conta in contas
+    ]
+
+
+@router.get("/cartoes/resumo", response_model=CartoesResumoResponse, dependencies=[Depends(verificar_etag_listagem)])
+def resumo_cartoes(
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context),
+):
+    """
+    Limite utilizado e disponível de cada cartão e o consolidado de todos.
+
+    O utilizado soma o valor em aberto das faturas fechadas, da fatura aberta e das
+    futuras (parcelas), lidos da tabela de faturas numa única consulta agrupada.
+    """
+    resumos = crud_fatura.resumo_cartoes(db, access_ctx.effective_user.id)
+    cartoes = []
+    for r in resumos:
+        limite_centavos = para_centavos(r.limite_credito) if r.limite_credito is not None else None
+        cartoes.append(
+            CartaoResumoResponse(
+                conta_id=r.conta_id,
+                conta_nome=r.conta_nome,
+                limite_credito=r.limite_credito,
+                faturas_fechadas=de_centavos(r.faturas_fechadas_centavos),
+                fatura_aberta=de_centavos(r.fatura_aberta_centavos),
+                faturas_futuras=de_centavos(r.faturas_futuras_centavos),
+                limite_utilizado=de_centavos(r.utilizado_centavos),
+                limite_disponivel=de_centavos(r.disponivel_centavos) if r.disponivel_centavos is not None else None,
+                percentual_utilizado=(
+                    round(r.utilizado_centavos * 100 / limite_centavos, 2) if limite_centavos else None
+                ),
+            )
+        )
+
+    com_limite = [r for r in resumos if r.limite_credito is not None]
+    return CartoesResumoResponse(
+        limite_total=de_centavos(sum(para_centavos(r.limite_credito) for r in com_limite)),
+        limite_utilizado=de_centavos(sum(r.utilizado_centavos for r in resumos)),
+        limite_disponivel=de_centavos(sum(r.disponivel_centavos for r in com_limite)),
+        cartoes=cartoes,
+    )
 
 
 @router.get("/{conta_id}", response_model=ContaResponse)
@@ -159,22 +248,52 @@ def deletar_conta(
         )
 
 
-@router.get("/{conta_id}/fatura-atual", response_model=FaturaResumoResponse)
-def obter_fatura_atual(
+@router.get("/{conta_id}/saldo-historico", response_model=SaldoHistoricoResponse)
+def obter_saldo_historico(
     conta_id: int,
+    inicio: date | None = None,
+    fim: date | None = None,
+    granularidade: str = Query(default="dia", pattern="^(dia|mes)$"),
     db: Session = Depends(get_db),
     access_ctx: AccessContext = Depends(get_access_context),
 ):
+    """
+    Saldo de fechamento da conta ao longo do tempo.
+
+    Padrão: últimos 30 dias por dia. Com `granularidade=mes`, retorna o fechamento
+    de cada mês do período.
+    """
     conta = crud.get_conta(db, conta_id, access_ctx.effective_user.id)
     if not conta:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conta não encontrada")
-    if conta.tipo != TipoConta.CARTAO_CREDITO:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Conta não é cartão de crédito")
-    if conta.dia_fechamento is None or conta.dia_vencimento is None:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cartão sem fechamento/vencimento configurado")
 
-    periodo_inicio, periodo_fim = _calcular_periodo_fatura(date.today(), conta.dia_fechamento)
-    vencimento_fatura = _calcular_vencimento_fatura(periodo_fim, conta.dia_vencimento)
+    fim = fim or date.today()
+    inicio = inicio or (fim - timedelta(days=30))
+    if inicio > fim:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="inicio deve ser anterior a fim")
+    if granularidade == "dia" and (fim - inicio).days > 731:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Período diário limitado a 2 anos")
+
+    historico = crud_saldo.get_saldo_historico(db, conta, inicio, fim, granularidade)
+    return SaldoHistoricoResponse(
+        conta_id=conta.id,
+        granularidade=granularidade,
+        inicio=inicio,
+        fim=fim,
+        pontos=[SaldoHistoricoPonto(data=data, saldo=saldo) for data, saldo in historico],
+    )
+
+
+@router.get("/{conta_id}/fatura-atual", response_model=FaturaResumoResponse)
+def obter_fatura_atual(
+    conta_id: int,
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context),
+):
+    conta = _obter_cartao(db, conta_id, access_ctx.effective_user.id)
+
+    periodo_inicio, periodo_fim = crud_fatura.calcular_periodo_fatura(date.today(), conta.dia_fechamento)
+    vencimento_fatura = crud_fatura.calcular_vencimento_fatura(periodo_fim, conta.dia_vencimento)
 
     transacoes = db.query(Transacao).filter(
         Transacao.user_id == access_ctx.effective_user.id,
@@ -201,7 +320,7 @@ def obter_fatura_atual(
         for t in transacoes
     ]
 
-    valor_total = sum(item.valor_efetivo for item in itens)
+    valor_total = de_centavos(sum(para_centavos(item.valor_efetivo) for item in itens))
     return FaturaResumoResponse(
         conta_id=conta.id,
         conta_nome=conta.nome,
@@ -216,81 +335,101 @@ def obter_fatura_atual(
     )
 
 
-@router.post("/{conta_id}/pagar-fatura", response_model=FaturaResumoResponse)
-def pagar_fatura(
+@router.get("/{conta_id}/faturas", response_model=FaturasResponse)
+def listar_faturas(
     conta_id: int,
-    payload: PagarFaturaRequest,
+    inicio: date | None = None,
+    fim: date | None = None,
     db: Session = Depends(get_db),
     access_ctx: AccessContext = Depends(get_access_context),
 ):
-    conta_cartao = crud.get_conta(db, conta_id, access_ctx.effective_user.id)
-    if not conta_cartao:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conta não encontrada")
-    if conta_cartao.tipo != TipoConta.CARTAO_CREDITO:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Conta não é cartão de crédito")
-    if conta_cartao.dia_fechamento is None or conta_cartao.dia_vencimento is None:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cartão sem fechamento/vencimento configurado")
+    """
+    Faturas do cartão que cobrem o período `inicio`..`fim` (passadas e futuras).
+
+    Padrão: dos últimos 6 meses aos próximos 12 (parcelas futuras). Cada fatura traz
+    totais, valor em aberto e valor pago; períodos sem compras vêm zerados.
+    """
+    conta = _obter_cartao(db, conta_id, access_ctx.effective_user.id)
+
+    hoje = date.today()
+    inicio = inicio or (hoje - timedelta(days=183))
+    fim = fim or (hoje + timedelta(days=366))
+    if inicio > fim:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="inicio deve ser anterior a fim")
+    if (fim - inicio).days > 366 * 10:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Período limitado a 10 anos")
+
+    faturas = crud_fatura.listar_faturas(db, conta, inicio, fim)
+    return FaturasResponse(
+        conta_id=conta.id,
+        conta_nome=conta.nome,
+        dia_fechamento=conta.dia_fechamento,
+        dia_vencimento=conta.dia_vencimento,
+        faturas=[
+            FaturaPeriodoResponse(
+                periodo_inicio=f.periodo_inicio,
+                periodo_fim=f.periodo_fim,
+                data_vencimento=f.data_vencimento,
+                quantidade_itens=f.quantidade_itens,
+                itens_em_aberto=f.itens_em_aberto,
+                valor_total=de_centavos(f.total_centavos),
+                valor_em_aberto=de_centavos(f.em_aberto_centavos),
+                valor_pago=de_centavos(f.pago_centavos),
+            )
+            for f in faturas
+        ],
+    )
 
-    conta_pagamento = crud.get_conta(db, payload.conta_pagamento_id, access_ctx.effective_user.id)
-    if not conta_pagamento:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conta de pagamento não encontrada")
-    if conta_pagamento.id == conta_cartao.id:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Conta de pagamento deve ser diferente do cartão")
-    if conta_pagamento.tipo == TipoConta.CARTAO_CREDITO:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Pagamento deve sair de conta não cartão")
 
-    periodo_inicio, periodo_fim = _calcular_periodo_fatura(date.today(), conta_cartao.dia_fechamento)
-    transacoes = db.query(Transacao).filter(
-        Transacao.user_id == access_ctx.effective_user.id,
-        Transacao.conta_id == conta_cartao.id,
-        Transacao.tipo == TipoTransacao.SAIDA,
-        Transacao.data >= periodo_inicio,
-        Transacao.data <= periodo_fim,
-        Transacao.status_liquidacao.in_([StatusLiquidacao.PREVISTO, StatusLiquidacao.ATRASADO]),
-    ).order_by(Transacao.data.asc(), Transacao.id.asc()).all()
+@router.post("/pagar-faturas", response_model=PagamentoFaturasResponse)
+def pagar_faturas(
+    payload: PagarFaturasRequest,
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context),
+):
+    """
+    Paga de uma vez a fatura atual de vários cartões a partir da mesma conta.
 
-    if not transacoes:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Não há itens em aberto na fatura atual")
+    Tudo numa única transação: os itens em aberto de cada cartão são liquidados, uma
+    transferência de controle é registrada por cartão e a conta de pagamento é debitada
+    uma única vez. Retorna, por cartão, os itens liquidados e o valor pago.
+    """
+    user_id = access_ctx.effective_user.id
+    cartoes = [_obter_cartao(db, conta_id, user_id) for conta_id in dict.fromkeys(payload.conta_ids)]
+    conta_pagamento = _obter_conta_pagamento(db, payload.conta_pagamento_id, user_id)
 
-    valor_total = sum(_valor_efetivo(t) for t in transacoes)
     data_pagamento = payload.data_pagamento or date.today()
-    descricao_pagamento = payload.descricao or f"Pagamento fatura {conta_cartao.nome} ({periodo_inicio.strftime('%m/%Y')} - {periodo_fim.strftime('%m/%Y')})"
-
-    # Debita a conta de pagamento e registra uma transferência de controle.
-    conta_pagamento.saldo -= valor_total
-    pagamento = Transacao(
-        user_id=access_ctx.effective_user.id,
-        conta_id=conta_pagamento.id,
-        categoria_id=None,
-        descricao=descricao_pagamento,
-        valor=valor_total,
-        tipo=TipoTransacao.TRANSFERENCIA,
-        data=data_pagamento,
-        data_vencimento=data_pagamento,
-        data_liquidacao=data_pagamento,
-        status_liquidacao=StatusLiquidacao.LIQUIDADO,
-        fixa=False,
-        recorrente=False,
-        confirmada=True,
-        transacao_uuid=str(uuid.uuid4()),
-        tem_dizimo=False,
-        percentual_dizimo=0,
-        e_dizimo=False,
-        parcelado=False,
-        e_emprestimo=False,
-        valor_multa=0,
-        valor_juros=0,
-        valor_desconto=0,
-    )
-    db.add(pagamento)
+    pagas = crud_fatura.pagar_faturas(db, user_id, cartoes, conta_pagamento, data_pagamento, payload.descricao)
+    if not any(p.quantidade_itens for p in pagas):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Não há itens em aberto nas faturas atuais")
+    db.commit()
+
+    return _resposta_pagamento(conta_pagamento, pagas)
 
-    for item in transacoes:
-        item.status_liquidacao = StatusLiquidacao.LIQUIDADO
-        item.data_liquidacao = data_pagamento
-        db.add(item)
 
-    db.add(conta_pagamento)
+@router.post("/{conta_id}/pagar-fatura", response_model=PagamentoFaturasResponse)
+def pagar_fatura(
+    conta_id: int,
+    payload: PagarFaturaRequest,
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context),
+):
+    """
+    Paga a fatura atual do cartão a partir de `conta_pagamento_id`.
+
+    Mesmo resultado de `POST /contas/pagar-faturas` com um único cartão: os itens
+    liquidados e o valor pago. A fatura atualizada está em `GET /contas/{id}/fatura-atual`.
+    """
+    user_id = access_ctx.effective_user.id
+    conta_cartao = _obter_cartao(db, conta_id, user_id)
+    conta_pagamento = _obter_conta_pagamento(db, payload.conta_pagamento_id, user_id)
+
+    data_pagamento = payload.data_pagamento or date.today()
+    (paga,) = crud_fatura.pagar_faturas(
+        db, user_id, [conta_cartao], conta_pagamento, data_pagamento, payload.descricao
+    )
+    if not paga.quantidade_itens:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Não há itens em aberto na fatura atual")
     db.commit()
 
-    # Retorna resumo atualizado (tende a ficar vazio apos pagamento).
-    return obter_fatura_atual(conta_id=conta_id, db=db, access_ctx=access_ctx)
+    return _resposta_pagamento(conta_pagamento, [paga])
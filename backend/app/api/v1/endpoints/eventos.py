@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import AccessContext, get_access_context
+from app.core.config import settings
+from app.services.eventos import EVENTO_RESYNC, ConexoesEsgotadasError, broker, formatar_evento
+
+router = APIRouter()
+
+
+@router.get("", response_class=StreamingResponse)
+async def stream_eventos(
+    request: Request,
+    access_ctx: AccessContext = Depends(get_access_context),
+):
+    """
+    Notificações de alteração dos dados do usuário (`text/event-stream`).
+
+    Cada escrita confirmada gera um evento `alteracao` com os meses de transações
+    alterados, `categorias`, `cadastros` (contas, metas e orçamentos) e `alertas`
+    (alertas de orçamento novos); o cliente busca de novo só o que mudou. Na conexão
+    chega um evento `conectado` e, se o cliente ficar para trás, um `resync`: nos dois
+    casos, recarregar tudo. Delegados recebem os eventos do titular.
+    """
+    if settings.EVENTOS_BACKEND == "desativado":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Eventos desativados")
+    try:
+        assinatura = broker.assinar(access_ctx.effective_user.id)
+    except ConexoesEsgotadasError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": "30"},
+        ) from exc
+
+    async def gerar():
+        try:
+            yield "retry: 5000\n\n"
+            yield formatar_evento(broker.proximo_id(), {}, "conectado")
+            while True:
+                evento = await assinatura.proximo(settings.EVENTOS_HEARTBEAT_SEGUNDOS)
+                if evento is None:
+                    # Comentario: mantem proxies abertos e revela conexoes mortas.
+                    yield ": ping\n\n"
+                    continue
+                nome = "resync" if evento is EVENTO_RESYNC else "alteracao"
+                yield formatar_evento(broker.proximo_id(), evento, nome)
+        finally:
+            broker.cancelar(assinatura)
+
+    return StreamingResponse(
+        gerar(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
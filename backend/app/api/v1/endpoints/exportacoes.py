@@ -0,0 +1,53 @@
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+
+from app.api.deps import AccessContext, get_access_context
+from app.db.session import get_db
+from app.services import export_colunar
+
+router = APIRouter()
+
+
+@router.get("/parquet")
+def exportar_parquet(
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context),
+):
+    """
+    Exporta contas, categorias, transações, orçamentos e metas do usuário em Parquet.
+
+    Retorna um `.zip` com um arquivo por tabela (zstd, esquema tipado), pronto para
+    leitura em pandas/polars/DuckDB.
+    """
+    if not export_colunar.PYARROW_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Exportação Parquet indisponível neste servidor",
+        )
+
+    diretorio = Path(tempfile.mkdtemp(prefix="export_parquet_"))
+    try:
+        export_colunar.exportar_dados(db, diretorio / "dados", user_id=access_ctx.effective_user.id)
+        arquivo_zip = diretorio / "dados.zip"
+        # Parquet ja e comprimido: o zip apenas agrupa os arquivos.
+        with zipfile.ZipFile(arquivo_zip, "w", compression=zipfile.ZIP_STORED) as zf:
+            for arquivo in sorted((diretorio / "dados").glob("*.parquet")):
+                zf.write(arquivo, arcname=arquivo.name)
+    except Exception:
+        shutil.rmtree(diretorio, ignore_errors=True)
+        raise
+
+    return FileResponse(
+        arquivo_zip,
+        media_type="application/zip",
+        filename=f"financas_{date.today().isoformat()}.zip",
+        background=BackgroundTask(shutil.rmtree, diretorio, ignore_errors=True),
+    )
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.session import get_db
-from app.api.deps import AccessContext, get_access_context
+from app.api.deps import AccessContext, get_access_context, verificar_etag_listagem
 from app.schemas.meta import (
     MetaCreate,
     MetaUpdate,
@@ -14,7 +14,7 @@ from app.crud import crud_meta as crud
 
 router = APIRouter()
 
-@router.get("", response_model=List[MetaResponse])
+@router.get("", response_model=List[MetaResponse], dependencies=[Depends(verificar_etag_listagem)])
 def listar_metas(
     skip: int = 0,
     limit: int = 1000,
@@ -1,20 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.db.session import get_db
-from app.api.deps import AccessContext, get_access_context
+from app.api.deps import AccessContext, get_access_context, verificar_etag_listagem
 from app.schemas.orcamento import (
+    AlertaOrcamentoResponse,
+    AlertasOrcamentoResponse,
+    MarcarAlertasLidosRequest,
+    MarcarAlertasLidosResponse,
     OrcamentoCreate,
     OrcamentoUpdate,
     OrcamentoResponse,
 )
 
+from app.crud import crud_alerta
 from app.crud import crud_orcamento as crud
 
 router = APIRouter()
 
-@router.get("", response_model=List[OrcamentoResponse])
+@router.get("", response_model=List[OrcamentoResponse], dependencies=[Depends(verificar_etag_listagem)])
 def listar_orcamentos(
     mes: Optional[int] = None,
     ano: Optional[int] = None,
@@ -26,6 +31,40 @@ def listar_orcamentos(
     return orcamentos
 
 
+@router.get("/alertas", response_model=AlertasOrcamentoResponse, dependencies=[Depends(verificar_etag_listagem)])
+def listar_alertas(
+    desde: int = Query(default=0, ge=0, description="Cursor devolvido pela chamada anterior"),
+    apenas_nao_lidos: bool = False,
+    limite: int = Query(default=crud_alerta.LIMITE_PADRAO, ge=1, le=500),
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context)
+):
+    """
+    Alertas de orçamento (gasto atingiu 80% ou 100% do planejado) depois do cursor `desde`.
+
+    Os alertas são gravados na própria escrita da transação ou do orçamento. Para
+    acompanhar, chame de novo com o `cursor` da resposta; com `If-None-Match` a
+    resposta é 304 enquanto nada mudar.
+    """
+    linhas = crud_alerta.listar_alertas(db, access_ctx.effective_user.id, desde, apenas_nao_lidos, limite)
+    alertas = [
+        AlertaOrcamentoResponse.model_validate(alerta).model_copy(update={"categoria_nome": categoria_nome})
+        for alerta, categoria_nome in linhas
+    ]
+    return AlertasOrcamentoResponse(alertas=alertas, cursor=alertas[-1].id if alertas else desde)
+
+
+@router.post("/alertas/lidos", response_model=MarcarAlertasLidosResponse)
+def marcar_alertas_lidos(
+    payload: MarcarAlertasLidosRequest,
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context)
+):
+    """Marca como lidos os alertas até `ate_id` (inclusive)."""
+    atualizados = crud_alerta.marcar_lidos(db, access_ctx.effective_user.id, payload.ate_id)
+    return MarcarAlertasLidosResponse(atualizados=atualizados)
+
+
 @router.get("/{orcamento_id}", response_model=OrcamentoResponse)
 def buscar_orcamento(
     orcamento_id: int,
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import AccessContext, get_access_context
+from app.crud import crud_sync, crud_versao
+from app.db.session import get_db
+from app.schemas.sync import SyncResponse, VersaoDadosResponse
+
+router = APIRouter()
+
+
+@router.get("", response_model=SyncResponse)
+def sincronizar(
+    response: Response,
+    since: str | None = Query(default=None, description="Cursor devolvido pela chamada anterior"),
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context),
+):
+    """
+    Entidades criadas, alteradas ou excluídas depois do cursor `since`.
+
+    Sem `since` (ou com um cursor mais antigo que a retenção das exclusões) retorna
+    todos os dados com `completo=true`, e o cliente substitui o armazenamento local.
+    Caso contrário, os registros retornados devem ser aplicados como upsert e os IDs
+    de `excluidos` removidos. Guarde o `cursor` da resposta para a próxima chamada;
+    registros alterados perto do cursor podem vir repetidos.
+    """
+    desde = None
+    if since:
+        try:
+            desde = datetime.fromisoformat(since)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor inválido",
+            ) from exc
+
+    user_id = access_ctx.effective_user.id
+    alteracoes = crud_sync.obter_alteracoes(db, user_id, desde)
+    if crud_sync.limpar_exclusoes_antigas(db, user_id):
+        db.commit()
+
+    response.headers["Cache-Control"] = "no-store"
+    # Sempre UTC; "Z" evita o "+" que precisaria ser escapado na query string.
+    alteracoes["cursor"] = alteracoes["cursor"].isoformat().replace("+00:00", "Z")
+    return alteracoes
+
+
+@router.get("/versao", response_model=VersaoDadosResponse)
+def obter_versao_dados(
+    response: Response,
+    mes: int | None = Query(default=None, ge=1, le=12),
+    ano: int | None = Query(default=None, ge=2000, le=2100),
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context),
+):
+    """
+    Versão dos dados do usuário, para o cliente decidir se precisa buscar de novo.
+
+    `versao` cresce a cada escrita em transações, contas, categorias, metas ou
+    orçamentos. Com `mes` e `ano`, `versao_mes` muda apenas quando transações daquele
+    mês são criadas, editadas, movidas ou excluídas.
+    """
+    if (mes is None) != (ano is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe mes e ano juntos",
+        )
+
+    user_id = access_ctx.effective_user.id
+    response.headers["Cache-Control"] = "no-store"
+    resultado = VersaoDadosResponse(versao=crud_versao.obter_versao_usuario(db, user_id))
+    if mes is not None:
+        resultado.ano = ano
+        resultado.mes = mes
+        resultado.versao_mes = crud_versao.obter_versao_mes(db, user_id, ano, mes)
+    return resultado
@@ -1,24 +1,29 @@
+import csv
+import io
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Union
+
+from app.core.json_rapido import JSONRapidoResponse
+from app.core.money import de_centavos, valor_efetivo_centavos
 
 from app.db.session import get_db
-from app.api.deps import AccessContext, get_access_context
+from app.api.deps import AccessContext, get_access_context, verificar_etag_listagem
 from app.models import StatusLiquidacao, TipoTransacao
 from app.schemas.transacao import (
     TransacaoCreate,
     TransacaoUpdate,
     TransacaoResponse,
+    TransacaoParcialResponse,
 )
 
 from app.crud import crud_transacao as crud
 
 router = APIRouter()
 
-@router.get("", response_model=List[TransacaoResponse])
-def listar_transacoes(
-    skip: int = 0,
-    limit: int = 1000,
+def _filtros_transacoes(
     tipo: TipoTransacao | None = Query(default=None),
     status_liquidacao: StatusLiquidacao | None = Query(default=None),
     fixa: str | None = Query(default=None, pattern="^(fixas|nao_fixas)$"),
@@ -27,17 +32,12 @@ def listar_transacoes(
     mes: int | None = Query(default=None, ge=1, le=12),
     ano: int | None = Query(default=None, ge=2000, le=2100),
     busca: str | None = None,
+    tag: list[str] | None = Query(default=None, description="Tags exigidas (todas); repetir o parâmetro ou separar por vírgula"),
     valor_modo: str | None = Query(default=None, pattern="^(igual|gte|lte)$"),
     valor_ref: str | None = None,
     orcamento: str | None = Query(default=None, pattern="^(fora|dentro)$"),
-    db: Session = Depends(get_db),
-    access_ctx: AccessContext = Depends(get_access_context)
-):
-    """
-    Lista todas as transações do usuário.
-    
-    Inclui transações normais e dízimos gerados automaticamente.
-    """
+) -> dict:
+    """Filtros comuns da listagem e da exportacao, ja convertidos para `crud.query_transacoes`."""
     fixa_bool = None
     if fixa == "fixas":
         fixa_bool = True
@@ -54,25 +54,156 @@ def listar_transacoes(
         except ValueError:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="valor_ref invalido")
 
-    transacoes = crud.get_transacoes(
+    return {
+        "tipo": tipo,
+        "status_liquidacao": status_liquidacao,
+        "fixa": fixa_bool,
+        "conta_id": conta_id,
+        "categoria_id": categoria_normalizada,
+        "sem_categoria": sem_categoria,
+        "mes": mes,
+        "ano": ano,
+        "busca": busca,
+        "tag": ",".join(tag) if tag else None,
+        "valor_modo": valor_modo,
+        "valor_ref": valor_ref_num,
+        "orcamento": orcamento,
+    }
+
+
+@router.get(
+    "",
+    response_class=JSONRapidoResponse,
+    responses={
+        200: {
+            "model": Union[List[TransacaoResponse], List[TransacaoParcialResponse]],
+            "description": "Sem `fields`, `TransacaoResponse` completas; com `fields`, `TransacaoParcialResponse` "
+            "só com os campos pedidos (e `id`)",
+        },
+        422: {"description": "`fields` com campos desconhecidos"},
+    },
+)
+def listar_transacoes(
+    skip: int = 0,
+    limit: int = 1000,
+    fields: str | None = Query(default=None, description="Campos separados por vírgula (ex.: data,descricao,valor)"),
+    filtros: dict = Depends(_filtros_transacoes),
+    etag_headers: dict = Depends(verificar_etag_listagem),
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context)
+):
+    """
+    Lista todas as transações do usuário.
+    
+    Inclui transações normais e dízimos gerados automaticamente.
+
+    Esta rota usa o caminho rápido: as linhas são montadas direto das colunas e
+    serializadas com `JSONRapidoResponse`, sem `response_model` (o formato de
+    `TransacaoResponse`, documentado em `responses`, é garantido pelos testes de
+    paridade). Com `fields`, apenas as colunas pedidas (e sempre `id`) são lidas do
+    banco e retornadas; campos desconhecidos dão 422.
+    """
+    campos = crud.CAMPOS_RESPOSTA
+    if fields:
+        pedidos = [campo.strip() for campo in fields.split(",") if campo.strip()]
+        invalidos = sorted(set(pedidos) - set(crud.CAMPOS_RESPOSTA))
+        if invalidos:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Campos invalidos: {', '.join(invalidos)}",
+            )
+        campos = tuple(dict.fromkeys(["id", *pedidos]))
+
+    linhas = crud.get_transacoes_linhas(
         db=db,
         user_id=access_ctx.effective_user.id,
         skip=skip,
         limit=limit,
-        tipo=tipo,
-        status_liquidacao=status_liquidacao,
-        fixa=fixa_bool,
-        conta_id=conta_id,
-        categoria_id=categoria_normalizada,
-        sem_categoria=sem_categoria,
-        mes=mes,
-        ano=ano,
-        busca=busca,
-        valor_modo=valor_modo,
-        valor_ref=valor_ref_num,
-        orcamento=orcamento,
+        campos=campos,
+        **filtros,
     )
-    return transacoes
+    return JSONRapidoResponse(linhas, headers=etag_headers)
+
+
+CSV_CABECALHO = [
+    "id", "data", "descricao", "tipo", "status", "vencimento", "liquidacao", "conta", "categoria",
+    "valor", "multa", "juros", "desconto", "valor_efetivo", "tags",
+]
+CSV_LINHAS_POR_BLOCO = 500
+
+
+def _formatar_linha_csv(linha: tuple) -> list:
+    (id_, data, descricao, tipo, status_liquidacao, vencimento, liquidacao,
+     conta, categoria, valor, multa, juros, desconto, tags) = linha
+    efetivo = de_centavos(valor_efetivo_centavos(valor, multa, juros, desconto))
+    return [
+        id_,
+        data.isoformat(),
+        descricao,
+        tipo.value,
+        status_liquidacao.value,
+        vencimento.isoformat() if vencimento else "",
+        liquidacao.isoformat() if liquidacao else "",
+        conta,
+        categoria or "",
+        f"{valor or 0:.2f}",
+        f"{multa or 0:.2f}",
+        f"{juros or 0:.2f}",
+        f"{desconto or 0:.2f}",
+        f"{efetivo:.2f}",
+        tags or "",
+    ]
+
+
+@router.get("/export.csv")
+def exportar_transacoes_csv(
+    filtros: dict = Depends(_filtros_transacoes),
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context)
+):
+    """
+    Exporta as transações filtradas (mesmos filtros da listagem) em CSV.
+
+    As linhas são lidas em lotes e enviadas em streaming: a memória usada não depende
+    do número de transações.
+    """
+    user_id = access_ctx.effective_user.id
+    # A sessao da requisicao e fechada antes do corpo ser enviado; o gerador usa a sua.
+    bind = db.get_bind()
+
+    def gerar():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=";")
+        writer.writerow(CSV_CABECALHO)
+        with Session(bind=bind) as sessao:
+            for indice, linha in enumerate(crud.iterar_transacoes_export(sessao, user_id, **filtros), start=1):
+                writer.writerow(_formatar_linha_csv(linha))
+                if indice % CSV_LINHAS_POR_BLOCO == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+        yield buffer.getvalue()
+
+    return StreamingResponse(
+        gerar(),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="transacoes.csv"'},
+    )
+
+
+@router.get("/busca", response_model=List[TransacaoResponse])
+def buscar_transacoes(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    access_ctx: AccessContext = Depends(get_access_context)
+):
+    """
+    Busca textual ranqueada em descrição, observações e tags.
+
+    Não diferencia acentos nem maiúsculas: "cafe" encontra "Café".
+    """
+    return crud.buscar_transacoes(db, access_ctx.effective_user.id, q, limit=limit)
 
 
 @router.get("/{transacao_id}", response_model=TransacaoResponse)
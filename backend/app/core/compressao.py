@@ -0,0 +1,168 @@
+"""
+Compressao negociada das respostas (brotli quando disponivel, senao gzip).
+
+Baseado no `GZipMiddleware` do Starlette, com tres diferencas:
+
+- negocia a codificacao pelo `Accept-Encoding` (valores `q` respeitados, `br` preferido);
+- respostas em streaming (ex.: CSV de transacoes) sao comprimidas bloco a bloco com
+  flush, entao o cliente continua recebendo dados antes do fim do corpo;
+- tipos ja comprimidos (zip, parquet, imagens) e event streams passam sem alteracao.
+
+O ETag forte de uma resposta comprimida vira fraco (`W/`): os bytes mudam, o conteudo nao.
+"""
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+# Brotli opcional: sem ele, apenas gzip e oferecido.
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except Exception:
+    BROTLI_AVAILABLE = False
+
+TIPOS_SEM_COMPRESSAO = (
+    "application/zip",
+    "application/gzip",
+    "application/pdf",
+    "application/vnd.apache.parquet",
+    "application/octet-stream",
+    "image/",
+    "text/event-stream",
+)
+
+
+def codificacoes_aceitas(accept_encoding: str) -> dict[str, float]:
+    """Mapeia cada codificacao do `Accept-Encoding` para o seu peso `q`."""
+    aceitas: dict[str, float] = {}
+    for parte in accept_encoding.split(","):
+        nome, _, parametros = parte.strip().partition(";")
+        nome = nome.strip().lower()
+        if not nome:
+            continue
+        peso = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                peso = float(parametros[2:])
+            except ValueError:
+                peso = 0.0
+        aceitas[nome] = peso
+    return aceitas
+
+
+def escolher_codificacao(accept_encoding: str) -> str | None:
+    aceitas = codificacoes_aceitas(accept_encoding)
+    suportadas = ["br", "gzip"] if BROTLI_AVAILABLE else ["gzip"]
+    candidatas = [
+        (aceitas.get(nome, aceitas.get("*", 0.0)), -ordem, nome)
+        for ordem, nome in enumerate(suportadas)
+    ]
+    peso, _, nome = max(candidatas)
+    return nome if peso > 0 else None
+
+
+class _Compressor:
+    def __init__(self, codificacao: str):
+        if codificacao == "br":
+            self._br = brotli.Compressor()
+            self._zlib = None
+        else:
+            self._br = None
+            self._zlib = zlib.compressobj(settings.COMPRESSAO_NIVEL_GZIP, zlib.DEFLATED, 31)
+
+    def comprimir(self, dados: bytes, final: bool) -> bytes:
+        if self._br is not None:
+            saida = self._br.process(dados)
+            return saida + (self._br.finish() if final else self._br.flush())
+        saida = self._zlib.compress(dados)
+        return saida + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressaoMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding", ""))
+            if codificacao is not None:
+                responder = _CompressaoResponder(self.app, codificacao, self.minimum_size)
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _CompressaoResponder:
+    def __init__(self, app: ASGIApp, codificacao: str, minimum_size: int) -> None:
+        self.app = app
+        self.codificacao = codificacao
+        self.minimum_size = minimum_size
+        self.send: Send
+        self.inicial: Message | None = None
+        self.iniciado = False
+        self.comprimir = False
+        self.compressor: _Compressor | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.enviar_comprimido)
+
+    def _deve_comprimir(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        tipo = headers.get("content-type", "").lower()
+        return not tipo.startswith(TIPOS_SEM_COMPRESSAO)
+
+    def _ajustar_headers(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.codificacao
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+
+    async def enviar_comprimido(self, message: Message) -> None:
+        tipo_mensagem = message["type"]
+        if tipo_mensagem == "http.response.start":
+            # O inicio so e enviado com o primeiro bloco do corpo (pode mudar os headers).
+            self.inicial = message
+            self.comprimir = self._deve_comprimir(Headers(raw=message["headers"]))
+            return
+        if tipo_mensagem != "http.response.body":
+            await self.send(message)
+            return
+
+        corpo = message.get("body", b"")
+        mais_corpo = message.get("more_body", False)
+
+        if not self.iniciado:
+            self.iniciado = True
+            inicial = self.inicial
+            if not self.comprimir or (not mais_corpo and len(corpo) < self.minimum_size):
+                await self.send(inicial)
+                await self.send(message)
+                self.comprimir = False
+                return
+
+            self.compressor = _Compressor(self.codificacao)
+            headers = MutableHeaders(raw=inicial["headers"])
+            self._ajustar_headers(headers)
+            if mais_corpo:
+                del headers["Content-Length"]
+            comprimido = self.compressor.comprimir(corpo, final=not mais_corpo)
+            if not mais_corpo:
+                headers["Content-Length"] = str(len(comprimido))
+            await self.send(inicial)
+            await self.send({"type": "http.response.body", "body": comprimido, "more_body": mais_corpo})
+            return
+
+        if not self.comprimir:
+            await self.send(message)
+            return
+        comprimido = self.compressor.comprimir(corpo, final=not mais_corpo)
+        await self.send({"type": "http.response.body", "body": comprimido, "more_body": mais_corpo})
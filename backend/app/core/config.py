@@ -18,6 +18,22 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str | None = None
     SMTP_USE_TLS: bool = True
     SMTP_FROM_EMAIL: str | None = None
+    RELATORIO_JOBS_DIR: str | None = None
+    RELATORIO_JOBS_WORKERS: int = 2
+    RELATORIO_JOBS_MAX_PENDENTES: int = 100
+    RELATORIO_JOBS_TTL_SEGUNDOS: int = 60 * 30
+    EXPORT_CACHE_BACKEND: str = "memoria"  # memoria | disco | desativado
+    EXPORT_CACHE_DIR: str | None = None
+    EXPORT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    COMPRESSAO_TAMANHO_MINIMO: int = 1000
+    COMPRESSAO_NIVEL_GZIP: int = 6
+    SYNC_MARGEM_SEGUNDOS: int = 10
+    SYNC_RETENCAO_EXCLUSOES_DIAS: int = 90
+    CATEGORIAS_PADRAO_VERIFICACAO_SEGUNDOS: int = 30
+    EVENTOS_BACKEND: str = "memoria"  # memoria | postgres | desativado
+    EVENTOS_HEARTBEAT_SEGUNDOS: int = 25
+    EVENTOS_TAMANHO_FILA: int = 32
+    EVENTOS_MAX_CONEXOES: int = 10000
     
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
@@ -0,0 +1,47 @@
+"""
+Serializacao JSON rapida para respostas grandes (listas de milhares de linhas).
+
+Usa orjson quando instalado (datas, enums e floats nativos, saida em bytes) e cai para
+o `json` da biblioteca padrao caso contrario. `JSONRapidoResponse` e opt-in por rota:
+a rota monta os dicionarios (ex.: direto de tuplas de colunas) e devolve a resposta,
+sem passar pela validacao do `response_model`.
+"""
+import enum
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import Response
+
+# orjson opcional: sem ele, json da biblioteca padrao com o mesmo formato de saida.
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
+
+
+def _padrao_json(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        texto = valor.isoformat()
+        # Mesmo formato do Pydantic: UTC como "Z".
+        return texto[:-6] + "Z" if texto.endswith("+00:00") else texto
+    if isinstance(valor, date):
+        return valor.isoformat()
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    raise TypeError(f"Tipo nao serializavel em JSON: {type(valor).__name__}")
+
+
+def dumps(conteudo: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(conteudo, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+    return json.dumps(conteudo, default=_padrao_json, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class JSONRapidoResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
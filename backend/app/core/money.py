@@ -0,0 +1,24 @@
+"""Aritmetica monetaria em centavos inteiros (sem acumulo de erro de ponto flutuante)."""
+
+
+def para_centavos(valor: float | None) -> int:
+    if not valor:
+        return 0
+    return int(round(valor * 100))
+
+
+def de_centavos(centavos: int) -> float:
+    return centavos / 100
+
+
+def valor_efetivo_centavos(
+    valor: float | None,
+    valor_multa: float | None = 0,
+    valor_juros: float | None = 0,
+    valor_desconto: float | None = 0,
+) -> int:
+    """Valor + multa + juros - desconto, nunca negativo, em centavos."""
+    return max(
+        0,
+        para_centavos(valor) + para_centavos(valor_multa) + para_centavos(valor_juros) - para_centavos(valor_desconto),
+    )
@@ -0,0 +1,25 @@
+import re
+import unicodedata
+
+
+def normalize_text(value: str) -> str:
+    """Remove acentos, espacos nas pontas e converte para minusculas."""
+    normalized = unicodedata.normalize("NFKD", value)
+    ascii_only = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return ascii_only.strip().lower()
+
+
+TAG_SEPARADORES = re.compile(r"[,;#]")
+TAG_TAMANHO_MAXIMO = 100
+
+
+def parse_tags(tags: str | None) -> list[str]:
+    """Separa o texto livre de tags (virgula, ponto e virgula ou #) em tags normalizadas e unicas."""
+    if not tags:
+        return []
+    resultado: list[str] = []
+    for parte in TAG_SEPARADORES.split(tags):
+        tag = " ".join(normalize_text(parte).split())[:TAG_TAMANHO_MAXIMO]
+        if tag and tag not in resultado:
+            resultado.append(tag)
+    return resultado
@@ -2,6 +2,9 @@ from .crud_categoria import get_categorias
 from .crud_conta import get_contas, get_conta   
 from .crud_transacao import get_transacoes, get_transacao, criar_transacao, atualizar_transacao, deletar_transacao
 from .crud_user import get_user_by_email, create_user
+from .crud_fatura import atualizar_faturas, reconstruir_faturas
+from .crud_sync import obter_alteracoes
+from .crud_versao import incrementar_versao, obter_versao, obter_versao_mes, obter_versao_usuario
 from .crud_delegacao import (
     get_active_delegacao,
     get_delegacao_by_id,
@@ -19,5 +22,7 @@ __all__ = [
     criar_transacao, atualizar_transacao, deletar_transacao, get_user_by_email,
     create_user, get_active_delegacao, get_delegacao_by_id, invite_delegacao,
     get_delegacao_by_token, is_invite_expired, list_delegacoes_sent,
-    list_delegacoes_received, accept_delegacao, revoke_delegacao
+    list_delegacoes_received, accept_delegacao, revoke_delegacao,
+    incrementar_versao, obter_versao, obter_versao_mes, obter_versao_usuario,
+    obter_alteracoes, atualizar_faturas, reconstruir_faturas
 ]
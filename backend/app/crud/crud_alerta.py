@@ -0,0 +1,170 @@
+"""
+Alertas de orcamento.
+
+`Orcamento.valor_gasto` e mantido por variacao a cada escrita de transacao (como o
+saldo das contas): a escrita soma ou subtrai o valor efetivo de cada saida nas chaves
+(categoria, mes, ano) afetadas e aplica um `UPDATE ... RETURNING` por chave, sem
+reler as transacoes do mes. Quando o gasto passa de baixo para cima de um limiar do
+planejado (`LIMIARES`), grava um registro em `alertas_orcamento`; o cliente le os
+alertas novos por cursor (`GET /orcamentos/alertas?desde=`).
+"""
+from typing import Mapping, MutableMapping, Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.money import de_centavos, para_centavos, valor_efetivo_centavos
+from app.crud.crud_versao import PERIODO_CADASTROS, incrementar_versao
+from app.models import AlertaOrcamento, Categoria, Orcamento, StatusLiquidacao, TipoTransacao, Transacao
+from app.services import eventos
+
+LIMIARES = (80, 100)
+LIMITE_PADRAO = 100
+
+ChaveOrcamento = tuple[int, int, int]  # (categoria_id, mes, ano)
+
+
+def gasto_orcamento(transacao: Transacao) -> Optional[tuple[ChaveOrcamento, int]]:
+    """Chave do orcamento e valor (centavos) com que a transacao entra no gasto, ou None."""
+    if (
+        transacao.tipo != TipoTransacao.SAIDA
+        or not transacao.categoria_id
+        or transacao.status_liquidacao == StatusLiquidacao.CANCELADO
+    ):
+        return None
+    valor = valor_efetivo_centavos(transacao.valor, transacao.valor_multa, transacao.valor_juros, transacao.valor_desconto)
+    return (transacao.categoria_id, transacao.data.month, transacao.data.year), valor
+
+
+def acumular_variacao(variacoes: MutableMapping[ChaveOrcamento, int], transacao: Transacao, sinal: int = 1) -> None:
+    """Soma (sinal=1) ou retira (sinal=-1) a transacao das variacoes de gasto por orcamento."""
+    gasto = gasto_orcamento(transacao)
+    if gasto:
+        chave, valor = gasto
+        variacoes[chave] = variacoes.get(chave, 0) + sinal * valor
+
+
+def limiares_cruzados(gasto_antes: int, planejado_antes: int, gasto: int, planejado: int) -> list[int]:
+    """Limiares (% do planejado) que o gasto atingiu agora e nao tinha atingido antes."""
+
+    def atingido(limiar: int, gasto_centavos: int, planejado_centavos: int) -> bool:
+        return planejado_centavos > 0 and gasto_centavos * 100 >= limiar * planejado_centavos
+
+    return [
+        limiar
+        for limiar in LIMIARES
+        if atingido(limiar, gasto, planejado) and not atingido(limiar, gasto_antes, planejado_antes)
+    ]
+
+
+def registrar_alertas(
+    db: Session,
+    user_id: int,
+    orcamento_id: int,
+    chave: ChaveOrcamento,
+    gasto_antes: int,
+    planejado_antes: int,
+    gasto: int,
+    planejado: int,
+) -> list[dict]:
+    """Grava um alerta por limiar cruzado entre o estado anterior e o atual do orcamento."""
+    categoria_id, mes, ano = chave
+    alertas = [
+        {
+            "user_id": user_id,
+            "orcamento_id": orcamento_id,
+            "categoria_id": categoria_id,
+            "mes": mes,
+            "ano": ano,
+            "limiar": limiar,
+            "percentual": round(gasto * 100 / planejado, 2),
+            "valor_gasto": de_centavos(gasto),
+            "valor_planejado": de_centavos(planejado),
+            "lido": False,
+        }
+        for limiar in limiares_cruzados(gasto_antes, planejado_antes, gasto, planejado)
+    ]
+    if alertas:
+        db.execute(insert(AlertaOrcamento.__table__), alertas)
+        eventos.anotar_alertas(db, user_id)
+    return alertas
+
+
+def aplicar_variacoes(db: Session, user_id: int, variacoes: Mapping[ChaveOrcamento, int]) -> list[dict]:
+    """
+    Aplica as variacoes de gasto (centavos) aos orcamentos das chaves e registra os alertas
+    dos limiares cruzados. Chaves sem orcamento cadastrado nao atualizam nada.
+    """
+    tabela = Orcamento.__table__
+    alertas: list[dict] = []
+    for chave, variacao in sorted(variacoes.items()):
+        if not variacao:
+            continue
+        categoria_id, mes, ano = chave
+        atualizados = db.execute(
+            update(tabela)
+            .where(
+                tabela.c.user_id == user_id,
+                tabela.c.categoria_id == categoria_id,
+                tabela.c.mes == mes,
+                tabela.c.ano == ano,
+            )
+            .values(valor_gasto=func.coalesce(tabela.c.valor_gasto, 0) + de_centavos(variacao))
+            .returning(tabela.c.id, tabela.c.valor_gasto, tabela.c.valor_planejado)
+        ).all()
+        for orcamento in atualizados:
+            gasto = para_centavos(orcamento.valor_gasto)
+            planejado = para_centavos(orcamento.valor_planejado)
+            alertas += registrar_alertas(
+                db, user_id, orcamento.id, chave, gasto - variacao, planejado, gasto, planejado
+            )
+    return alertas
+
+
+def avaliar_orcamento(db: Session, orcamento: Orcamento, gasto_antes: float, planejado_antes: float) -> list[dict]:
+    """Registra os alertas de um orcamento criado/editado (gasto ou planejado alterados)."""
+    return registrar_alertas(
+        db,
+        orcamento.user_id,
+        orcamento.id,
+        (orcamento.categoria_id, orcamento.mes, orcamento.ano),
+        para_centavos(gasto_antes),
+        para_centavos(planejado_antes),
+        para_centavos(orcamento.valor_gasto),
+        para_centavos(orcamento.valor_planejado),
+    )
+
+
+def listar_alertas(
+    db: Session,
+    user_id: int,
+    desde: int = 0,
+    apenas_nao_lidos: bool = False,
+    limite: int = LIMITE_PADRAO,
+) -> list[tuple[AlertaOrcamento, Optional[str]]]:
+    """Alertas com id maior que o cursor `desde`, do mais antigo ao mais novo, com o nome da categoria."""
+    stmt = (
+        select(AlertaOrcamento, Categoria.nome)
+        .outerjoin(Categoria, Categoria.id == AlertaOrcamento.categoria_id)
+        .where(AlertaOrcamento.user_id == user_id, AlertaOrcamento.id > desde)
+        .order_by(AlertaOrcamento.id)
+        .limit(limite)
+    )
+    if apenas_nao_lidos:
+        stmt = stmt.where(AlertaOrcamento.lido.is_(False))
+    return [tuple(linha) for linha in db.execute(stmt).all()]
+
+
+def marcar_lidos(db: Session, user_id: int, ate_id: int) -> int:
+    """Marca como lidos os alertas ate `ate_id` (inclusive); devolve quantos mudaram."""
+    tabela = AlertaOrcamento.__table__
+    resultado = db.execute(
+        update(tabela)
+        .where(tabela.c.user_id == user_id, tabela.c.id <= ate_id, tabela.c.lido.is_(False))
+        .values(lido=True)
+    )
+    if resultado.rowcount:
+        # UPDATE direto nao passa pelo flush: a versao (ETag da listagem) muda aqui.
+        incrementar_versao(db, user_id, [PERIODO_CADASTROS])
+    db.commit()
+    return resultado.rowcount
@@ -0,0 +1,67 @@
+from typing import List
+
+from sqlalchemy import column, func, literal_column, table, text
+from sqlalchemy.orm import Query, Session
+
+from app.core.text import normalize_text
+from app.models import Transacao
+
+# Tamanho minimo de termo indexavel por trigramas (pg_trgm e FTS5 trigram).
+TAMANHO_MINIMO_TRIGRAMA = 3
+
+transacoes_fts = table("transacoes_fts", column("rowid"))
+
+
+def termos_busca(busca: str) -> List[str]:
+    return [termo for termo in normalize_text(busca).split() if termo]
+
+
+def _padrao_like(termo: str) -> str:
+    escapado = termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escapado}%"
+
+
+def filtrar_por_busca(query: Query, busca: str) -> Query:
+    """Aplica o filtro de busca (todos os termos) sobre a coluna normalizada."""
+    for termo in termos_busca(busca):
+        query = query.filter(Transacao.busca_normalizada.like(_padrao_like(termo), escape="\\"))
+    return query
+
+
+def _expressao_fts(termos: List[str]) -> str:
+    # Cada termo vira uma frase entre aspas: com o tokenizer trigram isso equivale a substring.
+    return " AND ".join('"' + termo.replace('"', '""') + '"' for termo in termos)
+
+
+def buscar_transacoes(db: Session, user_id: int, busca: str, limit: int = 50) -> List[Transacao]:
+    """
+    Busca ranqueada em descricao, observacoes e tags, sem diferenciar acentos.
+
+    PostgreSQL usa o indice GIN (pg_trgm) da coluna `busca_normalizada` e ordena por
+    similaridade; SQLite usa a tabela FTS5 `transacoes_fts` ordenada por bm25.
+    """
+    termos = termos_busca(busca)
+    if not termos:
+        return []
+
+    query = db.query(Transacao).filter(Transacao.user_id == user_id)
+    dialeto = db.get_bind().dialect.name
+    indexavel = all(len(termo) >= TAMANHO_MINIMO_TRIGRAMA for termo in termos)
+
+    if dialeto == "sqlite" and indexavel:
+        query = (
+            query.join(transacoes_fts, transacoes_fts.c.rowid == Transacao.id)
+            .filter(text("transacoes_fts MATCH :expressao_fts"))
+            .params(expressao_fts=_expressao_fts(termos))
+            .order_by(literal_column("bm25(transacoes_fts)"), Transacao.data.desc(), Transacao.id.desc())
+        )
+    elif dialeto == "postgresql":
+        query = filtrar_por_busca(query, busca).order_by(
+            func.similarity(Transacao.busca_normalizada, " ".join(termos)).desc(),
+            Transacao.data.desc(),
+            Transacao.id.desc(),
+        )
+    else:
+        query = filtrar_por_busca(query, busca).order_by(Transacao.data.desc(), Transacao.id.desc())
+
+    return query.limit(limit).all()
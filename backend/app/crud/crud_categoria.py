@@ -1,39 +1,59 @@
-from sqlalchemy import and_, func
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from app.core.text import normalize_text
 from app.models import Categoria, Transacao
 from app.schemas.categoria import CategoriaCreate, CategoriaUpdate
+from app.services.catalogo_categorias import CategoriaPadrao, catalogo_categorias
 
 
-def get_categorias(db: Session, user_id: int) -> List[Categoria]:
-    """Lista categorias padrao + categorias do usuario"""
-    return db.query(Categoria).filter(
-        (Categoria.user_id == None) | (Categoria.user_id == user_id)
-    ).all()
+def get_categorias(db: Session, user_id: int) -> List[Categoria | CategoriaPadrao]:
+    """Lista categorias padrao (catalogo em memoria) + categorias do usuario"""
+    proprias = db.query(Categoria).filter(Categoria.user_id == user_id).order_by(Categoria.id).all()
+    return [*catalogo_categorias.listar(db), *proprias]
 
 
-def get_categoria(db: Session, categoria_id: int, user_id: int) -> Optional[Categoria]:
+def get_categoria(db: Session, categoria_id: int, user_id: int) -> Optional[Categoria | CategoriaPadrao]:
+    padrao = catalogo_categorias.obter(db, categoria_id)
+    if padrao is not None:
+        return padrao
     return db.query(Categoria).filter(
         Categoria.id == categoria_id,
-        (Categoria.user_id == user_id) | (Categoria.user_id == None),
+        Categoria.user_id == user_id,
     ).first()
 
 
-def _nome_tipo_duplicado(db: Session, user_id: int, nome: str, tipo, ignorar_id: Optional[int] = None) -> bool:
-    query = db.query(Categoria).filter(
+MENSAGEM_DUPLICADA = "Ja existe categoria com este nome para este tipo."
+
+
+def get_categoria_por_nome(db: Session, user_id: int, tipo, nome: str) -> Optional[Categoria]:
+    """Categoria do usuario pelo nome sem acento/caixa (uma busca no indice unico)."""
+    return db.query(Categoria).filter(
         Categoria.user_id == user_id,
         Categoria.tipo == tipo,
-        func.lower(Categoria.nome) == nome.lower(),
-    )
-    if ignorar_id is not None:
-        query = query.filter(Categoria.id != ignorar_id)
-    return query.first() is not None
+        Categoria.nome_normalizado == normalize_text(nome),
+    ).first()
+
+
+def _nome_tipo_duplicado(db: Session, user_id: int, nome: str, tipo, ignorar_id: Optional[int] = None) -> bool:
+    existente = get_categoria_por_nome(db, user_id, tipo, nome)
+    return existente is not None and existente.id != ignorar_id
+
+
+def _commit_categoria(db: Session) -> None:
+    # Duas requisicoes simultaneas podem passar pela verificacao; o indice unico decide.
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        raise ValueError(MENSAGEM_DUPLICADA) from exc
 
 
 def criar_categoria(db: Session, categoria: CategoriaCreate, user_id: int) -> Categoria:
     if _nome_tipo_duplicado(db, user_id, categoria.nome, categoria.tipo):
-        raise ValueError("Ja existe categoria com este nome para este tipo.")
+        raise ValueError(MENSAGEM_DUPLICADA)
 
     db_categoria = Categoria(
         user_id=user_id,
@@ -44,7 +64,7 @@ def criar_categoria(db: Session, categoria: CategoriaCreate, user_id: int) -> Ca
         padrao=False,
     )
     db.add(db_categoria)
-    db.commit()
+    _commit_categoria(db)
     db.refresh(db_categoria)
     return db_categoria
 
@@ -64,13 +84,13 @@ def atualizar_categoria(db: Session, categoria_id: int, user_id: int, categoria_
     nome_final = update_data.get("nome", categoria.nome)
     tipo_final = update_data.get("tipo", categoria.tipo)
     if _nome_tipo_duplicado(db, user_id, nome_final, tipo_final, ignorar_id=categoria_id):
-        raise ValueError("Ja existe categoria com este nome para este tipo.")
+        raise ValueError(MENSAGEM_DUPLICADA)
 
     for key, value in update_data.items():
         setattr(categoria, key, value)
 
     db.add(categoria)
-    db.commit()
+    _commit_categoria(db)
     db.refresh(categoria)
     return categoria
 
@@ -1,8 +1,12 @@
+from datetime import date
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
+from sqlalchemy import and_, case, func
+from typing import Dict, List, Optional
 
-from app.models import Conta
+from app.core.money import para_centavos, de_centavos
+from app.crud import crud_saldo
+from app.crud.crud_transacao import valor_efetivo_sql
+from app.models import Conta, StatusLiquidacao, TipoTransacao, Transacao
 from app.models.financeiro import TipoConta
 from app.schemas.conta import ContaCreate, ContaUpdate
 
@@ -12,6 +16,61 @@ def get_contas(db: Session, user_id: int) -> List[Conta]:
     return db.query(Conta).filter(Conta.user_id == user_id).all()
 
 
+def get_resumo_contas(db: Session, user_id: int, referencia: Optional[date] = None) -> Dict[int, dict]:
+    """
+    Resumo por conta numa unica consulta agrupada.
+
+    - entradas/saidas/transferencias do mes: so o que foi liquidado, pela data de
+      liquidacao, do inicio do mes ate `referencia` (o mesmo movimento do saldo);
+    - pendencias: entradas e saidas previstas/atrasadas, em qualquer data. Uma
+      transacao entra ou no mes ou nas pendencias, nunca nas duas;
+    - transferencias (ex.: pagamento de fatura) saem da conta, mas ficam num total
+      proprio em vez de somar nas saidas;
+    - data da ultima movimentacao (qualquer status exceto cancelado).
+    """
+    referencia = referencia or date.today()
+    inicio_mes = referencia.replace(day=1)
+    efetivo = valor_efetivo_sql()
+    data_liquidacao = func.coalesce(Transacao.data_liquidacao, Transacao.data)
+    liquidado_no_mes = and_(
+        Transacao.status_liquidacao == StatusLiquidacao.LIQUIDADO,
+        data_liquidacao >= inicio_mes,
+        data_liquidacao <= referencia,
+    )
+    pendente = Transacao.status_liquidacao.in_([StatusLiquidacao.PREVISTO, StatusLiquidacao.ATRASADO])
+    entrada = Transacao.tipo == TipoTransacao.ENTRADA
+    saida = Transacao.tipo == TipoTransacao.SAIDA
+    transferencia = Transacao.tipo == TipoTransacao.TRANSFERENCIA
+
+    def soma(condicao):
+        return func.coalesce(func.sum(case((condicao, efetivo), else_=0.0)), 0.0)
+
+    linhas = db.query(
+        Transacao.conta_id,
+        soma(and_(liquidado_no_mes, entrada)).label("entradas_mes"),
+        soma(and_(liquidado_no_mes, saida)).label("saidas_mes"),
+        soma(and_(liquidado_no_mes, transferencia)).label("transferencias_mes"),
+        soma(and_(pendente, entrada)).label("pendente_entradas"),
+        soma(and_(pendente, saida)).label("pendente_saidas"),
+        func.max(case((Transacao.data <= referencia, Transacao.data))).label("ultima_movimentacao"),
+    ).filter(
+        Transacao.user_id == user_id,
+        Transacao.status_liquidacao != StatusLiquidacao.CANCELADO,
+    ).group_by(Transacao.conta_id).all()
+
+    return {
+        linha.conta_id: {
+            "entradas_mes": de_centavos(para_centavos(linha.entradas_mes)),
+            "saidas_mes": de_centavos(para_centavos(linha.saidas_mes)),
+            "transferencias_mes": de_centavos(para_centavos(linha.transferencias_mes)),
+            "pendente_entradas": de_centavos(para_centavos(linha.pendente_entradas)),
+            "pendente_saidas": de_centavos(para_centavos(linha.pendente_saidas)),
+            "ultima_movimentacao": linha.ultima_movimentacao,
+        }
+        for linha in linhas
+    }
+
+
 def get_conta(db: Session, conta_id: int, user_id: int) -> Optional[Conta]:
     """Busca uma conta específica"""
     return db.query(Conta).filter(
@@ -27,12 +86,17 @@ def criar_conta(db: Session, conta: ContaCreate, user_id: int) -> Conta:
     data = conta.model_dump()
     if data.get("tipo") == TipoConta.CARTAO_CREDITO:
         data["saldo"] = 0.0
+    saldo_inicial = data.pop("saldo", 0.0)
 
     db_conta = Conta(
         user_id=user_id,
+        saldo=0.0,
+        saldo_inicial=saldo_inicial,
         **data
     )
     db.add(db_conta)
+    db.flush()
+    crud_saldo.aplicar_variacao(db, db_conta, saldo_inicial, date.today())
     db.commit()
     db.refresh(db_conta)
     return db_conta
@@ -61,6 +125,14 @@ def atualizar_conta(db: Session, conta_id: int, user_id: int, conta_update: Cont
         # Cartao de credito nao usa saldo manual.
         update_data["saldo"] = 0.0
 
+    # Ajuste manual de saldo entra no livro diario como variacao do dia.
+    if "saldo" in update_data:
+        novo_saldo = update_data.pop("saldo")
+        if novo_saldo is not None:
+            ajuste = novo_saldo - (db_conta.saldo or 0.0)
+            db_conta.saldo_inicial = (db_conta.saldo_inicial or 0.0) + ajuste
+            crud_saldo.aplicar_variacao(db, db_conta, ajuste, date.today())
+
     for key, value in update_data.items():
         setattr(db_conta, key, value)
     
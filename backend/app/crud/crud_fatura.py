@@ -0,0 +1,501 @@
+"""
+Faturas de cartao de credito: periodos de fechamento, calculo e tabela `faturas`.
+
+Uma compra de data `d` pertence a fatura cujo fechamento e o primeiro dia de
+fechamento `>= d` (dias inexistentes no mes caem no ultimo dia). `particionar_faturas`
+distribui as saidas do cartao, ordenadas por data, entre os fechamentos de um
+intervalo numa unica passada.
+
+A tabela `faturas` guarda os totais de cada fatura com itens. Um listener de
+`before_flush` anota as faturas tocadas por escritas de `Transacao` (conta e data
+antigas e novas) e, no `after_flush_postexec`, somente essas faturas sao recalculadas.
+Mudancas no fechamento/vencimento (ou no tipo) da conta reconstroem todas as faturas
+do cartao. Escritas em massa (Core) precisam chamar `atualizar_faturas` ou
+`reconstruir_faturas` explicitamente, como faz `pagar_faturas`.
+
+A exposicao de cada cartao (limite utilizado) e a soma do valor em aberto das suas
+faturas, entao sai da mesma tabela com uma consulta agrupada (`resumo_cartoes`).
+"""
+import uuid
+from calendar import monthrange
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from sqlalchemy import case, delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.core.money import de_centavos, para_centavos, valor_efetivo_centavos
+from app.crud import crud_saldo
+from app.crud.crud_versao import incrementar_versao
+from app.db.upsert import upsert_valores
+from app.models import Conta, Fatura, StatusLiquidacao, TipoConta, TipoTransacao, Transacao
+from app.models.financeiro import texto_busca_transacao
+
+STATUS_EM_ABERTO = (StatusLiquidacao.PREVISTO, StatusLiquidacao.ATRASADO)
+ATRIBUTOS_CICLO_CONTA = ("tipo", "dia_fechamento", "dia_vencimento")
+
+_CHAVE_ALTERADAS = "faturas_alteradas"
+_CHAVE_RECONSTRUIR = "faturas_reconstruir"
+
+
+def _safe_date_with_day(year: int, month: int, day: int) -> date:
+    return date(year, month, min(day, monthrange(year, month)[1]))
+
+
+def _shift_month(base: date, months: int) -> date:
+    month_index = (base.month - 1) + months
+    year = base.year + (month_index // 12)
+    month = (month_index % 12) + 1
+    return date(year, month, 1)
+
+
+def calcular_periodo_fatura(ref_date: date, dia_fechamento: int) -> tuple[date, date]:
+    """Periodo da ultima fatura fechada ate `ref_date` (inclusive): a "fatura atual"."""
+    fechamento_mes_atual = _safe_date_with_day(ref_date.year, ref_date.month, dia_fechamento)
+    if ref_date.day >= fechamento_mes_atual.day:
+        periodo_fim = fechamento_mes_atual
+    else:
+        mes_anterior = _shift_month(ref_date, -1)
+        periodo_fim = _safe_date_with_day(mes_anterior.year, mes_anterior.month, dia_fechamento)
+    return periodo_por_fechamento(periodo_fim, dia_fechamento)
+
+
+def calcular_vencimento_fatura(periodo_fim: date, dia_vencimento: int) -> date:
+    if dia_vencimento > periodo_fim.day:
+        return _safe_date_with_day(periodo_fim.year, periodo_fim.month, dia_vencimento)
+    proximo_mes = _shift_month(periodo_fim, 1)
+    return _safe_date_with_day(proximo_mes.year, proximo_mes.month, dia_vencimento)
+
+
+def periodo_por_fechamento(fechamento: date, dia_fechamento: int) -> tuple[date, date]:
+    mes_antes = _shift_month(fechamento, -1)
+    fechamento_anterior = _safe_date_with_day(mes_antes.year, mes_antes.month, dia_fechamento)
+    return fechamento_anterior + timedelta(days=1), fechamento
+
+
+def fechamento_da_data(data: date, dia_fechamento: int) -> date:
+    """Fechamento da fatura que contem `data`."""
+    fechamento = _safe_date_with_day(data.year, data.month, dia_fechamento)
+    if data <= fechamento:
+        return fechamento
+    proximo_mes = _shift_month(data, 1)
+    return _safe_date_with_day(proximo_mes.year, proximo_mes.month, dia_fechamento)
+
+
+def fechamentos_entre(inicio: date, fim: date, dia_fechamento: int) -> list[date]:
+    """Fechamentos das faturas que cobrem `inicio`..`fim`, em ordem."""
+    fechamentos = []
+    atual = fechamento_da_data(inicio, dia_fechamento)
+    ultimo = fechamento_da_data(fim, dia_fechamento)
+    while atual <= ultimo:
+        fechamentos.append(atual)
+        proximo_mes = _shift_month(atual, 1)
+        atual = _safe_date_with_day(proximo_mes.year, proximo_mes.month, dia_fechamento)
+    return fechamentos
+
+
+@dataclass
+class FaturaCalculada:
+    periodo_inicio: date
+    periodo_fim: date
+    data_vencimento: date
+    quantidade_itens: int = 0
+    itens_em_aberto: int = 0
+    total_centavos: int = 0
+    em_aberto_centavos: int = 0
+    pago_centavos: int = 0
+
+    def valores(self) -> dict:
+        return {
+            "periodo_inicio": self.periodo_inicio,
+            "data_vencimento": self.data_vencimento,
+            "quantidade_itens": self.quantidade_itens,
+            "itens_em_aberto": self.itens_em_aberto,
+            "valor_total": de_centavos(self.total_centavos),
+            "valor_em_aberto": de_centavos(self.em_aberto_centavos),
+            "valor_pago": de_centavos(self.pago_centavos),
+        }
+
+
+def particionar_faturas(
+    itens: Iterable[tuple],
+    dia_fechamento: int,
+    dia_vencimento: int,
+    inicio: date,
+    fim: date,
+) -> list[FaturaCalculada]:
+    """
+    Distribui `itens` (data, status, valor, multa, juros, desconto), ordenados por data,
+    entre as faturas que cobrem `inicio`..`fim`. Itens fora do intervalo sao ignorados.
+    """
+    faturas = []
+    for fechamento in fechamentos_entre(inicio, fim, dia_fechamento):
+        periodo_inicio, periodo_fim = periodo_por_fechamento(fechamento, dia_fechamento)
+        faturas.append(
+            FaturaCalculada(
+                periodo_inicio=periodo_inicio,
+                periodo_fim=periodo_fim,
+                data_vencimento=calcular_vencimento_fatura(periodo_fim, dia_vencimento),
+            )
+        )
+
+    indice = 0
+    for data, status, valor, multa, juros, desconto in itens:
+        if data < faturas[0].periodo_inicio:
+            continue
+        while indice < len(faturas) and faturas[indice].periodo_fim < data:
+            indice += 1
+        if indice == len(faturas):
+            break
+        fatura = faturas[indice]
+        centavos = valor_efetivo_centavos(valor, multa, juros, desconto)
+        fatura.quantidade_itens += 1
+        fatura.total_centavos += centavos
+        if status in STATUS_EM_ABERTO:
+            fatura.itens_em_aberto += 1
+            fatura.em_aberto_centavos += centavos
+        elif status == StatusLiquidacao.LIQUIDADO:
+            fatura.pago_centavos += centavos
+    return faturas
+
+
+def _consulta_itens(conta_id: int, inicio: Optional[date] = None, fim: Optional[date] = None):
+    stmt = select(
+        Transacao.data,
+        Transacao.status_liquidacao,
+        Transacao.valor,
+        Transacao.valor_multa,
+        Transacao.valor_juros,
+        Transacao.valor_desconto,
+    ).where(
+        Transacao.conta_id == conta_id,
+        Transacao.tipo == TipoTransacao.SAIDA,
+        Transacao.status_liquidacao != StatusLiquidacao.CANCELADO,
+    )
+    if inicio is not None:
+        stmt = stmt.where(Transacao.data >= inicio)
+    if fim is not None:
+        stmt = stmt.where(Transacao.data <= fim)
+    return stmt.order_by(Transacao.data, Transacao.id)
+
+
+def calcular_faturas(db: Session, conta: Conta, inicio: date, fim: date) -> list[FaturaCalculada]:
+    """Calcula as faturas do intervalo direto das transacoes (uma consulta ordenada)."""
+    fechamentos = fechamentos_entre(inicio, fim, conta.dia_fechamento)
+    periodo_inicio = periodo_por_fechamento(fechamentos[0], conta.dia_fechamento)[0]
+    itens = db.execute(_consulta_itens(conta.id, periodo_inicio, fechamentos[-1]))
+    return particionar_faturas(itens, conta.dia_fechamento, conta.dia_vencimento, inicio, fim)
+
+
+def listar_faturas(db: Session, conta: Conta, inicio: date, fim: date) -> list[FaturaCalculada]:
+    """Faturas do intervalo lidas da tabela `faturas`; periodos sem itens vem zerados."""
+    fechamentos = fechamentos_entre(inicio, fim, conta.dia_fechamento)
+    armazenadas = {
+        f.periodo_fim: f
+        for f in db.query(Fatura).filter(
+            Fatura.conta_id == conta.id,
+            Fatura.periodo_fim >= fechamentos[0],
+            Fatura.periodo_fim <= fechamentos[-1],
+        )
+    }
+    resultado = []
+    for fechamento in fechamentos:
+        periodo_inicio, periodo_fim = periodo_por_fechamento(fechamento, conta.dia_fechamento)
+        fatura = FaturaCalculada(
+            periodo_inicio=periodo_inicio,
+            periodo_fim=periodo_fim,
+            data_vencimento=calcular_vencimento_fatura(periodo_fim, conta.dia_vencimento),
+        )
+        linha = armazenadas.get(fechamento)
+        if linha is not None:
+            fatura.quantidade_itens = linha.quantidade_itens
+            fatura.itens_em_aberto = linha.itens_em_aberto
+            fatura.total_centavos = para_centavos(linha.valor_total)
+            fatura.em_aberto_centavos = para_centavos(linha.valor_em_aberto)
+            fatura.pago_centavos = para_centavos(linha.valor_pago)
+        resultado.append(fatura)
+    return resultado
+
+
+def _cartoes(db: Session, conta_ids: Iterable[int]) -> dict[int, tuple]:
+    linhas = db.execute(
+        select(Conta.id, Conta.user_id, Conta.dia_fechamento, Conta.dia_vencimento).where(
+            Conta.id.in_(list(conta_ids)),
+            Conta.tipo == TipoConta.CARTAO_CREDITO,
+            Conta.dia_fechamento.is_not(None),
+            Conta.dia_vencimento.is_not(None),
+        )
+    )
+    return {linha.id: linha for linha in linhas}
+
+
+def _gravar_fatura(db: Session, conta_id: int, user_id: int, fatura: FaturaCalculada) -> None:
+    if fatura.quantidade_itens == 0:
+        db.execute(
+            delete(Fatura).where(Fatura.conta_id == conta_id, Fatura.periodo_fim == fatura.periodo_fim)
+        )
+        return
+    upsert_valores(
+        db,
+        Fatura.__table__,
+        {"conta_id": conta_id, "periodo_fim": fatura.periodo_fim},
+        {"user_id": user_id, **fatura.valores()},
+    )
+
+
+def atualizar_faturas(db: Session, datas_por_conta: Mapping[int, Iterable[date]]) -> None:
+    """Recalcula apenas as faturas que contem as datas informadas de cada cartao."""
+    cartoes = _cartoes(db, datas_por_conta)
+    for conta_id, cartao in cartoes.items():
+        fechamentos = sorted({fechamento_da_data(d, cartao.dia_fechamento) for d in datas_por_conta[conta_id]})
+        for fechamento in fechamentos:
+            periodo_inicio, periodo_fim = periodo_por_fechamento(fechamento, cartao.dia_fechamento)
+            itens = db.execute(_consulta_itens(conta_id, periodo_inicio, periodo_fim))
+            (fatura,) = particionar_faturas(
+                itens, cartao.dia_fechamento, cartao.dia_vencimento, periodo_inicio, periodo_fim
+            )
+            _gravar_fatura(db, conta_id, cartao.user_id, fatura)
+
+
+def reconstruir_faturas(db: Session, conta_id: int) -> int:
+    """Regrava todas as faturas do cartao a partir das transacoes; retorna quantas tem itens."""
+    db.execute(delete(Fatura).where(Fatura.conta_id == conta_id))
+    cartao = _cartoes(db, [conta_id]).get(conta_id)
+    if cartao is None:
+        return 0
+    itens = db.execute(_consulta_itens(conta_id)).all()
+    if not itens:
+        return 0
+    faturas = particionar_faturas(
+        itens, cartao.dia_fechamento, cartao.dia_vencimento, itens[0].data, itens[-1].data
+    )
+    com_itens = [f for f in faturas if f.quantidade_itens]
+    for fatura in com_itens:
+        _gravar_fatura(db, conta_id, cartao.user_id, fatura)
+    return len(com_itens)
+
+
+@dataclass
+class ResumoCartao:
+    conta_id: int
+    conta_nome: str
+    limite_credito: Optional[float]
+    faturas_fechadas_centavos: int
+    fatura_aberta_centavos: int
+    faturas_futuras_centavos: int
+
+    @property
+    def utilizado_centavos(self) -> int:
+        return self.faturas_fechadas_centavos + self.fatura_aberta_centavos + self.faturas_futuras_centavos
+
+    @property
+    def disponivel_centavos(self) -> Optional[int]:
+        if self.limite_credito is None:
+            return None
+        return para_centavos(self.limite_credito) - self.utilizado_centavos
+
+
+def _soma_em_aberto(condicao):
+    return func.coalesce(func.sum(case((condicao, Fatura.valor_em_aberto), else_=0)), 0)
+
+
+def resumo_cartoes(db: Session, user_id: int, referencia: Optional[date] = None) -> list[ResumoCartao]:
+    """
+    Valor em aberto de cada cartao do usuario, separado em faturas fechadas (ate
+    `referencia`, inclusive a fatura atual), fatura aberta e faturas futuras (parcelas).
+    """
+    referencia = referencia or date.today()
+    linhas = db.execute(
+        select(
+            Conta.id,
+            Conta.nome,
+            Conta.limite_credito,
+            _soma_em_aberto(Fatura.periodo_fim <= referencia).label("fechadas"),
+            _soma_em_aberto((Fatura.periodo_inicio <= referencia) & (Fatura.periodo_fim > referencia)).label("aberta"),
+            _soma_em_aberto(Fatura.periodo_inicio > referencia).label("futuras"),
+        )
+        .outerjoin(Fatura, Fatura.conta_id == Conta.id)
+        .where(Conta.user_id == user_id, Conta.tipo == TipoConta.CARTAO_CREDITO)
+        .group_by(Conta.id, Conta.nome, Conta.limite_credito)
+        .order_by(Conta.nome, Conta.id)
+    )
+    return [
+        ResumoCartao(
+            conta_id=linha.id,
+            conta_nome=linha.nome,
+            limite_credito=linha.limite_credito,
+            faturas_fechadas_centavos=para_centavos(linha.fechadas),
+            fatura_aberta_centavos=para_centavos(linha.aberta),
+            faturas_futuras_centavos=para_centavos(linha.futuras),
+        )
+        for linha in linhas
+    ]
+
+
+@dataclass
+class FaturaPaga:
+    conta: Conta
+    periodo_inicio: date
+    periodo_fim: date
+    data_vencimento: date
+    quantidade_itens: int = 0
+    valor_centavos: int = 0
+    # Linhas devolvidas pelo UPDATE ... RETURNING (itens liquidados), por data e id.
+    itens: list[Any] = field(default_factory=list)
+
+
+def _linha_pagamento(user_id: int, conta_pagamento: Conta, fatura: FaturaPaga, data_pagamento: date, descricao: str) -> dict:
+    return {
+        "user_id": user_id,
+        "conta_id": conta_pagamento.id,
+        "categoria_id": None,
+        "descricao": descricao,
+        "valor": de_centavos(fatura.valor_centavos),
+        "tipo": TipoTransacao.TRANSFERENCIA,
+        "data": data_pagamento,
+        "data_vencimento": data_pagamento,
+        "data_liquidacao": data_pagamento,
+        "status_liquidacao": StatusLiquidacao.LIQUIDADO,
+        "fixa": False,
+        "recorrente": False,
+        "confirmada": True,
+        "transacao_uuid": str(uuid.uuid4()),
+        "tem_dizimo": False,
+        "percentual_dizimo": 0,
+        "e_dizimo": False,
+        "parcelado": False,
+        "e_emprestimo": False,
+        "busca_normalizada": texto_busca_transacao(descricao, None, None),
+        "valor_multa": 0,
+        "valor_juros": 0,
+        "valor_desconto": 0,
+    }
+
+
+def pagar_faturas(
+    db: Session,
+    user_id: int,
+    cartoes: Sequence[Conta],
+    conta_pagamento: Conta,
+    data_pagamento: date,
+    descricao: Optional[str] = None,
+    referencia: Optional[date] = None,
+) -> list[FaturaPaga]:
+    """
+    Liquida os itens em aberto da fatura atual de cada cartao e debita `conta_pagamento`.
+
+    Cada cartao e liquidado com um unico `UPDATE ... RETURNING` (itens ja liquidados por
+    um pagamento concorrente nao entram de novo); as transferencias de controle vao num
+    unico INSERT e o saldo da conta de pagamento muda uma vez. Nao faz commit.
+    """
+    referencia = referencia or date.today()
+    tabela = Transacao.__table__
+    pagas: list[FaturaPaga] = []
+    datas_por_conta: dict[int, set[date]] = {}
+    periodos = {(data_pagamento.year, data_pagamento.month)}
+
+    for cartao in cartoes:
+        periodo_inicio, periodo_fim = calcular_periodo_fatura(referencia, cartao.dia_fechamento)
+        liquidados = db.execute(
+            update(tabela)
+            .where(
+                tabela.c.user_id == user_id,
+                tabela.c.conta_id == cartao.id,
+                tabela.c.tipo == TipoTransacao.SAIDA,
+                tabela.c.data >= periodo_inicio,
+                tabela.c.data <= periodo_fim,
+                tabela.c.status_liquidacao.in_(STATUS_EM_ABERTO),
+            )
+            .values(status_liquidacao=StatusLiquidacao.LIQUIDADO, data_liquidacao=data_pagamento)
+            .returning(
+                tabela.c.id,
+                tabela.c.descricao,
+                tabela.c.data,
+                tabela.c.data_vencimento,
+                tabela.c.valor,
+                tabela.c.valor_multa,
+                tabela.c.valor_juros,
+                tabela.c.valor_desconto,
+            )
+        ).all()
+        liquidados.sort(key=lambda linha: (linha.data, linha.id))
+        paga = FaturaPaga(
+            conta=cartao,
+            periodo_inicio=periodo_inicio,
+            periodo_fim=periodo_fim,
+            data_vencimento=calcular_vencimento_fatura(periodo_fim, cartao.dia_vencimento),
+            quantidade_itens=len(liquidados),
+            valor_centavos=sum(
+                valor_efetivo_centavos(linha.valor, linha.valor_multa, linha.valor_juros, linha.valor_desconto)
+                for linha in liquidados
+            ),
+            itens=liquidados,
+        )
+        pagas.append(paga)
+        if liquidados:
+            datas = {linha.data for linha in liquidados}
+            datas_por_conta[cartao.id] = datas
+            periodos.update((d.year, d.month) for d in datas)
+
+    pagamentos = [
+        _linha_pagamento(
+            user_id,
+            conta_pagamento,
+            paga,
+            data_pagamento,
+            descricao
+            or f"Pagamento fatura {paga.conta.nome} ({paga.periodo_inicio.strftime('%m/%Y')} - {paga.periodo_fim.strftime('%m/%Y')})",
+        )
+        for paga in pagas
+        if paga.valor_centavos
+    ]
+    if pagamentos:
+        db.execute(insert(tabela), pagamentos)
+        crud_saldo.aplicar_variacao(
+            db, conta_pagamento, -de_centavos(sum(p.valor_centavos for p in pagas)), data_pagamento
+        )
+    if datas_por_conta:
+        # O UPDATE/INSERT acima nao passa pelo flush: versoes e faturas sao atualizadas aqui.
+        incrementar_versao(db, user_id, periodos)
+        atualizar_faturas(db, datas_por_conta)
+    return pagas
+
+
+def _valores_atributo(objeto, atributo: str) -> set:
+    historico = inspect(objeto).attrs[atributo].history
+    return {v for v in (*historico.added, *historico.unchanged, *historico.deleted) if v is not None}
+
+
+@event.listens_for(Session, "before_flush")
+def _anotar_faturas_alteradas(session: Session, flush_context, instances) -> None:
+    alteradas: dict[int, set[date]] = session.info.setdefault(_CHAVE_ALTERADAS, {})
+    reconstruir: set[int] = session.info.setdefault(_CHAVE_RECONSTRUIR, set())
+    for objeto in (*session.new, *session.dirty, *session.deleted):
+        if objeto in session.dirty and not session.is_modified(objeto, include_collections=False):
+            continue
+        if isinstance(objeto, Transacao):
+            datas = _valores_atributo(objeto, "data")
+            for conta_id in _valores_atributo(objeto, "conta_id"):
+                alteradas.setdefault(conta_id, set()).update(datas)
+        elif isinstance(objeto, Conta) and objeto.id is not None:
+            estado = inspect(objeto)
+            if objeto in session.deleted or any(estado.attrs[a].history.has_changes() for a in ATRIBUTOS_CICLO_CONTA):
+                reconstruir.add(objeto.id)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _atualizar_faturas_alteradas(session: Session, flush_context) -> None:
+    alteradas = session.info.pop(_CHAVE_ALTERADAS, None) or {}
+    reconstruir = session.info.pop(_CHAVE_RECONSTRUIR, None) or set()
+    for conta_id in reconstruir:
+        reconstruir_faturas(session, conta_id)
+    pendentes = {conta_id: datas for conta_id, datas in alteradas.items() if conta_id not in reconstruir}
+    if pendentes:
+        atualizar_faturas(session, pendentes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_faturas_alteradas(session: Session) -> None:
+    session.info.pop(_CHAVE_ALTERADAS, None)
+    session.info.pop(_CHAVE_RECONSTRUIR, None)
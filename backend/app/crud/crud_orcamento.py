@@ -2,37 +2,64 @@ from calendar import monthrange
 from datetime import date
 from typing import List, Optional
 
-from sqlalchemy import and_
+from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
 
-from app.models import Orcamento, StatusLiquidacao, TipoTransacao, Transacao
+from app.core.money import de_centavos, para_centavos
+from app.crud.crud_transacao import valor_efetivo_sql
+from app.crud import crud_alerta
+from app.models import AlertaOrcamento, Orcamento, StatusLiquidacao, TipoTransacao, Transacao
 from app.schemas.orcamento import OrcamentoCreate, OrcamentoUpdate
-
-
-def _valor_efetivo_transacao(transacao: Transacao) -> float:
-    return max(
-        0.0,
-        (transacao.valor or 0)
-        + (transacao.valor_multa or 0)
-        + (transacao.valor_juros or 0)
-        - (transacao.valor_desconto or 0),
-    )
+from app.services import analise
 
 
 def _calcular_valor_gasto_orcamento(db: Session, orcamento: Orcamento) -> float:
     inicio = date(orcamento.ano, orcamento.mes, 1)
     fim = date(orcamento.ano, orcamento.mes, monthrange(orcamento.ano, orcamento.mes)[1])
 
-    transacoes = db.query(Transacao).filter(
+    total = db.query(func.coalesce(func.sum(valor_efetivo_sql()), 0.0)).filter(
         Transacao.user_id == orcamento.user_id,
         Transacao.categoria_id == orcamento.categoria_id,
         Transacao.tipo == TipoTransacao.SAIDA,
         Transacao.data >= inicio,
         Transacao.data <= fim,
         Transacao.status_liquidacao != StatusLiquidacao.CANCELADO,
-    ).all()
-
-    return sum(_valor_efetivo_transacao(t) for t in transacoes)
+    ).scalar()
+
+    return de_centavos(para_centavos(float(total or 0.0)))
+
+
+def _preencher_valores_gastos(db: Session, user_id: int, orcamentos: List[Orcamento]) -> None:
+    """Valor gasto de varios orcamentos com uma unica consulta agrupada por (categoria, mes)."""
+    if not orcamentos:
+        return
+    meses = [analise.chave_mes_de(o.ano, o.mes) for o in orcamentos]
+    inicio_ano, inicio_mes = divmod(min(meses), 12)
+    fim_ano, fim_mes = divmod(max(meses), 12)
+    inicio = date(inicio_ano, inicio_mes + 1, 1)
+    fim = date(fim_ano, fim_mes + 1, monthrange(fim_ano, fim_mes + 1)[1])
+
+    quadro = analise.Quadro.de_consulta(
+        db,
+        select(
+            Transacao.categoria_id,
+            Transacao.data,
+            Transacao.valor,
+            Transacao.valor_multa,
+            Transacao.valor_juros,
+            Transacao.valor_desconto,
+        ).where(
+            Transacao.user_id == user_id,
+            Transacao.categoria_id.in_({o.categoria_id for o in orcamentos}),
+            Transacao.tipo == TipoTransacao.SAIDA,
+            Transacao.data >= inicio,
+            Transacao.data <= fim,
+            Transacao.status_liquidacao != StatusLiquidacao.CANCELADO,
+        ),
+    )
+    gastos = analise.somar_por_pares(quadro["categoria_id"], analise.chave_mes(quadro["data"]), quadro.valor_efetivo())
+    for orcamento, mes in zip(orcamentos, meses):
+        orcamento.valor_gasto = de_centavos(gastos.get((orcamento.categoria_id, mes), 0))
 
 
 def get_orcamentos(db: Session, user_id: int, mes: Optional[int] = None, ano: Optional[int] = None) -> List[Orcamento]:
@@ -45,8 +72,7 @@ def get_orcamentos(db: Session, user_id: int, mes: Optional[int] = None, ano: Op
         query = query.filter(Orcamento.ano == ano)
 
     orcamentos = query.all()
-    for orcamento in orcamentos:
-        orcamento.valor_gasto = _calcular_valor_gasto_orcamento(db, orcamento)
+    _preencher_valores_gastos(db, user_id, orcamentos)
     return orcamentos
 
 
@@ -86,10 +112,13 @@ def criar_orcamento(db: Session, orcamento: OrcamentoCreate, user_id: int) -> Or
         user_id=user_id,
         **orcamento.model_dump(),
     )
+    # O gasto gravado e a base das variacoes aplicadas pelas escritas de transacao.
+    db_orcamento.valor_gasto = _calcular_valor_gasto_orcamento(db, db_orcamento)
     db.add(db_orcamento)
+    db.flush()
+    crud_alerta.avaliar_orcamento(db, db_orcamento, 0.0, db_orcamento.valor_planejado)
     db.commit()
     db.refresh(db_orcamento)
-    db_orcamento.valor_gasto = _calcular_valor_gasto_orcamento(db, db_orcamento)
     return db_orcamento
 
 
@@ -99,6 +128,7 @@ def atualizar_orcamento(db: Session, orcamento_id: int, user_id: int, orcamento_
     if not db_orcamento:
         return None
 
+    gasto_antes, planejado_antes = db_orcamento.valor_gasto, db_orcamento.valor_planejado
     update_data = orcamento_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_orcamento, key, value)
@@ -106,9 +136,10 @@ def atualizar_orcamento(db: Session, orcamento_id: int, user_id: int, orcamento_
     db_orcamento.valor_gasto = _calcular_valor_gasto_orcamento(db, db_orcamento)
 
     db.add(db_orcamento)
+    db.flush()
+    crud_alerta.avaliar_orcamento(db, db_orcamento, gasto_antes, planejado_antes)
     db.commit()
     db.refresh(db_orcamento)
-    db_orcamento.valor_gasto = _calcular_valor_gasto_orcamento(db, db_orcamento)
     return db_orcamento
 
 
@@ -123,6 +154,7 @@ def deletar_orcamento(db: Session, orcamento_id: int, user_id: int) -> bool:
     if not db_orcamento:
         return False
 
+    db.query(AlertaOrcamento).filter(AlertaOrcamento.orcamento_id == db_orcamento.id).delete(synchronize_session=False)
     db.delete(db_orcamento)
     db.commit()
     return True
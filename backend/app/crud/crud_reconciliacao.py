@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from app.core.money import de_centavos, para_centavos
+from app.crud import crud_saldo
+from app.crud.crud_transacao import valor_efetivo_sql
+from app.models import Conta, SaldoDiario, StatusLiquidacao, TipoConta, TipoTransacao, Transacao
+
+TAMANHO_LOTE = 500
+
+
+@dataclass
+class DivergenciaSaldo:
+    conta_id: int
+    user_id: int
+    conta_nome: str
+    saldo_atual: float
+    saldo_esperado: float
+
+    @property
+    def diferenca(self) -> float:
+        return de_centavos(para_centavos(self.saldo_esperado) - para_centavos(self.saldo_atual))
+
+
+def calcular_divergencias(db: Session, user_id: Optional[int] = None) -> tuple[int, List[DivergenciaSaldo]]:
+    """
+    Recalcula o saldo esperado de todas as contas numa unica agregacao SQL.
+
+    Saldo esperado = `saldo_inicial` + soma do impacto das transacoes liquidadas
+    (entrada soma, saida/transferencia subtrai). Cartao de credito nao movimenta
+    saldo: os itens pagos saem da conta de pagamento.
+    Retorna o total de contas verificadas e as que divergem.
+    """
+    efetivo = valor_efetivo_sql()
+    impacto = func.coalesce(
+        func.sum(case((Transacao.tipo == TipoTransacao.ENTRADA, efetivo), else_=-efetivo)),
+        0.0,
+    )
+    query = (
+        db.query(Conta.id, Conta.user_id, Conta.nome, Conta.saldo, Conta.saldo_inicial, impacto)
+        .outerjoin(
+            Transacao,
+            and_(
+                Transacao.conta_id == Conta.id,
+                Transacao.status_liquidacao == StatusLiquidacao.LIQUIDADO,
+                Conta.tipo != TipoConta.CARTAO_CREDITO,
+            ),
+        )
+        .group_by(Conta.id, Conta.user_id, Conta.nome, Conta.saldo, Conta.saldo_inicial)
+        .order_by(Conta.id)
+    )
+    if user_id is not None:
+        query = query.filter(Conta.user_id == user_id)
+
+    total_contas = 0
+    divergencias: List[DivergenciaSaldo] = []
+    for conta_id, conta_user_id, nome, saldo, saldo_inicial, soma_impacto in query.all():
+        total_contas += 1
+        esperado = de_centavos(para_centavos(saldo_inicial) + para_centavos(float(soma_impacto or 0.0)))
+        atual = float(saldo or 0.0)
+        if para_centavos(esperado) != para_centavos(atual):
+            divergencias.append(
+                DivergenciaSaldo(
+                    conta_id=conta_id,
+                    user_id=conta_user_id,
+                    conta_nome=nome,
+                    saldo_atual=atual,
+                    saldo_esperado=esperado,
+                )
+            )
+    return total_contas, divergencias
+
+
+def corrigir_divergencias(
+    db: Session,
+    divergencias: List[DivergenciaSaldo],
+    tamanho_lote: int = TAMANHO_LOTE,
+) -> int:
+    """
+    Grava o saldo esperado nas contas divergentes, em lotes (um commit por lote).
+
+    O livro diario e acertado para somar o saldo corrigido: a diferenca entre o saldo
+    esperado e a soma das variacoes entra no primeiro dia do historico da conta. Assim o
+    `saldo-historico` nao ganha um salto no dia da reconciliacao (quando so `Conta.saldo`
+    tinha divergido, o livro ja estava certo e nada e lancado).
+    """
+    corrigidas = 0
+    hoje = date.today()
+    for inicio in range(0, len(divergencias), tamanho_lote):
+        lote = {d.conta_id: d for d in divergencias[inicio:inicio + tamanho_lote]}
+        contas = db.query(Conta).filter(Conta.id.in_(lote.keys())).all()
+        livros = {
+            conta_id: (primeiro_dia, soma)
+            for conta_id, primeiro_dia, soma in db.query(
+                SaldoDiario.conta_id, func.min(SaldoDiario.data), func.sum(SaldoDiario.variacao)
+            )
+            .filter(SaldoDiario.conta_id.in_(lote.keys()))
+            .group_by(SaldoDiario.conta_id)
+            .all()
+        }
+        for conta in contas:
+            esperado = lote[conta.id].saldo_esperado
+            primeiro_dia, soma_livro = livros.get(conta.id, (None, 0.0))
+            ajuste_livro = para_centavos(esperado) - para_centavos(float(soma_livro or 0.0))
+            if ajuste_livro:
+                data_ajuste = primeiro_dia or (conta.created_at.date() if conta.created_at else hoje)
+                crud_saldo.registrar_variacao(db, conta, de_centavos(ajuste_livro), data_ajuste)
+            conta.saldo = esperado
+            db.add(conta)
+            corrigidas += 1
+        db.commit()
+    return corrigidas
@@ -0,0 +1,70 @@
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app.core.money import de_centavos, para_centavos
+from app.db.upsert import upsert_incremento
+from app.models import Conta, SaldoDiario
+
+
+def aplicar_variacao(db: Session, conta: Conta, valor: float, data: date) -> None:
+    """Aplica `valor` ao saldo da conta e registra a variacao no livro diario."""
+    if not valor:
+        return
+    conta.saldo = de_centavos(para_centavos(conta.saldo) + para_centavos(valor))
+    registrar_variacao(db, conta, valor, data)
+
+
+def registrar_variacao(db: Session, conta: Conta, valor: float, data: date) -> None:
+    """Soma `valor` a variacao do dia no livro diario, sem mexer em `Conta.saldo`."""
+    upsert_incremento(
+        db,
+        SaldoDiario.__table__,
+        {"conta_id": conta.id, "data": data},
+        {"variacao": valor},
+        fixos={"user_id": conta.user_id},
+    )
+
+
+def _datas_fechamento(inicio: date, fim: date, granularidade: str) -> List[date]:
+    if granularidade == "mes":
+        datas = []
+        atual = inicio
+        while atual <= fim:
+            fim_mes = date(atual.year, atual.month, monthrange(atual.year, atual.month)[1])
+            datas.append(min(fim_mes, fim))
+            atual = fim_mes + timedelta(days=1)
+        return datas
+    return [inicio + timedelta(days=offset) for offset in range((fim - inicio).days + 1)]
+
+
+def get_saldo_historico(
+    db: Session,
+    conta: Conta,
+    inicio: date,
+    fim: date,
+    granularidade: str = "dia",
+) -> List[tuple[date, float]]:
+    """
+    Saldo de fechamento da conta em cada dia (ou fim de mes) de [inicio, fim].
+
+    O fechamento de um dia e o saldo atual menos as variacoes posteriores a ele,
+    entao basta uma leitura por faixa em `saldos_diarios` (conta_id, data >= inicio).
+    """
+    variacoes = db.query(SaldoDiario.data, SaldoDiario.variacao).filter(
+        SaldoDiario.conta_id == conta.id,
+        SaldoDiario.data > inicio,
+    ).order_by(SaldoDiario.data.desc()).all()
+
+    saldo = para_centavos(conta.saldo)
+    indice = 0
+    historico: List[tuple[date, float]] = []
+    for data_fechamento in reversed(_datas_fechamento(inicio, fim, granularidade)):
+        while indice < len(variacoes) and variacoes[indice].data > data_fechamento:
+            saldo -= para_centavos(variacoes[indice].variacao)
+            indice += 1
+        historico.append((data_fechamento, de_centavos(saldo)))
+    historico.reverse()
+    return historico
@@ -0,0 +1,101 @@
+"""
+Sincronizacao incremental: entidades criadas, alteradas ou excluidas depois de um cursor.
+
+Criacoes e edicoes sao lidas pelo indice `(user_id, updated_at)` de cada tabela.
+Exclusoes viram marcas em `registros_excluidos`, gravadas por um listener de
+`before_flush` na mesma transacao do delete.
+
+O cursor devolvido e o relogio do banco menos `SYNC_MARGEM_SEGUNDOS`: no PostgreSQL
+`now()` e o inicio da transacao, entao uma escrita que ainda nao tinha sido
+confirmada no momento da leitura pode ter `updated_at` anterior a ela. A margem faz
+a proxima chamada reenviar as ultimas alteracoes, e o cliente as aplica como upsert.
+Cursores mais antigos que a retencao das exclusoes recebem um retrato completo.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import event, func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import crud_transacao
+from app.models import Categoria, Conta, Meta, Orcamento, RegistroExcluido, Transacao
+
+TABELAS_SYNC = {
+    "contas": Conta,
+    "categorias": Categoria,
+    "metas": Meta,
+    "orcamentos": Orcamento,
+    "transacoes": Transacao,
+}
+_TABELA_POR_MODELO = {modelo: nome for nome, modelo in TABELAS_SYNC.items()}
+
+
+@event.listens_for(Session, "before_flush")
+def _registrar_exclusoes(session: Session, flush_context, instances) -> None:
+    for objeto in list(session.deleted):
+        tabela = _TABELA_POR_MODELO.get(type(objeto))
+        if tabela is not None:
+            session.add(RegistroExcluido(user_id=objeto.user_id, tabela=tabela, registro_id=objeto.id))
+
+
+def _em_utc(valor: datetime) -> datetime:
+    # SQLite devolve o horario UTC sem fuso.
+    return valor.replace(tzinfo=timezone.utc) if valor.tzinfo is None else valor.astimezone(timezone.utc)
+
+
+def _filtro_usuario(modelo, user_id: int):
+    if modelo is Categoria or modelo is RegistroExcluido:
+        # Categorias padrao do sistema (user_id nulo) fazem parte dos dados de todos.
+        return or_(modelo.user_id == user_id, modelo.user_id.is_(None))
+    return modelo.user_id == user_id
+
+
+def obter_alteracoes(db: Session, user_id: int, desde: Optional[datetime] = None) -> dict[str, Any]:
+    """
+    Alteracoes do usuario depois de `desde` (retrato completo quando `desde` e `None`
+    ou anterior a retencao das exclusoes).
+    """
+    agora = _em_utc(db.query(func.now()).scalar())
+    horizonte = agora - timedelta(days=settings.SYNC_RETENCAO_EXCLUSOES_DIAS)
+    if desde is not None:
+        desde = _em_utc(desde)
+    completo = desde is None or desde < horizonte
+    limite = None if completo else desde
+
+    resultado: dict[str, Any] = {
+        "cursor": agora - timedelta(seconds=settings.SYNC_MARGEM_SEGUNDOS),
+        "completo": completo,
+    }
+    for nome, modelo in TABELAS_SYNC.items():
+        if modelo is Transacao:
+            continue
+        query = db.query(modelo).filter(_filtro_usuario(modelo, user_id))
+        if limite is not None:
+            query = query.filter(modelo.updated_at > limite)
+        resultado[nome] = query.order_by(modelo.id).all()
+    resultado["transacoes"] = crud_transacao.get_transacoes_linhas(
+        db, user_id, skip=0, limit=None, alterado_desde=limite
+    )
+
+    excluidos: dict[str, list[int]] = {nome: [] for nome in TABELAS_SYNC}
+    if limite is not None:
+        marcas = (
+            db.query(RegistroExcluido.tabela, RegistroExcluido.registro_id)
+            .filter(_filtro_usuario(RegistroExcluido, user_id), RegistroExcluido.excluido_em > limite)
+            .order_by(RegistroExcluido.id)
+        )
+        for tabela, registro_id in marcas:
+            excluidos[tabela].append(registro_id)
+    resultado["excluidos"] = excluidos
+    return resultado
+
+
+def limpar_exclusoes_antigas(db: Session, user_id: int) -> int:
+    """Remove as marcas de exclusao do usuario mais antigas que a retencao."""
+    horizonte = _em_utc(db.query(func.now()).scalar()) - timedelta(days=settings.SYNC_RETENCAO_EXCLUSOES_DIAS)
+    return (
+        db.query(RegistroExcluido)
+        .filter(RegistroExcluido.user_id == user_id, RegistroExcluido.excluido_em < horizonte)
+        .delete(synchronize_session=False)
+    )
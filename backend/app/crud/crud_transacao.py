@@ -1,14 +1,17 @@
-from datetime import date
+from datetime import date, datetime
 from calendar import monthrange
 import uuid
-from typing import List, Optional
-import unicodedata
+from typing import Iterable, Iterator, List, Optional, Sequence
 
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Query, Session
 
-from app.models import Categoria, Conta, Meta, Orcamento, StatusLiquidacao, TipoConta, TipoTransacao, Transacao
-from app.schemas.transacao import TransacaoCreate, TransacaoUpdate
+from app.core.money import de_centavos, para_centavos, valor_efetivo_centavos
+from app.core.text import parse_tags
+from app.crud import crud_alerta, crud_busca, crud_saldo
+from app.models import Categoria, Conta, Meta, Orcamento, StatusLiquidacao, TipoConta, TipoTransacao, Transacao, TransacaoTag
+from app.schemas.transacao import TransacaoCreate, TransacaoResponse, TransacaoUpdate
+from app.services.catalogo_categorias import CategoriaPadrao, catalogo_categorias
 
 
 def _add_months(base_date: date, months: int) -> date:
@@ -20,7 +23,15 @@ def _add_months(base_date: date, months: int) -> date:
 
 
 def _valor_efetivo(transacao: Transacao) -> float:
-    return max(0.0, (transacao.valor or 0) + (transacao.valor_multa or 0) + (transacao.valor_juros or 0) - (transacao.valor_desconto or 0))
+    return de_centavos(
+        valor_efetivo_centavos(transacao.valor, transacao.valor_multa, transacao.valor_juros, transacao.valor_desconto)
+    )
+
+
+def valor_efetivo_sql():
+    """Equivalente SQL de `_valor_efetivo`, para agregacoes feitas no banco."""
+    bruto = Transacao.valor + Transacao.valor_multa + Transacao.valor_juros - Transacao.valor_desconto
+    return case((bruto > 0, bruto), else_=0.0)
 
 
 def _impacto_no_saldo(transacao: Transacao) -> float:
@@ -30,6 +41,14 @@ def _impacto_no_saldo(transacao: Transacao) -> float:
     return efetivo if transacao.tipo == TipoTransacao.ENTRADA else -efetivo
 
 
+def _data_impacto(transacao: Transacao) -> date:
+    return transacao.data_liquidacao or transacao.data
+
+
+def _aplicar_impacto(db: Session, conta: Conta, transacao: Transacao, sinal: int = 1) -> None:
+    crud_saldo.aplicar_variacao(db, conta, sinal * _impacto_no_saldo(transacao), _data_impacto(transacao))
+
+
 def _normalizar_atraso(transacao: Transacao) -> None:
     if (
         transacao.status_liquidacao == StatusLiquidacao.PREVISTO
@@ -39,35 +58,29 @@ def _normalizar_atraso(transacao: Transacao) -> None:
         transacao.status_liquidacao = StatusLiquidacao.ATRASADO
 
 
-def _normalize_text(value: str) -> str:
-    normalized = unicodedata.normalize("NFKD", value)
-    ascii_only = "".join(ch for ch in normalized if not unicodedata.combining(ch))
-    return ascii_only.strip().lower()
-
+def _sincronizar_tags(transacao: Transacao) -> None:
+    """Mantem `transacao_tags` alinhada ao texto livre de `Transacao.tags`."""
+    novas = parse_tags(transacao.tags)
+    for link in list(transacao.tag_links):
+        if link.tag not in novas:
+            transacao.tag_links.remove(link)
+    existentes = {link.tag for link in transacao.tag_links}
+    for tag in novas:
+        if tag not in existentes:
+            transacao.tag_links.append(TransacaoTag(user_id=transacao.user_id, tag=tag))
 
-def _obter_categoria_dizimo(db: Session, user_id: int) -> Categoria:
-    candidatas = db.query(Categoria).filter(
-        Categoria.tipo == TipoTransacao.SAIDA
-    ).all()
 
-    categoria_usuario = next(
-        (
-            c for c in candidatas
-            if c.user_id == user_id and _normalize_text(c.nome) == "dizimo"
-        ),
-        None,
-    )
+def _obter_categoria_dizimo(db: Session, user_id: int) -> Categoria | CategoriaPadrao:
+    categoria_usuario = db.query(Categoria).filter(
+        Categoria.user_id == user_id,
+        Categoria.tipo == TipoTransacao.SAIDA,
+        Categoria.nome_normalizado == "dizimo",
+    ).first()
     if categoria_usuario:
         return categoria_usuario
 
-    categoria_padrao = next(
-        (
-            c for c in candidatas
-            if c.user_id is None and c.padrao and _normalize_text(c.nome) == "dizimo"
-        ),
-        None,
-    )
-    if categoria_padrao:
+    categoria_padrao = catalogo_categorias.buscar(db, TipoTransacao.SAIDA, "dizimo")
+    if categoria_padrao and categoria_padrao.padrao:
         return categoria_padrao
 
     nova_categoria = Categoria(
@@ -83,28 +96,30 @@ def _obter_categoria_dizimo(db: Session, user_id: int) -> Categoria:
     return nova_categoria
 
 
-def _valor_meta(transacao: Transacao) -> float:
-    if transacao.status_liquidacao == StatusLiquidacao.CANCELADO:
-        return 0.0
-    efetivo = _valor_efetivo(transacao)
-    if transacao.tipo == TipoTransacao.ENTRADA:
-        return efetivo
-    if transacao.tipo == TipoTransacao.SAIDA:
-        return -efetivo
-    return 0.0
-
-
 def _recalcular_meta(db: Session, user_id: int, meta_id: int) -> None:
     meta = db.query(Meta).filter(Meta.id == meta_id, Meta.user_id == user_id).first()
     if not meta:
         return
 
-    transacoes_meta = db.query(Transacao).filter(
+    efetivo = valor_efetivo_sql()
+    total = db.query(
+        func.coalesce(
+            func.sum(
+                case(
+                    (Transacao.tipo == TipoTransacao.ENTRADA, efetivo),
+                    (Transacao.tipo == TipoTransacao.SAIDA, -efetivo),
+                    else_=0.0,
+                )
+            ),
+            0.0,
+        )
+    ).filter(
         Transacao.user_id == user_id,
         Transacao.meta_id == meta_id,
-    ).all()
+        Transacao.status_liquidacao != StatusLiquidacao.CANCELADO,
+    ).scalar()
 
-    meta.valor_atual = sum(_valor_meta(t) for t in transacoes_meta)
+    meta.valor_atual = de_centavos(para_centavos(float(total or 0.0)))
     meta.concluida = meta.valor_atual >= meta.valor_alvo
     db.add(meta)
 
@@ -121,23 +136,34 @@ def _recalcular_orcamento_mes(db: Session, user_id: int, categoria_id: int, mes:
 
     inicio = date(ano, mes, 1)
     fim = date(ano, mes, monthrange(ano, mes)[1])
-    transacoes = db.query(Transacao).filter(
+    total = db.query(func.coalesce(func.sum(valor_efetivo_sql()), 0.0)).filter(
         Transacao.user_id == user_id,
         Transacao.categoria_id == categoria_id,
         Transacao.tipo == TipoTransacao.SAIDA,
         Transacao.data >= inicio,
         Transacao.data <= fim,
         Transacao.status_liquidacao != StatusLiquidacao.CANCELADO,
-    ).all()
-    orcamento.valor_gasto = sum(_valor_efetivo(t) for t in transacoes)
+    ).scalar()
+    orcamento.valor_gasto = de_centavos(para_centavos(float(total or 0.0)))
     db.add(orcamento)
 
 
-def get_transacoes(
+def recalcular_acumulados(
+    db: Session,
+    user_id: int,
+    metas: Iterable[int],
+    orcamentos: Iterable[tuple[int, int, int]],
+) -> None:
+    """Recalcula `Meta.valor_atual` e `Orcamento.valor_gasto` (categoria_id, mes, ano) informados."""
+    for meta_id in metas:
+        _recalcular_meta(db, user_id, meta_id)
+    for categoria_id, mes, ano in orcamentos:
+        _recalcular_orcamento_mes(db, user_id, categoria_id, mes, ano)
+
+
+def query_transacoes(
     db: Session,
     user_id: int,
-    skip: int = 0,
-    limit: int = 1000,
     tipo: Optional[TipoTransacao] = None,
     status_liquidacao: Optional[StatusLiquidacao] = None,
     fixa: Optional[bool] = None,
@@ -147,12 +173,21 @@ def get_transacoes(
     mes: Optional[int] = None,
     ano: Optional[int] = None,
     busca: Optional[str] = None,
+    tag: Optional[str] = None,
     valor_modo: Optional[str] = None,
     valor_ref: Optional[float] = None,
     orcamento: Optional[str] = None,
-) -> List[Transacao]:
+    alterado_desde: Optional[datetime] = None,
+) -> Optional[Query]:
+    """
+    Monta a consulta filtrada e ordenada da listagem de transacoes.
+
+    Retorna `None` quando o filtro nao pode ter resultado (tag vazia apos normalizacao).
+    """
     query = db.query(Transacao).filter(Transacao.user_id == user_id)
 
+    if alterado_desde is not None:
+        query = query.filter(Transacao.updated_at > alterado_desde)
     if tipo:
         query = query.filter(Transacao.tipo == tipo)
 
@@ -180,20 +215,33 @@ def get_transacoes(
         query = query.filter(Transacao.data >= inicio, Transacao.data <= fim)
 
     if busca:
-        query = query.filter(Transacao.descricao.ilike(f"%{busca}%"))
-
-    transacoes = query.order_by(Transacao.data.desc(), Transacao.id.desc()).all()
-
-    for transacao in transacoes:
-        _normalizar_atraso(transacao)
+        query = crud_busca.filtrar_por_busca(query, busca)
+
+    if tag:
+        tags_filtro = parse_tags(tag)
+        if not tags_filtro:
+            return None
+        # Todas as tags pedidas: um filtro por tag sobre o indice (user_id, tag).
+        for tag_filtro in tags_filtro:
+            query = query.filter(
+                Transacao.id.in_(
+                    select(TransacaoTag.transacao_id).where(
+                        TransacaoTag.user_id == user_id,
+                        TransacaoTag.tag == tag_filtro,
+                    )
+                )
+            )
 
     if valor_modo and valor_ref is not None:
+        # Valores sao NUMERIC(14,2): a comparacao e exata, arredondada a centavos.
+        efetivo = func.round(valor_efetivo_sql(), 2)
+        referencia = de_centavos(para_centavos(valor_ref))
         if valor_modo == "igual":
-            transacoes = [t for t in transacoes if abs(_valor_efetivo(t) - valor_ref) < 0.005]
+            query = query.filter(efetivo == referencia)
         elif valor_modo == "gte":
-            transacoes = [t for t in transacoes if _valor_efetivo(t) >= valor_ref]
+            query = query.filter(efetivo >= referencia)
         elif valor_modo == "lte":
-            transacoes = [t for t in transacoes if _valor_efetivo(t) <= valor_ref]
+            query = query.filter(efetivo <= referencia)
 
     if orcamento in {"fora", "dentro"}:
         hoje = date.today()
@@ -203,50 +251,166 @@ def get_transacoes(
         inicio = date(ano_ref, mes_ref, 1)
         fim = date(ano_ref, mes_ref, monthrange(ano_ref, mes_ref)[1])
 
-        transacoes_mes = db.query(Transacao).filter(
+        gastos_mes = db.query(Transacao.categoria_id, func.sum(valor_efetivo_sql())).filter(
             Transacao.user_id == user_id,
             Transacao.tipo == TipoTransacao.SAIDA,
             Transacao.data >= inicio,
             Transacao.data <= fim,
             Transacao.status_liquidacao != StatusLiquidacao.CANCELADO,
-        ).all()
+            Transacao.categoria_id.isnot(None),
+        ).group_by(Transacao.categoria_id).all()
 
-        gastos_por_categoria: dict[int, float] = {}
-        for t in transacoes_mes:
-            if t.categoria_id is None:
-                continue
-            gastos_por_categoria[t.categoria_id] = gastos_por_categoria.get(t.categoria_id, 0.0) + _valor_efetivo(t)
+        gastos_por_categoria: dict[int, int] = {
+            categoria_id: para_centavos(float(total or 0.0)) for categoria_id, total in gastos_mes
+        }
 
         orcamentos_mes = db.query(Orcamento).filter(
             Orcamento.user_id == user_id,
             Orcamento.mes == mes_ref,
             Orcamento.ano == ano_ref,
         ).all()
-        orcado_por_categoria: dict[int, float] = {}
+        orcado_por_categoria: dict[int, int] = {}
         for o in orcamentos_mes:
-            orcado_por_categoria[o.categoria_id] = orcado_por_categoria.get(o.categoria_id, 0.0) + float(o.valor_planejado or 0.0)
-
-        def _fora_orcamento(t: Transacao) -> bool:
-            if t.tipo != TipoTransacao.SAIDA:
-                return False
-            if t.categoria_id is None:
-                return True
-            orcado = orcado_por_categoria.get(t.categoria_id)
-            if orcado is None:
-                return True
-            gasto = gastos_por_categoria.get(t.categoria_id, 0.0)
-            return gasto > orcado
+            orcado_por_categoria[o.categoria_id] = orcado_por_categoria.get(o.categoria_id, 0) + para_centavos(o.valor_planejado)
 
+        # Saidas sem categoria ou sem orcamento no mes contam como fora do orcamento.
+        categorias_dentro = [
+            cid for cid, orcado in orcado_por_categoria.items() if gastos_por_categoria.get(cid, 0) <= orcado
+        ]
+        query = query.filter(Transacao.tipo == TipoTransacao.SAIDA)
         if orcamento == "fora":
-            transacoes = [t for t in transacoes if _fora_orcamento(t)]
+            query = query.filter(
+                (Transacao.categoria_id.is_(None)) | (Transacao.categoria_id.notin_(categorias_dentro))
+            )
         else:
-            transacoes = [t for t in transacoes if t.tipo == TipoTransacao.SAIDA and not _fora_orcamento(t)]
+            query = query.filter(Transacao.categoria_id.in_(categorias_dentro))
+
+    return query.order_by(Transacao.data.desc(), Transacao.id.desc())
+
+
+def get_transacoes(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 1000,
+    **filtros,
+) -> List[Transacao]:
+    """Lista paginada; `filtros` sao os argumentos de `query_transacoes`."""
+    query = query_transacoes(db, user_id, **filtros)
+    if query is None:
+        return []
 
     if skip:
-        transacoes = transacoes[skip:]
+        query = query.offset(skip)
+    if limit is not None:
+        query = query.limit(limit)
+    transacoes = query.all()
+
+    for transacao in transacoes:
+        _normalizar_atraso(transacao)
+
+    return transacoes
+
+
+CAMPOS_RESPOSTA = tuple(TransacaoResponse.model_fields)
+
+
+def get_transacoes_linhas(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 1000,
+    campos: Sequence[str] = CAMPOS_RESPOSTA,
+    **filtros,
+) -> List[dict]:
+    """
+    Mesma listagem de `get_transacoes`, montada direto das tuplas de colunas `campos`.
+
+    Evita hidratar objetos ORM e validar `TransacaoResponse` linha a linha; aplica as
+    mesmas normalizacoes da resposta (atraso e consistencia do parcelamento).
+    """
+    query = query_transacoes(db, user_id, **filtros)
+    if query is None:
+        return []
+
+    selecionados = list(campos)
+    if "status_liquidacao" in campos and "data_vencimento" not in campos:
+        selecionados.append("data_vencimento")
+    if {"parcelado", "total_parcelas"} & set(campos):
+        selecionados.extend(c for c in ("parcelado", "total_parcelas") if c not in selecionados)
+    auxiliares = selecionados[len(campos):]
+
+    query = query.with_entities(*[getattr(Transacao, campo) for campo in selecionados])
+    if skip:
+        query = query.offset(skip)
     if limit is not None:
-        transacoes = transacoes[:limit]
+        query = query.limit(limit)
+
+    hoje = date.today()
+    linhas = []
+    for valores in query:
+        linha = dict(zip(selecionados, valores))
+        if (
+            linha.get("status_liquidacao") == StatusLiquidacao.PREVISTO
+            and linha["data_vencimento"]
+            and linha["data_vencimento"] < hoje
+        ):
+            linha["status_liquidacao"] = StatusLiquidacao.ATRASADO
+        if "parcelado" in linha:
+            if linha["total_parcelas"] and linha["total_parcelas"] > 1:
+                linha["parcelado"] = True
+            if not linha["parcelado"]:
+                linha["total_parcelas"] = None
+        for campo in auxiliares:
+            del linha[campo]
+        linhas.append(linha)
+    return linhas
+
+
+def iterar_transacoes_export(db: Session, user_id: int, tamanho_lote: int = 1000, **filtros) -> Iterator[tuple]:
+    """
+    Percorre as transacoes filtradas como tuplas de colunas, em lotes de `tamanho_lote`.
+
+    `yield_per` usa cursor no servidor no PostgreSQL (stream_results), entao a memoria
+    fica constante independentemente do numero de linhas.
+    """
+    query = query_transacoes(db, user_id, **filtros)
+    if query is None:
+        return
+
+    query = (
+        query.outerjoin(Categoria, Categoria.id == Transacao.categoria_id)
+        .join(Conta, Conta.id == Transacao.conta_id)
+        .with_entities(
+            Transacao.id,
+            Transacao.data,
+            Transacao.descricao,
+            Transacao.tipo,
+            Transacao.status_liquidacao,
+            Transacao.data_vencimento,
+            Transacao.data_liquidacao,
+            Conta.nome,
+            Categoria.nome,
+            Transacao.valor,
+            Transacao.valor_multa,
+            Transacao.valor_juros,
+            Transacao.valor_desconto,
+            Transacao.tags,
+        )
+        .execution_options(yield_per=tamanho_lote)
+    )
+    hoje = date.today()
+    for linha in query:
+        status_linha = linha.status_liquidacao
+        if status_linha == StatusLiquidacao.PREVISTO and linha.data_vencimento and linha.data_vencimento < hoje:
+            status_linha = StatusLiquidacao.ATRASADO
+        yield (*linha[:4], status_linha, *linha[5:])
+
 
+def buscar_transacoes(db: Session, user_id: int, busca: str, limit: int = 50) -> List[Transacao]:
+    transacoes = crud_busca.buscar_transacoes(db, user_id, busca, limit=limit)
+    for transacao in transacoes:
+        _normalizar_atraso(transacao)
     return transacoes
 
 
@@ -311,7 +475,7 @@ def criar_transacao(
         data_vencimento_base = transacao.data_vencimento or transacao.data
         transacoes_criadas: List[Transacao] = []
         metas_afetadas = set()
-        orcamentos_afetados = set()
+        variacoes_orcamento: dict[tuple[int, int, int], int] = {}
 
         for index in range(1, transacao.total_parcelas + 1):
             parcela_data = _add_months(transacao.data, index - 1)
@@ -349,19 +513,18 @@ def criar_transacao(
                 valor_desconto=transacao.valor_desconto if is_primeira else 0.0,
                 meta_id=transacao.meta_id,
             )
+            _sincronizar_tags(parcela)
             db.add(parcela)
-            conta.saldo += _impacto_no_saldo(parcela)
+            _aplicar_impacto(db, conta, parcela)
             transacoes_criadas.append(parcela)
             if parcela.meta_id:
                 metas_afetadas.add(parcela.meta_id)
-            if parcela.categoria_id and parcela.tipo == TipoTransacao.SAIDA:
-                orcamentos_afetados.add((parcela.categoria_id, parcela.data.month, parcela.data.year))
+            crud_alerta.acumular_variacao(variacoes_orcamento, parcela)
 
         db.flush()
         for meta_id in metas_afetadas:
             _recalcular_meta(db, user_id, meta_id)
-        for categoria_id, mes, ano in orcamentos_afetados:
-            _recalcular_orcamento_mes(db, user_id, categoria_id, mes, ano)
+        crud_alerta.aplicar_variacoes(db, user_id, variacoes_orcamento)
         db.commit()
         db.refresh(transacoes_criadas[0])
         return transacoes_criadas[0]
@@ -381,6 +544,8 @@ def criar_transacao(
     if transacao.e_emprestimo and transacao.pessoa_emprestimo:
         db_transacao.pessoa_emprestimo = transacao.pessoa_emprestimo
 
+    _sincronizar_tags(db_transacao)
+
     dizimo_criado = None
 
     if transacao.tem_dizimo and transacao.tipo == TipoTransacao.ENTRADA:
@@ -418,21 +583,19 @@ def criar_transacao(
     else:
         db.add(db_transacao)
 
-    conta.saldo += _impacto_no_saldo(db_transacao)
+    _aplicar_impacto(db, conta, db_transacao)
     if dizimo_criado:
-        conta.saldo += _impacto_no_saldo(dizimo_criado)
+        _aplicar_impacto(db, conta, dizimo_criado)
 
     db.flush()
     if db_transacao.meta_id:
         _recalcular_meta(db, user_id, db_transacao.meta_id)
 
-    orcamentos_afetados = set()
-    if db_transacao.categoria_id and db_transacao.tipo == TipoTransacao.SAIDA:
-        orcamentos_afetados.add((db_transacao.categoria_id, db_transacao.data.month, db_transacao.data.year))
-    if dizimo_criado and dizimo_criado.categoria_id and dizimo_criado.tipo == TipoTransacao.SAIDA:
-        orcamentos_afetados.add((dizimo_criado.categoria_id, dizimo_criado.data.month, dizimo_criado.data.year))
-    for categoria_id, mes, ano in orcamentos_afetados:
-        _recalcular_orcamento_mes(db, user_id, categoria_id, mes, ano)
+    variacoes_orcamento: dict[tuple[int, int, int], int] = {}
+    crud_alerta.acumular_variacao(variacoes_orcamento, db_transacao)
+    if dizimo_criado:
+        crud_alerta.acumular_variacao(variacoes_orcamento, dizimo_criado)
+    crud_alerta.aplicar_variacoes(db, user_id, variacoes_orcamento)
 
     db.commit()
     db.refresh(db_transacao)
@@ -471,12 +634,16 @@ def atualizar_transacao(
         if not conta:
             raise ValueError("Conta da transacao nao encontrada")
 
-        impacto_antigo = _impacto_no_saldo(db_transacao)
+        impacto_antigo, data_impacto_antigo = _impacto_no_saldo(db_transacao), _data_impacto(db_transacao)
+        variacoes_orcamento: dict[tuple[int, int, int], int] = {}
+        crud_alerta.acumular_variacao(variacoes_orcamento, db_transacao, sinal=-1)
         for field, value in update_data.items():
             setattr(db_transacao, field, value)
 
-        impacto_novo = _impacto_no_saldo(db_transacao)
-        conta.saldo += impacto_novo - impacto_antigo
+        crud_saldo.aplicar_variacao(db, conta, -impacto_antigo, data_impacto_antigo)
+        _aplicar_impacto(db, conta, db_transacao)
+        crud_alerta.acumular_variacao(variacoes_orcamento, db_transacao)
+        crud_alerta.aplicar_variacoes(db, user_id, variacoes_orcamento)
 
         db.add(db_transacao)
         db.add(conta)
@@ -498,11 +665,13 @@ def atualizar_transacao(
         ).first()
 
     meta_antiga_id = db_transacao.meta_id
-    orcamentos_afetados = set()
-    if db_transacao.categoria_id and db_transacao.tipo == TipoTransacao.SAIDA:
-        orcamentos_afetados.add((db_transacao.categoria_id, db_transacao.data.month, db_transacao.data.year))
+    # Gasto dos orcamentos por variacao: sai o estado anterior, entra o novo no fim.
+    variacoes_orcamento: dict[tuple[int, int, int], int] = {}
+    crud_alerta.acumular_variacao(variacoes_orcamento, db_transacao, sinal=-1)
+    if dizimo:
+        crud_alerta.acumular_variacao(variacoes_orcamento, dizimo, sinal=-1)
 
-    impacto_antigo = _impacto_no_saldo(db_transacao)
+    impacto_antigo, data_impacto_antigo = _impacto_no_saldo(db_transacao), _data_impacto(db_transacao)
     update_data = transacao_update.model_dump(exclude_unset=True)
 
     nova_conta_id = update_data.get("conta_id")
@@ -515,6 +684,9 @@ def atualizar_transacao(
     for field, value in update_data.items():
         setattr(db_transacao, field, value)
 
+    if "tags" in update_data:
+        _sincronizar_tags(db_transacao)
+
     if (
         update_data.get("status_liquidacao") == StatusLiquidacao.LIQUIDADO
         and not update_data.get("data_liquidacao")
@@ -529,10 +701,8 @@ def atualizar_transacao(
         db_transacao.status_liquidacao = StatusLiquidacao.PREVISTO
         db_transacao.data_liquidacao = None
 
-    impacto_novo = _impacto_no_saldo(db_transacao)
-
-    conta_antiga.saldo -= impacto_antigo
-    conta_nova.saldo += impacto_novo
+    crud_saldo.aplicar_variacao(db, conta_antiga, -impacto_antigo, data_impacto_antigo)
+    _aplicar_impacto(db, conta_nova, db_transacao)
 
     deve_ter_dizimo = bool(db_transacao.tem_dizimo and db_transacao.tipo == TipoTransacao.ENTRADA)
 
@@ -541,9 +711,7 @@ def atualizar_transacao(
             db_transacao.transacao_dizimo_uuid = str(uuid.uuid4())
 
         if dizimo:
-            if dizimo.categoria_id and dizimo.tipo == TipoTransacao.SAIDA:
-                orcamentos_afetados.add((dizimo.categoria_id, dizimo.data.month, dizimo.data.year))
-            impacto_dizimo_antigo = _impacto_no_saldo(dizimo)
+            impacto_dizimo_antigo, data_dizimo_antigo = _impacto_no_saldo(dizimo), _data_impacto(dizimo)
             valor_dizimo = db_transacao.valor * (db_transacao.percentual_dizimo / 100)
             dizimo.valor = valor_dizimo
             dizimo.descricao = f"Dizimo de {db_transacao.descricao}"
@@ -552,12 +720,10 @@ def atualizar_transacao(
             dizimo.conta_id = db_transacao.conta_id
             if dizimo.categoria_id is None:
                 dizimo.categoria_id = _obter_categoria_dizimo(db, user_id).id
-            impacto_dizimo_novo = _impacto_no_saldo(dizimo)
-            if dizimo.categoria_id and dizimo.tipo == TipoTransacao.SAIDA:
-                orcamentos_afetados.add((dizimo.categoria_id, dizimo.data.month, dizimo.data.year))
+            crud_alerta.acumular_variacao(variacoes_orcamento, dizimo)
 
-            conta_antiga.saldo -= impacto_dizimo_antigo
-            conta_nova.saldo += impacto_dizimo_novo
+            crud_saldo.aplicar_variacao(db, conta_antiga, -impacto_dizimo_antigo, data_dizimo_antigo)
+            _aplicar_impacto(db, conta_nova, dizimo)
         else:
             categoria_dizimo = _obter_categoria_dizimo(db, user_id)
             novo_dizimo = Transacao(
@@ -587,29 +753,23 @@ def atualizar_transacao(
                 valor_desconto=0.0,
             )
             db.add(novo_dizimo)
-            conta_nova.saldo += _impacto_no_saldo(novo_dizimo)
-            if novo_dizimo.categoria_id and novo_dizimo.tipo == TipoTransacao.SAIDA:
-                orcamentos_afetados.add((novo_dizimo.categoria_id, novo_dizimo.data.month, novo_dizimo.data.year))
+            _aplicar_impacto(db, conta_nova, novo_dizimo)
+            crud_alerta.acumular_variacao(variacoes_orcamento, novo_dizimo)
     else:
         if dizimo:
-            impacto_dizimo_antigo = _impacto_no_saldo(dizimo)
             conta_origem_dizimo = conta_nova if dizimo.conta_id == conta_nova.id else conta_antiga
-            conta_origem_dizimo.saldo -= impacto_dizimo_antigo
-            if dizimo.categoria_id and dizimo.tipo == TipoTransacao.SAIDA:
-                orcamentos_afetados.add((dizimo.categoria_id, dizimo.data.month, dizimo.data.year))
+            _aplicar_impacto(db, conta_origem_dizimo, dizimo, sinal=-1)
             db.delete(dizimo)
         db_transacao.tem_dizimo = False
         db_transacao.transacao_dizimo_uuid = None
 
-    if db_transacao.categoria_id and db_transacao.tipo == TipoTransacao.SAIDA:
-        orcamentos_afetados.add((db_transacao.categoria_id, db_transacao.data.month, db_transacao.data.year))
+    crud_alerta.acumular_variacao(variacoes_orcamento, db_transacao)
 
     db.flush()
     metas_afetadas = {meta_id for meta_id in [meta_antiga_id, db_transacao.meta_id] if meta_id}
     for meta_id in metas_afetadas:
         _recalcular_meta(db, user_id, meta_id)
-    for categoria_id, mes, ano in orcamentos_afetados:
-        _recalcular_orcamento_mes(db, user_id, categoria_id, mes, ano)
+    crud_alerta.aplicar_variacoes(db, user_id, variacoes_orcamento)
 
     db.commit()
     db.refresh(db_transacao)
@@ -633,13 +793,12 @@ def deletar_transacao(
         raise ValueError("Conta da transacao nao encontrada")
 
     metas_afetadas = set()
-    orcamentos_afetados = set()
+    variacoes_orcamento: dict[tuple[int, int, int], int] = {}
     if db_transacao.meta_id:
         metas_afetadas.add(db_transacao.meta_id)
-    if db_transacao.categoria_id and db_transacao.tipo == TipoTransacao.SAIDA:
-        orcamentos_afetados.add((db_transacao.categoria_id, db_transacao.data.month, db_transacao.data.year))
+    crud_alerta.acumular_variacao(variacoes_orcamento, db_transacao, sinal=-1)
 
-    conta.saldo -= _impacto_no_saldo(db_transacao)
+    _aplicar_impacto(db, conta, db_transacao, sinal=-1)
 
     if db_transacao.tem_dizimo and db_transacao.transacao_dizimo_uuid:
         dizimo = db.query(Transacao).filter(
@@ -650,16 +809,14 @@ def deletar_transacao(
         ).first()
 
         if dizimo:
-            conta.saldo -= _impacto_no_saldo(dizimo)
-            if dizimo.categoria_id and dizimo.tipo == TipoTransacao.SAIDA:
-                orcamentos_afetados.add((dizimo.categoria_id, dizimo.data.month, dizimo.data.year))
+            _aplicar_impacto(db, conta, dizimo, sinal=-1)
+            crud_alerta.acumular_variacao(variacoes_orcamento, dizimo, sinal=-1)
             db.delete(dizimo)
 
     db.delete(db_transacao)
     db.flush()
     for meta_id in metas_afetadas:
         _recalcular_meta(db, user_id, meta_id)
-    for categoria_id, mes, ano in orcamentos_afetados:
-        _recalcular_orcamento_mes(db, user_id, categoria_id, mes, ano)
+    crud_alerta.aplicar_variacoes(db, user_id, variacoes_orcamento)
     db.commit()
     return True
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.core.security import get_password_hash, verify_password
 from typing import Optional
 
@@ -52,3 +52,21 @@ def update_user(db: Session, user_id: int, **kwargs) -> Optional[User]:
     db.commit()
     db.refresh(user)
     return user
+
+
+def provisionar_admin(db: Session, email: str, password: Optional[str] = None, nome: Optional[str] = None) -> User:
+    """
+    Promove o usuario do email a admin ou, se ele nao existir, cria um admin novo.
+
+    O registro publico so cria usuarios comuns; este e o caminho para criar administradores
+    (usado por `criar_admin.py`). Criar um usuario novo exige senha.
+    """
+    user = get_user_by_email(db, email)
+    if user:
+        user.role = UserRole.ADMIN
+        db.commit()
+        db.refresh(user)
+        return user
+    if not password:
+        raise ValueError(f"Usuario {email} nao existe; informe uma senha para cria-lo")
+    return create_user(db, email=email, password=password, nome=nome or email.split("@")[0], role=UserRole.ADMIN)
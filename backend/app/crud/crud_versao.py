@@ -0,0 +1,106 @@
+"""
+Versao dos dados de cada usuario por mes, usada como chave de cache das exportacoes.
+
+Um listener de `before_flush` incrementa o contador dos meses tocados por qualquer
+escrita de `Transacao` (criacao, edicao ou exclusao, inclusive a data antiga de uma
+transacao movida), o contador global (ano=0, mes=0) quando categorias mudam e o de
+cadastros (ano=0, mes=1) quando contas, metas ou orcamentos mudam. A soma de todos
+os contadores do usuario e a versao usada nos ETags das listagens.
+Escritas em massa (`query.update()`/`delete()`) nao passam pelo flush e precisam
+chamar `incrementar_versao` explicitamente. Cada incremento tambem anota a
+notificacao publicada no commit (`app.services.eventos`).
+"""
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from app.db.upsert import upsert_incremento
+from app.models import Categoria, Conta, Meta, Orcamento, Transacao, VersaoDados
+from app.services import eventos
+
+PERIODO_GLOBAL = (0, 0)
+# Nao entra na chave do DRE: saldo de conta e progresso de meta nao alteram o relatorio.
+PERIODO_CADASTROS = (0, 1)
+
+
+def incrementar_versao(db: Session, user_id: int, periodos: Iterable[tuple[int, int]]) -> None:
+    periodos = set(periodos)
+    for ano, mes in sorted(periodos):
+        upsert_incremento(
+            db,
+            VersaoDados.__table__,
+            {"user_id": user_id, "ano": ano, "mes": mes},
+            {"versao": 1},
+        )
+    eventos.anotar_alteracao(
+        db,
+        user_id,
+        meses={periodo for periodo in periodos if periodo[0]},
+        categorias=PERIODO_GLOBAL in periodos,
+        cadastros=PERIODO_CADASTROS in periodos,
+    )
+
+
+def obter_versao(db: Session, user_id: int, ano: int, mes: int) -> str:
+    """Versao do mes combinada com a versao global do usuario (ex.: `"3.1"`)."""
+    linhas = dict(
+        db.query(VersaoDados.mes, VersaoDados.versao)
+        .filter(
+            VersaoDados.user_id == user_id,
+            ((VersaoDados.ano == ano) & (VersaoDados.mes == mes))
+            | ((VersaoDados.ano == PERIODO_GLOBAL[0]) & (VersaoDados.mes == PERIODO_GLOBAL[1])),
+        )
+        .all()
+    )
+    return f"{linhas.get(mes, 0)}.{linhas.get(PERIODO_GLOBAL[1], 0)}"
+
+
+def obter_versao_mes(db: Session, user_id: int, ano: int, mes: int) -> int:
+    """Contador das transacoes do mes (0 se o mes nunca foi escrito)."""
+    versao = (
+        db.query(VersaoDados.versao)
+        .filter(VersaoDados.user_id == user_id, VersaoDados.ano == ano, VersaoDados.mes == mes)
+        .scalar()
+    )
+    return versao or 0
+
+
+def obter_versao_usuario(db: Session, user_id: int) -> int:
+    """Versao de todos os dados do usuario: soma dos contadores, cresce a cada escrita."""
+    return int(
+        db.query(func.coalesce(func.sum(VersaoDados.versao), 0))
+        .filter(VersaoDados.user_id == user_id)
+        .scalar()
+    )
+
+
+def _valores_atributo(objeto, atributo: str) -> set:
+    historico = inspect(objeto).attrs[atributo].history
+    return {v for v in (*historico.added, *historico.unchanged, *historico.deleted) if v is not None}
+
+
+def _periodos_transacao(transacao: Transacao) -> set[tuple[int, int]]:
+    return {(d.year, d.month) for d in _valores_atributo(transacao, "data") if isinstance(d, date)}
+
+
+@event.listens_for(Session, "before_flush")
+def _incrementar_versoes_alteradas(session: Session, flush_context, instances) -> None:
+    afetados: dict[int, set[tuple[int, int]]] = {}
+    for objeto in (*session.new, *session.dirty, *session.deleted):
+        if objeto in session.dirty and not session.is_modified(objeto, include_collections=False):
+            continue
+        if isinstance(objeto, Transacao):
+            periodos = _periodos_transacao(objeto)
+        elif isinstance(objeto, Categoria):
+            periodos = {PERIODO_GLOBAL}
+        elif isinstance(objeto, (Conta, Meta, Orcamento)):
+            periodos = {PERIODO_CADASTROS}
+        else:
+            continue
+        for user_id in _valores_atributo(objeto, "user_id"):
+            afetados.setdefault(user_id, set()).update(periodos)
+
+    for user_id, periodos in afetados.items():
+        incrementar_versao(session, user_id, periodos)
@@ -0,0 +1,48 @@
+from typing import Any
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def _insert_dialeto(db: Session):
+    dialeto = db.get_bind().dialect.name
+    if dialeto == "postgresql":
+        return postgresql.insert
+    if dialeto == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Upsert nao suportado para o dialeto {dialeto}")
+
+
+def upsert_incremento(
+    db: Session,
+    tabela: Table,
+    chaves: dict[str, Any],
+    incrementos: dict[str, Any],
+    fixos: dict[str, Any] | None = None,
+) -> None:
+    """
+    INSERT ... ON CONFLICT DO UPDATE somando `incrementos` a linha identificada por `chaves`.
+
+    Executa um unico comando atomico na transacao corrente (PostgreSQL ou SQLite);
+    `chaves` deve corresponder a uma restricao unica da tabela. `fixos` so entram na
+    insercao e nao mudam numa linha existente.
+    """
+    insert = _insert_dialeto(db)
+    stmt = insert(tabela).values(**chaves, **(fixos or {}), **incrementos)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(chaves),
+        set_={coluna: tabela.c[coluna] + stmt.excluded[coluna] for coluna in incrementos},
+    )
+    db.execute(stmt)
+
+
+def upsert_valores(db: Session, tabela: Table, chaves: dict[str, Any], valores: dict[str, Any]) -> None:
+    """INSERT ... ON CONFLICT DO UPDATE substituindo `valores` na linha identificada por `chaves`."""
+    insert = _insert_dialeto(db)
+    stmt = insert(tabela).values(**chaves, **valores)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(chaves),
+        set_={coluna: stmt.excluded[coluna] for coluna in valores},
+    )
+    db.execute(stmt)
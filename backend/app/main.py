@@ -1,7 +1,29 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.compressao import CompressaoMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.db.session import SessionLocal
+from app.services.catalogo_categorias import catalogo_categorias
+from app.services.eventos import broker
+from app.services.relatorio_jobs import gerenciador_relatorios
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        with SessionLocal() as db:
+            catalogo_categorias.carregar(db)
+    except SQLAlchemyError:
+        # Banco indisponivel na subida: o catalogo e carregado no primeiro uso.
+        pass
+    yield
+    gerenciador_relatorios.encerrar()
+    broker.encerrar()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -9,6 +31,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 #app = FastAPI(
 #    title="Finanças Cristãs API",
@@ -25,6 +48,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressao negociada (gzip/brotli) acima do tamanho minimo
+app.add_middleware(CompressaoMiddleware, minimum_size=settings.COMPRESSAO_TAMANHO_MINIMO)
+
 # Routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -1,11 +1,11 @@
 from .user import User, UserRole
 from .financeiro import (
-    Conta, TipoConta, Categoria, Transacao, TipoTransacao,
-    Meta, Orcamento, ConfiguracaoCristao, Delegacao, DelegacaoStatus, StatusLiquidacao
+    Conta, TipoConta, SaldoDiario, VersaoDados, Fatura, RegistroExcluido, Categoria, Transacao, TransacaoTag, TipoTransacao,
+    Meta, Orcamento, AlertaOrcamento, ConfiguracaoCristao, Delegacao, DelegacaoStatus, StatusLiquidacao
 )
 
 __all__ = [
-    "User", "UserRole", "Conta", "TipoConta", "Categoria",
-    "Transacao", "TipoTransacao", "Meta", "Orcamento", "ConfiguracaoCristao",
+    "User", "UserRole", "Conta", "TipoConta", "SaldoDiario", "VersaoDados", "Fatura", "RegistroExcluido", "Categoria",
+    "Transacao", "TransacaoTag", "TipoTransacao", "Meta", "Orcamento", "AlertaOrcamento", "ConfiguracaoCristao",
     "Delegacao", "DelegacaoStatus", "StatusLiquidacao"
 ]
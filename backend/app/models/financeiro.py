@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Enum, Date, UniqueConstraint
+from sqlalchemy import DDL, Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Numeric, Text, Enum, Date, Index, UniqueConstraint, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
+from app.core.text import normalize_text
 from app.db.session import Base
 
+# Valores monetarios: NUMERIC exato no banco (somas sem deriva), float no Python/JSON.
+Dinheiro = Numeric(14, 2, asdecimal=False)
+
 class TipoTransacao(str, enum.Enum):
     ENTRADA = "entrada"
     SAIDA = "saida"
@@ -26,42 +30,122 @@ class StatusLiquidacao(str, enum.Enum):
 
 class Conta(Base):
     __tablename__ = "contas"
+    __table_args__ = (
+        Index("ix_contas_user_updated_at", "user_id", "updated_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     nome = Column(String(100), nullable=False)
     tipo = Column(Enum(TipoConta), nullable=False)
-    saldo = Column(Float, default=0.0)
+    saldo = Column(Dinheiro, default=0.0)
+    # Saldo sem transacoes (abertura + ajustes manuais); base da reconciliacao de saldo.
+    saldo_inicial = Column(Dinheiro, nullable=False, default=0.0)
     dia_fechamento = Column(Integer, nullable=True)
     dia_vencimento = Column(Integer, nullable=True)
-    limite_credito = Column(Float, nullable=True)
+    limite_credito = Column(Dinheiro, nullable=True)
     cor = Column(String(7), default="#3B82F6")
     ativa = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     user = relationship("User", back_populates="contas")
     transacoes = relationship("Transacao", back_populates="conta")
+    saldos_diarios = relationship("SaldoDiario", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class SaldoDiario(Base):
+    """Livro diario de saldo: soma das variacoes aplicadas a `Conta.saldo` em cada dia."""
+    __tablename__ = "saldos_diarios"
+    __table_args__ = (
+        UniqueConstraint("conta_id", "data", name="uq_saldos_diarios_conta_data"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    conta_id = Column(Integer, ForeignKey("contas.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    data = Column(Date, nullable=False)
+    variacao = Column(Dinheiro, nullable=False, default=0.0)
+
+
+class VersaoDados(Base):
+    """Contador de alteracoes por usuario e mes (ano=0/mes=0 para dados sem periodo, como categorias)."""
+    __tablename__ = "versoes_dados"
+    __table_args__ = (
+        UniqueConstraint("user_id", "ano", "mes", name="uq_versoes_dados_user_periodo"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    ano = Column(Integer, nullable=False)
+    mes = Column(Integer, nullable=False)
+    versao = Column(Integer, nullable=False, default=0)
+
+
+class Fatura(Base):
+    """Totais de cada fatura de cartao com itens, mantidos por `crud_fatura` a cada escrita."""
+    __tablename__ = "faturas"
+    __table_args__ = (
+        UniqueConstraint("conta_id", "periodo_fim", name="uq_faturas_conta_periodo_fim"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    conta_id = Column(Integer, ForeignKey("contas.id", ondelete="CASCADE"), nullable=False)
+    periodo_inicio = Column(Date, nullable=False)
+    periodo_fim = Column(Date, nullable=False)  # dia do fechamento
+    data_vencimento = Column(Date, nullable=False)
+    quantidade_itens = Column(Integer, nullable=False, default=0)
+    itens_em_aberto = Column(Integer, nullable=False, default=0)
+    valor_total = Column(Dinheiro, nullable=False, default=0.0)
+    valor_em_aberto = Column(Dinheiro, nullable=False, default=0.0)
+    valor_pago = Column(Dinheiro, nullable=False, default=0.0)
+
+
+class RegistroExcluido(Base):
+    """Marca de exclusao (tombstone) lida pela sincronizacao incremental (`GET /sync`)."""
+    __tablename__ = "registros_excluidos"
+    __table_args__ = (
+        Index("ix_registros_excluidos_user_excluido_em", "user_id", "excluido_em"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Nulo para categorias padrao do sistema (visiveis a todos os usuarios).
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    tabela = Column(String(30), nullable=False)
+    registro_id = Column(Integer, nullable=False)
+    excluido_em = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
 class Categoria(Base):
     __tablename__ = "categorias"
+    __table_args__ = (
+        Index("ix_categorias_user_updated_at", "user_id", "updated_at"),
+        Index("uq_categorias_user_tipo_nome_normalizado", "user_id", "tipo", "nome_normalizado", unique=True),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True) # Pode ser nulo para categorias padrão do sistema
     nome = Column(String(100), nullable=False)
+    # `normalize_text(nome)` (sem acento, minusculo): duplicidade e busca por nome via indice unico.
+    nome_normalizado = Column(String(100), nullable=False)
     icone = Column(String(50))
     cor = Column(String(7), default="#6B7280")
     tipo = Column(Enum(TipoTransacao), nullable=False) # Indica se é categoria de entrada, saída ou transferência
     padrao = Column(Boolean, default=False) # Indica se é uma categoria padrão do sistema
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     user = relationship("User", back_populates="categorias")
     transacoes = relationship("Transacao", back_populates="categoria")
 
 class Transacao(Base):
     """SISTEMA DE DÍZIMO AUTOMÁTICO via UUID"""
     __tablename__ = "transacoes"
+    __table_args__ = (
+        Index("ix_transacoes_user_updated_at", "user_id", "updated_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     conta_id = Column(Integer, ForeignKey("contas.id"), nullable=False)
     categoria_id = Column(Integer, ForeignKey("categorias.id"))
     descricao = Column(String(200), nullable=False)
-    valor = Column(Float, nullable=False)
+    valor = Column(Dinheiro, nullable=False)
     tipo = Column(Enum(TipoTransacao), nullable=False)
     data = Column(Date, nullable=False)
     data_vencimento = Column(Date, nullable=True)
@@ -91,46 +175,155 @@ class Transacao(Base):
     # Extras
     observacoes = Column(Text)
     tags = Column(String(500))
-    valor_multa = Column(Float, nullable=False, default=0.0)
-    valor_juros = Column(Float, nullable=False, default=0.0)
-    valor_desconto = Column(Float, nullable=False, default=0.0)
+    # Texto normalizado (sem acento, minusculo) de descricao + observacoes + tags, usado pela busca.
+    busca_normalizada = Column(Text)
+    valor_multa = Column(Dinheiro, nullable=False, default=0.0)
+    valor_juros = Column(Dinheiro, nullable=False, default=0.0)
+    valor_desconto = Column(Dinheiro, nullable=False, default=0.0)
     meta_id = Column(Integer, ForeignKey("metas.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     user = relationship("User", back_populates="transacoes")
     conta = relationship("Conta", back_populates="transacoes")
     categoria = relationship("Categoria", back_populates="transacoes")
     meta = relationship("Meta", back_populates="transacoes")
+    tag_links = relationship("TransacaoTag", back_populates="transacao", cascade="all, delete-orphan")
+
+
+class TransacaoTag(Base):
+    """Tags normalizadas de cada transação (derivadas de `Transacao.tags`)."""
+    __tablename__ = "transacao_tags"
+    __table_args__ = (
+        UniqueConstraint("transacao_id", "tag", name="uq_transacao_tags_transacao_tag"),
+        Index("ix_transacao_tags_user_tag", "user_id", "tag"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    transacao_id = Column(Integer, ForeignKey("transacoes.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    tag = Column(String(100), nullable=False)
+    transacao = relationship("Transacao", back_populates="tag_links")
+
+
+def texto_busca_transacao(descricao: str | None, observacoes: str | None, tags: str | None) -> str:
+    partes = [p for p in (descricao, observacoes, tags) if p]
+    return normalize_text(" ".join(partes))
+
+
+@event.listens_for(Categoria, "before_insert")
+@event.listens_for(Categoria, "before_update")
+def _atualizar_nome_normalizado(mapper, connection, target: Categoria) -> None:
+    target.nome_normalizado = normalize_text(target.nome)
+
+
+@event.listens_for(Transacao, "before_insert")
+@event.listens_for(Transacao, "before_update")
+def _atualizar_busca_normalizada(mapper, connection, target: Transacao) -> None:
+    target.busca_normalizada = texto_busca_transacao(target.descricao, target.observacoes, target.tags)
+
+
+# SQLite (testes) nao tem pg_trgm: usa uma tabela FTS5 com tokenizer trigram,
+# sincronizada por triggers, como equivalente do indice GIN do PostgreSQL.
+event.listen(
+    Transacao.__table__,
+    "after_create",
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS transacoes_fts USING fts5("
+        "busca_normalizada, content='transacoes', content_rowid='id', tokenize='trigram')"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    Transacao.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS transacoes_fts_ai AFTER INSERT ON transacoes BEGIN "
+        "INSERT INTO transacoes_fts(rowid, busca_normalizada) VALUES (new.id, new.busca_normalizada); END"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    Transacao.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS transacoes_fts_ad AFTER DELETE ON transacoes BEGIN "
+        "INSERT INTO transacoes_fts(transacoes_fts, rowid, busca_normalizada) "
+        "VALUES ('delete', old.id, old.busca_normalizada); END"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    Transacao.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS transacoes_fts_au AFTER UPDATE OF busca_normalizada ON transacoes BEGIN "
+        "INSERT INTO transacoes_fts(transacoes_fts, rowid, busca_normalizada) "
+        "VALUES ('delete', old.id, old.busca_normalizada); "
+        "INSERT INTO transacoes_fts(rowid, busca_normalizada) VALUES (new.id, new.busca_normalizada); END"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    Transacao.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS transacoes_fts").execute_if(dialect="sqlite"),
+)
 
 class Meta(Base):
     __tablename__ = "metas"
+    __table_args__ = (
+        Index("ix_metas_user_updated_at", "user_id", "updated_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     nome = Column(String(100), nullable=False)
     descricao = Column(Text)
-    valor_alvo = Column(Float, nullable=False)
-    valor_atual = Column(Float, default=0.0)
+    valor_alvo = Column(Dinheiro, nullable=False)
+    valor_atual = Column(Dinheiro, default=0.0)
     data_inicio = Column(Date, nullable=False)
     data_fim = Column(Date)
     concluida = Column(Boolean, default=False)
     cor = Column(String(7), default="#10B981")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     user = relationship("User", back_populates="metas")
     transacoes = relationship("Transacao", back_populates="meta")
 
 class Orcamento(Base):
     __tablename__ = "orcamentos"
+    __table_args__ = (
+        Index("ix_orcamentos_user_updated_at", "user_id", "updated_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     categoria_id = Column(Integer, ForeignKey("categorias.id"), nullable=False)
     mes = Column(Integer, nullable=False)
     ano = Column(Integer, nullable=False)
-    valor_planejado = Column(Float, nullable=False)
-    valor_gasto = Column(Float, default=0.0)
+    valor_planejado = Column(Dinheiro, nullable=False)
+    valor_gasto = Column(Dinheiro, default=0.0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     user = relationship("User")
     categoria = relationship("Categoria")
 
+
+class AlertaOrcamento(Base):
+    """Registro de cada vez que o gasto de um orcamento atinge um limiar (80%, 100%) do planejado."""
+    __tablename__ = "alertas_orcamento"
+    __table_args__ = (
+        Index("ix_alertas_orcamento_user_id_id", "user_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    orcamento_id = Column(Integer, ForeignKey("orcamentos.id", ondelete="CASCADE"), nullable=False, index=True)
+    categoria_id = Column(Integer, ForeignKey("categorias.id", ondelete="CASCADE"), nullable=False)
+    mes = Column(Integer, nullable=False)
+    ano = Column(Integer, nullable=False)
+    limiar = Column(Integer, nullable=False)  # percentual do planejado
+    percentual = Column(Float, nullable=False)  # gasto/planejado no momento do alerta
+    valor_gasto = Column(Dinheiro, nullable=False)
+    valor_planejado = Column(Dinheiro, nullable=False)
+    lido = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class ConfiguracaoCristao(Base):
     __tablename__ = "config_cristao"
     id = Column(Integer, primary_key=True, index=True)
@@ -6,6 +6,7 @@ from app.db.session import Base
 
 class UserRole(str, enum.Enum):
     USER = "user"
+    ADMIN = "admin"
 
 class User(Base):
     __tablename__ = "users"
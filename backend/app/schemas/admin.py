@@ -0,0 +1,19 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class DivergenciaSaldoResponse(BaseModel):
+    conta_id: int
+    user_id: int
+    conta_nome: str
+    saldo_atual: float
+    saldo_esperado: float
+    diferenca: float
+
+
+class ReconciliacaoSaldosResponse(BaseModel):
+    total_contas: int
+    total_divergencias: int
+    corrigidas: int
+    divergencias: List[DivergenciaSaldoResponse]
@@ -36,11 +36,23 @@ class ContaUpdate(BaseModel):
     cor: Optional[str] = Field(None, pattern="^#[0-9A-Fa-f]{6}$")
     ativa: Optional[bool] = None
 
+class ContaResumoResponse(BaseModel):
+    entradas_mes: float = 0.0
+    saidas_mes: float = 0.0
+    transferencias_mes: float = 0.0
+    pendente_entradas: float = 0.0
+    pendente_saidas: float = 0.0
+    ultima_movimentacao: Optional[date] = None
+
+
 class ContaResponse(ContaBase):
     id: int
     user_id: int
     saldo: float
     created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    # Preenchido apenas em `GET /contas?incluir_resumo=true`.
+    resumo: Optional[ContaResumoResponse] = None
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -71,7 +83,83 @@ class FaturaResumoResponse(BaseModel):
     itens: List[FaturaItemResponse]
 
 
+class FaturaPeriodoResponse(BaseModel):
+    periodo_inicio: date
+    periodo_fim: date
+    data_vencimento: date
+    quantidade_itens: int
+    itens_em_aberto: int
+    valor_total: float
+    valor_em_aberto: float
+    valor_pago: float
+
+
+class FaturasResponse(BaseModel):
+    conta_id: int
+    conta_nome: str
+    dia_fechamento: int
+    dia_vencimento: int
+    faturas: List[FaturaPeriodoResponse]
+
+
 class PagarFaturaRequest(BaseModel):
     conta_pagamento_id: int
     data_pagamento: Optional[date] = None
     descricao: Optional[str] = None
+
+
+class PagarFaturasRequest(BaseModel):
+    conta_ids: List[int] = Field(..., min_length=1, max_length=50)
+    conta_pagamento_id: int
+    data_pagamento: Optional[date] = None
+    descricao: Optional[str] = None
+
+
+class FaturaPagaResponse(BaseModel):
+    conta_id: int
+    conta_nome: str
+    periodo_inicio: date
+    periodo_fim: date
+    data_vencimento_fatura: date
+    itens_pagos: int
+    valor_pago: float
+    itens: List[FaturaItemResponse]
+
+
+class PagamentoFaturasResponse(BaseModel):
+    conta_pagamento_id: int
+    saldo_conta_pagamento: float
+    valor_total_pago: float
+    pagamentos: List[FaturaPagaResponse]
+
+
+class CartaoResumoResponse(BaseModel):
+    conta_id: int
+    conta_nome: str
+    limite_credito: Optional[float] = None
+    faturas_fechadas: float
+    fatura_aberta: float
+    faturas_futuras: float
+    limite_utilizado: float
+    limite_disponivel: Optional[float] = None
+    percentual_utilizado: Optional[float] = None
+
+
+class CartoesResumoResponse(BaseModel):
+    limite_total: float
+    limite_utilizado: float
+    limite_disponivel: float
+    cartoes: List[CartaoResumoResponse]
+
+
+class SaldoHistoricoPonto(BaseModel):
+    data: date
+    saldo: float
+
+
+class SaldoHistoricoResponse(BaseModel):
+    conta_id: int
+    granularidade: str
+    inicio: date
+    fim: date
+    pontos: List[SaldoHistoricoPonto]
@@ -28,5 +28,6 @@ class MetaUpdate(BaseModel):
 class MetaResponse(MetaBase):
     id: int
     created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
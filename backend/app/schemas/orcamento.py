@@ -22,5 +22,36 @@ class OrcamentoResponse(OrcamentoBase):
     user_id: int
     valor_gasto: float = 0.0
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class AlertaOrcamentoResponse(BaseModel):
+    id: int
+    orcamento_id: int
+    categoria_id: int
+    categoria_nome: Optional[str] = None
+    mes: int
+    ano: int
+    limiar: int
+    percentual: float
+    valor_gasto: float
+    valor_planejado: float
+    lido: bool
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AlertasOrcamentoResponse(BaseModel):
+    alertas: list[AlertaOrcamentoResponse]
+    cursor: int
+
+
+class MarcarAlertasLidosRequest(BaseModel):
+    ate_id: int = Field(..., ge=1)
+
+
+class MarcarAlertasLidosResponse(BaseModel):
+    atualizados: int
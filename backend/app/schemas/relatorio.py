@@ -1,3 +1,5 @@
+from datetime import date, datetime
+
 from pydantic import BaseModel
 
 
@@ -5,6 +7,7 @@ class DRECategoriaResumo(BaseModel):
     categoria_id: int | None = None
     categoria_nome: str
     valor: float
+    percentual: float = 0.0
 
 
 class DREMensalResponse(BaseModel):
@@ -21,3 +24,42 @@ class DREMensalResponse(BaseModel):
     resultado_total: float
     entradas_por_categoria: list[DRECategoriaResumo]
     saidas_por_categoria: list[DRECategoriaResumo]
+
+
+class GastoPorTagResponse(BaseModel):
+    tag: str
+    quantidade: int
+    valor_total: float
+
+
+class RelatorioJobResponse(BaseModel):
+    job_id: str
+    status: str
+    filename: str
+    criado_em: datetime
+    erro: str | None = None
+
+
+class FluxoCaixaPonto(BaseModel):
+    data: date
+    saldo: float
+
+
+class FluxoCaixaConta(BaseModel):
+    conta_id: int
+    conta_nome: str
+    saldo_atual: float
+    saldo_final: float
+    saldo_minimo: float
+    data_saldo_minimo: date
+    pontos: list[FluxoCaixaPonto]
+
+
+class FluxoCaixaResponse(BaseModel):
+    inicio: date
+    fim: date
+    granularidade: str
+    itens_pendentes: int
+    itens_recorrentes: int
+    contas: list[FluxoCaixaConta]
+    total: list[FluxoCaixaPonto]
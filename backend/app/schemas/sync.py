@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+
+from app.schemas.categoria import CategoriaResponse
+from app.schemas.conta import ContaResponse
+from app.schemas.meta import MetaResponse
+from app.schemas.orcamento import OrcamentoResponse
+from app.schemas.transacao import TransacaoResponse
+
+
+class VersaoDadosResponse(BaseModel):
+    versao: int
+    ano: int | None = None
+    mes: int | None = None
+    versao_mes: int | None = None
+
+
+class SyncExcluidos(BaseModel):
+    contas: list[int] = []
+    categorias: list[int] = []
+    metas: list[int] = []
+    orcamentos: list[int] = []
+    transacoes: list[int] = []
+
+
+class SyncResponse(BaseModel):
+    cursor: str
+    completo: bool
+    contas: list[ContaResponse]
+    categorias: list[CategoriaResponse]
+    metas: list[MetaResponse]
+    orcamentos: list[OrcamentoResponse]
+    transacoes: list[TransacaoResponse]
+    excluidos: SyncExcluidos
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, create_model, model_validator
 from typing import Optional
 from datetime import date, datetime
 from app.models import TipoTransacao, StatusLiquidacao
@@ -95,3 +95,16 @@ class TransacaoResponse(TransacaoBase):
     updated_at: Optional[datetime] = None
     
     model_config = ConfigDict(from_attributes=True)
+
+
+# Projecao de `GET /transacoes?fields=`: os campos de TransacaoResponse, so `id` obrigatorio.
+TransacaoParcialResponse = create_model(
+    "TransacaoParcialResponse",
+    __doc__="Transacao com apenas os campos pedidos em `fields` (e sempre `id`)",
+    id=(int, ...),
+    **{
+        nome: (Optional[campo.annotation], None)
+        for nome, campo in TransacaoResponse.model_fields.items()
+        if nome != "id"
+    },
+)
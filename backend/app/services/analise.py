@@ -0,0 +1,117 @@
+"""
+Nucleo de analise colunar dos relatorios (NumPy).
+
+As consultas buscam apenas as colunas necessarias como tuplas (Core, sem objetos ORM)
+e cada coluna vira um array tipado num `Quadro`. Valores efetivos, somas por grupo,
+percentuais e agrupamento por mes sao calculados de forma vetorizada, sempre em
+centavos inteiros (mesma regra de arredondamento de `app.core.money`).
+
+Conversao por tipo de coluna: Integer -> int64 (nulo vira `SEM_GRUPO`), Numeric
+(dinheiro) -> centavos int64, Float -> float64, Date -> datetime64[D] (nulo vira
+NaT), Boolean -> bool; demais tipos ficam como arrays de objetos.
+"""
+from typing import Mapping
+
+import numpy as np
+from sqlalchemy import Boolean, Date, Float, Integer, Numeric
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+SEM_GRUPO = -1
+
+
+def centavos(valores) -> np.ndarray:
+    """Equivalente vetorizado de `para_centavos` (nulos contam como zero)."""
+    array = np.asarray(valores, dtype=np.float64)
+    return np.rint(np.nan_to_num(array) * 100).astype(np.int64)
+
+
+def valor_efetivo_centavos(valor, multa, juros, desconto) -> np.ndarray:
+    """Valor + multa + juros - desconto, nunca negativo, em centavos (arrays em centavos)."""
+    return np.maximum(valor + multa + juros - desconto, 0)
+
+
+def _converter(valores: tuple, tipo) -> np.ndarray:
+    if isinstance(tipo, Boolean):
+        return np.array(valores, dtype=bool)
+    if isinstance(tipo, Integer):
+        return np.array([SEM_GRUPO if v is None else v for v in valores], dtype=np.int64)
+    if isinstance(tipo, Float):
+        return np.array(valores, dtype=np.float64)
+    if isinstance(tipo, Numeric):
+        return centavos(np.array(valores, dtype=np.float64))
+    if isinstance(tipo, Date):
+        return np.array(valores, dtype="datetime64[D]")
+    array = np.empty(len(valores), dtype=object)
+    array[:] = valores
+    return array
+
+
+def _vazio(tipo) -> np.ndarray:
+    return _converter((), tipo)
+
+
+class Quadro:
+    """Colunas de uma consulta como arrays de mesmo tamanho, acessadas pelo nome."""
+
+    def __init__(self, colunas: Mapping[str, np.ndarray]):
+        self.colunas = dict(colunas)
+
+    @classmethod
+    def de_consulta(cls, db: Session, stmt: Select) -> "Quadro":
+        # Consulta Core na conexao da sessao: sem a camada de resultados do ORM por linha.
+        linhas = db.connection().execute(stmt).all()
+        colunas = list(stmt.selected_columns)
+        if not linhas:
+            return cls({c.name: _vazio(c.type) for c in colunas})
+        return cls({c.name: _converter(valores, c.type) for c, valores in zip(colunas, zip(*linhas))})
+
+    def __getitem__(self, nome: str) -> np.ndarray:
+        return self.colunas[nome]
+
+    def __len__(self) -> int:
+        return len(next(iter(self.colunas.values()), ()))
+
+    def filtrar(self, mascara: np.ndarray) -> "Quadro":
+        return Quadro({nome: valores[mascara] for nome, valores in self.colunas.items()})
+
+    def valor_efetivo(self) -> np.ndarray:
+        """Valor efetivo em centavos das colunas valor/valor_multa/valor_juros/valor_desconto."""
+        return valor_efetivo_centavos(self["valor"], self["valor_multa"], self["valor_juros"], self["valor_desconto"])
+
+
+def _somar_indices(indices: np.ndarray, valores: np.ndarray, grupos: int) -> np.ndarray:
+    # bincount soma em float64: exato para totais em centavos abaixo de 2**53.
+    return np.rint(np.bincount(indices, weights=valores, minlength=grupos)).astype(np.int64)
+
+
+def somar_por(chaves: np.ndarray, valores: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Chaves distintas (ordenadas) e a soma dos valores de cada uma."""
+    unicas, indices = np.unique(chaves, return_inverse=True)
+    return unicas, _somar_indices(indices.ravel(), valores, len(unicas))
+
+
+def somar_por_pares(chaves_a: np.ndarray, chaves_b: np.ndarray, valores: np.ndarray) -> dict[tuple, int]:
+    """Soma dos valores por par (chave_a, chave_b)."""
+    if not len(valores):
+        return {}
+    pares, indices = np.unique(np.column_stack([chaves_a, chaves_b]), axis=0, return_inverse=True)
+    somas = _somar_indices(indices.ravel(), valores, len(pares))
+    return {(int(a), int(b)): int(s) for (a, b), s in zip(pares, somas)}
+
+
+def percentuais(valores: np.ndarray, total: int | None = None) -> np.ndarray:
+    """Participacao de cada valor no total (em %, duas casas); total zero da zeros."""
+    total = int(valores.sum()) if total is None else total
+    if not total:
+        return np.zeros(len(valores))
+    return np.round(valores * 100 / total, 2)
+
+
+def chave_mes(datas: np.ndarray) -> np.ndarray:
+    """Indice do mes de cada data (`ano * 12 + mes - 1`), para agrupar por mes."""
+    return datas.astype("datetime64[M]").astype(np.int64) + 1970 * 12
+
+
+def chave_mes_de(ano: int, mes: int) -> int:
+    return ano * 12 + mes - 1
@@ -0,0 +1,362 @@
+"""
+Backup e restauracao completos dos dados de um usuario em NDJSON.
+
+Formato: a primeira linha e o cabecalho (`{"formato": "financas-backup", ...}`);
+cada linha seguinte e `{"tabela": <nome>, "dados": {...}}`, com as tabelas na ordem
+de `TABELAS_BACKUP` (dependencias antes de quem as referencia).
+
+A restauracao le linha a linha e insere em lotes (`INSERT ... RETURNING id`),
+remapeando os IDs de cada tabela e gerando novos UUIDs de forma consistente, para
+que `transacao_uuid`, `grupo_parcelamento_uuid` e `transacao_dizimo_uuid` continuem
+ligando as mesmas transacoes. Tags, saldos das contas e acumulados de metas e
+orcamentos sao recalculados numa passada unica ao final.
+"""
+import enum
+import json
+import uuid
+from datetime import date, datetime, timezone
+from typing import IO, Any, Iterable, Iterator
+
+from sqlalchemy import Date, DateTime, Enum, bindparam, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.text import normalize_text, parse_tags
+from app.crud import crud_reconciliacao
+from app.crud.crud_fatura import reconstruir_faturas
+from app.crud.crud_transacao import recalcular_acumulados
+from app.crud.crud_versao import PERIODO_GLOBAL, incrementar_versao
+from app.models import (
+    Categoria,
+    ConfiguracaoCristao,
+    Conta,
+    Delegacao,
+    DelegacaoStatus,
+    Meta,
+    Orcamento,
+    SaldoDiario,
+    Transacao,
+    TransacaoTag,
+    User,
+)
+from app.models.financeiro import texto_busca_transacao
+from app.services.catalogo_categorias import catalogo_categorias
+
+FORMATO = "financas-backup"
+VERSAO_FORMATO = 1
+TAMANHO_LOTE = 1000
+
+TABELAS_BACKUP = {
+    "categorias": Categoria,
+    "contas": Conta,
+    "metas": Meta,
+    "transacoes": Transacao,
+    "orcamentos": Orcamento,
+    "saldos_diarios": SaldoDiario,
+    "configuracao_cristao": ConfiguracaoCristao,
+    "delegacoes": Delegacao,
+}
+# Derivadas: recalculadas na restauracao.
+COLUNAS_EXCLUIDAS = {"busca_normalizada", "nome_normalizado"}
+
+
+class BackupInvalidoError(ValueError):
+    pass
+
+
+def _colunas(modelo) -> list:
+    return [c for c in modelo.__table__.columns if c.name not in COLUNAS_EXCLUIDAS]
+
+
+def _filtro_usuario(modelo, user_id: int):
+    if modelo is Categoria:
+        # Categorias padrao (user_id nulo) vao junto para mapear as referencias na restauracao.
+        return or_(Categoria.user_id == user_id, Categoria.user_id.is_(None))
+    if modelo is Delegacao:
+        return Delegacao.owner_user_id == user_id
+    return modelo.user_id == user_id
+
+
+def _serializar(valor: Any) -> Any:
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return valor
+
+
+def _desserializar(valor: Any, tipo_coluna) -> Any:
+    if valor is None:
+        return None
+    if isinstance(tipo_coluna, Enum) and tipo_coluna.enum_class is not None:
+        return tipo_coluna.enum_class(valor)
+    if isinstance(tipo_coluna, DateTime):
+        return datetime.fromisoformat(valor)
+    if isinstance(tipo_coluna, Date):
+        return date.fromisoformat(valor)
+    return valor
+
+
+def gerar_backup(db: Session, user_id: int, tamanho_lote: int = TAMANHO_LOTE) -> Iterator[str]:
+    """Gera as linhas NDJSON (com `\\n`) do backup do usuario, lendo cada tabela em streaming."""
+    cabecalho = {
+        "formato": FORMATO,
+        "versao": VERSAO_FORMATO,
+        "user_id": user_id,
+        "gerado_em": datetime.now(timezone.utc).isoformat(),
+    }
+    yield json.dumps(cabecalho) + "\n"
+
+    for nome, modelo in TABELAS_BACKUP.items():
+        colunas = _colunas(modelo)
+        stmt = (
+            select(*colunas)
+            .where(_filtro_usuario(modelo, user_id))
+            .order_by(modelo.__table__.c.id)
+            .execution_options(yield_per=tamanho_lote)
+        )
+        for linha in db.execute(stmt):
+            dados = {coluna.name: _serializar(valor) for coluna, valor in zip(colunas, linha)}
+            yield json.dumps({"tabela": nome, "dados": dados}, ensure_ascii=False) + "\n"
+
+
+class _Restauracao:
+    def __init__(self, db: Session, user_id: int):
+        self.db = db
+        self.user_id = user_id
+        self.ids: dict[str, dict[int, int]] = {nome: {} for nome in TABELAS_BACKUP}
+        self.uuids: dict[str, str] = {}
+        self.entradas_origem: list[tuple[int, int]] = []
+        self.periodos: set[tuple[int, int]] = {PERIODO_GLOBAL}
+        self.metas: set[int] = set()
+        self.orcamentos: set[tuple[int, int, int]] = set()
+        self.totais: dict[str, int] = {nome: 0 for nome in TABELAS_BACKUP}
+
+    def _novo_uuid(self, antigo: str | None) -> str | None:
+        if antigo is None:
+            return None
+        if antigo not in self.uuids:
+            self.uuids[antigo] = str(uuid.uuid4())
+        return self.uuids[antigo]
+
+    def _mapear(self, tabela: str, antigo_id: int | None, obrigatorio: bool = False) -> int | None:
+        if antigo_id is None:
+            return None
+        novo = self.ids[tabela].get(antigo_id)
+        if novo is None and obrigatorio:
+            raise BackupInvalidoError(f"Referencia a {tabela}.id={antigo_id} ausente no backup")
+        return novo
+
+    def _inserir(self, nome: str, registros: list[dict], ids_antigos: list[int]) -> list[int]:
+        tabela = TABELAS_BACKUP[nome].__table__
+        resultado = self.db.execute(insert(tabela).returning(tabela.c.id, sort_by_parameter_order=True), registros)
+        novos_ids = [linha.id for linha in resultado]
+        self.ids[nome].update(zip(ids_antigos, novos_ids))
+        self.totais[nome] += len(novos_ids)
+        return novos_ids
+
+    def _preparar_categorias(self, registros: list[dict]) -> list[dict]:
+        restantes = []
+        for r in registros:
+            if r["user_id"] is None:
+                padrao = catalogo_categorias.buscar(self.db, r["tipo"], r["nome"])
+                if padrao:
+                    self.ids["categorias"][r["id"]] = padrao.id
+                    continue
+            restantes.append({**r, "user_id": self.user_id, "nome_normalizado": normalize_text(r["nome"])})
+        return restantes
+
+    def _preparar_transacoes(self, registros: list[dict]) -> list[dict]:
+        for r in registros:
+            r["user_id"] = self.user_id
+            r["conta_id"] = self._mapear("contas", r["conta_id"], obrigatorio=True)
+            r["categoria_id"] = self._mapear("categorias", r["categoria_id"])
+            r["meta_id"] = self._mapear("metas", r["meta_id"])
+            r["transacao_uuid"] = self._novo_uuid(r["transacao_uuid"])
+            r["transacao_dizimo_uuid"] = self._novo_uuid(r["transacao_dizimo_uuid"])
+            r["grupo_parcelamento_uuid"] = self._novo_uuid(r["grupo_parcelamento_uuid"])
+            r["busca_normalizada"] = texto_busca_transacao(r["descricao"], r["observacoes"], r["tags"])
+            self.periodos.add((r["data"].year, r["data"].month))
+            if r["meta_id"] is not None:
+                self.metas.add(r["meta_id"])
+        return registros
+
+    def _preparar_delegacoes(self, registros: list[dict]) -> list[dict]:
+        restantes = []
+        for r in registros:
+            convidado = self.db.query(User.id).filter(User.email == r["invited_email"]).first()
+            convidado_id = convidado.id if convidado else None
+            if convidado_id == self.user_id:
+                continue
+            status = r["status"]
+            if convidado_id is None and status == DelegacaoStatus.ACCEPTED:
+                status = DelegacaoStatus.PENDING
+            # Tokens de convite pertencem a instancia de origem.
+            restantes.append(
+                {
+                    **r,
+                    "owner_user_id": self.user_id,
+                    "delegate_user_id": convidado_id,
+                    "status": status,
+                    "invite_token": None,
+                    "invite_expires_at": None,
+                }
+            )
+        return restantes
+
+    def gravar_lote(self, nome: str, registros: list[dict]) -> None:
+        if nome == "categorias":
+            registros = self._preparar_categorias(registros)
+        elif nome in {"contas", "metas"}:
+            registros = [{**r, "user_id": self.user_id} for r in registros]
+        elif nome == "transacoes":
+            registros = self._preparar_transacoes(registros)
+        elif nome == "orcamentos":
+            registros = [
+                {**r, "user_id": self.user_id, "categoria_id": self._mapear("categorias", r["categoria_id"], obrigatorio=True)}
+                for r in registros
+            ]
+            self.orcamentos.update((r["categoria_id"], r["mes"], r["ano"]) for r in registros)
+        elif nome == "saldos_diarios":
+            registros = [
+                {**r, "user_id": self.user_id, "conta_id": self._mapear("contas", r["conta_id"], obrigatorio=True)}
+                for r in registros
+            ]
+        elif nome == "configuracao_cristao":
+            self._gravar_configuracao(registros[-1])
+            return
+        elif nome == "delegacoes":
+            registros = self._preparar_delegacoes(registros)
+
+        if not registros:
+            return
+        ids_antigos = [r.pop("id") for r in registros]
+        if nome == "transacoes":
+            origens = [r.pop("entrada_origem_id") for r in registros]
+        novos_ids = self._inserir(nome, registros, ids_antigos)
+
+        if nome == "transacoes":
+            self.entradas_origem.extend((novo, origem) for novo, origem in zip(novos_ids, origens) if origem is not None)
+            tags = [
+                {"transacao_id": novo, "user_id": self.user_id, "tag": tag}
+                for novo, r in zip(novos_ids, registros)
+                for tag in parse_tags(r["tags"])
+            ]
+            if tags:
+                self.db.execute(insert(TransacaoTag.__table__), tags)
+
+    def _gravar_configuracao(self, registro: dict) -> None:
+        dados = {
+            k: v for k, v in registro.items() if k not in {"id", "user_id", "created_at", "updated_at"}
+        }
+        for campo in ("categoria_dizimo_id", "categoria_oferta_id", "categoria_missoes_id"):
+            dados[campo] = self._mapear("categorias", dados[campo])
+        config = self.db.query(ConfiguracaoCristao).filter(ConfiguracaoCristao.user_id == self.user_id).first()
+        if config is None:
+            config = ConfiguracaoCristao(user_id=self.user_id)
+            self.db.add(config)
+        for campo, valor in dados.items():
+            setattr(config, campo, valor)
+        self.totais["configuracao_cristao"] += 1
+
+    def finalizar(self) -> None:
+        """Passada unica ao final: vinculos de dizimo, saldos, metas, orcamentos e versoes."""
+        vinculos = [
+            {"b_id": novo, "b_origem": self.ids["transacoes"].get(origem)} for novo, origem in self.entradas_origem
+        ]
+        if vinculos:
+            tabela = Transacao.__table__
+            self.db.execute(
+                update(tabela).where(tabela.c.id == bindparam("b_id")).values(entrada_origem_id=bindparam("b_origem")),
+                vinculos,
+                execution_options={"synchronize_session": False},
+            )
+
+        contas_restauradas = set(self.ids["contas"].values())
+        _, divergencias = crud_reconciliacao.calcular_divergencias(self.db, user_id=self.user_id)
+        saldos = [
+            {"b_id": d.conta_id, "b_saldo": d.saldo_esperado}
+            for d in divergencias
+            if d.conta_id in contas_restauradas
+        ]
+        if saldos:
+            tabela = Conta.__table__
+            self.db.execute(
+                update(tabela).where(tabela.c.id == bindparam("b_id")).values(saldo=bindparam("b_saldo")),
+                saldos,
+                execution_options={"synchronize_session": False},
+            )
+
+        recalcular_acumulados(self.db, self.user_id, sorted(self.metas), sorted(self.orcamentos))
+
+        # Insercoes em massa nao passam pelos listeners da sessao: faturas sao regravadas aqui.
+        for conta_id in sorted(contas_restauradas):
+            reconstruir_faturas(self.db, conta_id)
+
+        incrementar_versao(self.db, self.user_id, self.periodos)
+
+
+def restaurar_backup(
+    db: Session,
+    linhas: Iterable[str],
+    user_id: int,
+    tamanho_lote: int = TAMANHO_LOTE,
+) -> dict[str, int]:
+    """
+    Restaura um backup NDJSON no usuario `user_id` (em adicao aos dados existentes).
+
+    Tudo roda numa unica transacao: em caso de erro nada e gravado. Retorna o
+    numero de registros restaurados por tabela.
+    """
+    iterador = iter(linhas)
+    try:
+        cabecalho = json.loads(next(iterador))
+    except (StopIteration, ValueError):
+        raise BackupInvalidoError("Backup vazio ou sem cabecalho")
+    if cabecalho.get("formato") != FORMATO or cabecalho.get("versao") != VERSAO_FORMATO:
+        raise BackupInvalidoError("Formato de backup nao suportado")
+
+    restauracao = _Restauracao(db, user_id)
+    ordem = list(TABELAS_BACKUP)
+    tabela_atual: str | None = None
+    lote: list[dict] = []
+
+    try:
+        for numero, linha in enumerate(iterador, start=2):
+            if not linha.strip():
+                continue
+            try:
+                registro = json.loads(linha)
+                nome = registro["tabela"]
+                dados = registro["dados"]
+            except (ValueError, KeyError, TypeError):
+                raise BackupInvalidoError(f"Linha {numero} invalida")
+            if nome not in TABELAS_BACKUP:
+                raise BackupInvalidoError(f"Tabela desconhecida na linha {numero}: {nome}")
+
+            if nome != tabela_atual:
+                if tabela_atual is not None and ordem.index(nome) < ordem.index(tabela_atual):
+                    raise BackupInvalidoError(f"Tabela fora de ordem na linha {numero}: {nome}")
+                if lote:
+                    restauracao.gravar_lote(tabela_atual, lote)
+                tabela_atual, lote = nome, []
+
+            colunas = {c.name: c.type for c in _colunas(TABELAS_BACKUP[nome])}
+            lote.append({campo: _desserializar(dados.get(campo), tipo) for campo, tipo in colunas.items()})
+            if len(lote) >= tamanho_lote:
+                restauracao.gravar_lote(tabela_atual, lote)
+                lote = []
+
+        if lote:
+            restauracao.gravar_lote(tabela_atual, lote)
+        restauracao.finalizar()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return restauracao.totais
+
+
+def escrever_backup(db: Session, user_id: int, destino: IO[str]) -> None:
+    for linha in gerar_backup(db, user_id):
+        destino.write(linha)
@@ -0,0 +1,134 @@
+"""
+Catalogo em memoria das categorias padrao do sistema (`Categoria.user_id IS NULL`).
+
+As categorias padrao so mudam quando o `seed_categorias.py` roda, entao cada processo
+guarda uma copia imutavel (tuplas de `CategoriaPadrao`) carregada na subida da API.
+A cada `CATEGORIAS_PADRAO_VERIFICACAO_SEGUNDOS` uma consulta agregada (quantidade,
+maior id e maior `updated_at`) detecta um reseed feito por outro processo e recarrega.
+Escritas feitas pelo proprio processo invalidam o catalogo no commit.
+"""
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.text import normalize_text
+from app.models import Categoria, TipoTransacao
+
+
+@dataclass(frozen=True)
+class CategoriaPadrao:
+    id: int
+    nome: str
+    icone: Optional[str]
+    cor: Optional[str]
+    tipo: TipoTransacao
+    padrao: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    nome_normalizado: str
+    user_id: None = None
+
+
+class CatalogoCategorias:
+    def __init__(self, intervalo_verificacao: float):
+        self.intervalo_verificacao = intervalo_verificacao
+        self._itens: tuple[CategoriaPadrao, ...] = ()
+        self._por_id: Mapping[int, CategoriaPadrao] = MappingProxyType({})
+        self._por_tipo_nome: Mapping[tuple[TipoTransacao, str], CategoriaPadrao] = MappingProxyType({})
+        self._assinatura: tuple | None = None
+        self._verificado_em = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _consultar_assinatura(db: Session) -> tuple:
+        return tuple(
+            db.query(func.count(Categoria.id), func.max(Categoria.id), func.max(Categoria.updated_at))
+            .filter(Categoria.user_id.is_(None))
+            .one()
+        )
+
+    def carregar(self, db: Session) -> None:
+        linhas = db.query(Categoria).filter(Categoria.user_id.is_(None)).order_by(Categoria.id).all()
+        itens = tuple(
+            CategoriaPadrao(
+                id=c.id,
+                nome=c.nome,
+                icone=c.icone,
+                cor=c.cor,
+                tipo=c.tipo,
+                padrao=bool(c.padrao),
+                created_at=c.created_at,
+                updated_at=c.updated_at,
+                nome_normalizado=normalize_text(c.nome),
+            )
+            for c in linhas
+        )
+        assinatura = self._consultar_assinatura(db)
+        with self._lock:
+            self._itens = itens
+            self._por_id = MappingProxyType({c.id: c for c in itens})
+            self._por_tipo_nome = MappingProxyType({(c.tipo, c.nome_normalizado): c for c in reversed(itens)})
+            self._assinatura = assinatura
+            self._verificado_em = time.monotonic()
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._assinatura = None
+
+    def _garantir_atual(self, db: Session) -> None:
+        if self._assinatura is not None and time.monotonic() - self._verificado_em < self.intervalo_verificacao:
+            return
+        if self._assinatura is not None and self._consultar_assinatura(db) == self._assinatura:
+            self._verificado_em = time.monotonic()
+            return
+        self.carregar(db)
+
+    def versao(self, db: Session) -> str:
+        """Resumo da assinatura do catalogo servido; muda a cada reseed (entra no ETag de `/categorias`)."""
+        self._garantir_atual(db)
+        return hashlib.sha256(repr(self._assinatura).encode("utf-8")).hexdigest()[:12]
+
+    def listar(self, db: Session) -> tuple[CategoriaPadrao, ...]:
+        self._garantir_atual(db)
+        return self._itens
+
+    def obter(self, db: Session, categoria_id: int) -> Optional[CategoriaPadrao]:
+        self._garantir_atual(db)
+        return self._por_id.get(categoria_id)
+
+    def buscar(self, db: Session, tipo: TipoTransacao, nome: str) -> Optional[CategoriaPadrao]:
+        """Categoria padrao do tipo pelo nome normalizado (sem acento, minusculo)."""
+        self._garantir_atual(db)
+        return self._por_tipo_nome.get((tipo, normalize_text(nome)))
+
+
+catalogo_categorias = CatalogoCategorias(settings.CATEGORIAS_PADRAO_VERIFICACAO_SEGUNDOS)
+
+
+def _toca_categoria_padrao(objeto) -> bool:
+    return isinstance(objeto, Categoria) and objeto.user_id is None
+
+
+@event.listens_for(Session, "before_flush")
+def _marcar_categorias_padrao_alteradas(session: Session, flush_context, instances) -> None:
+    if any(_toca_categoria_padrao(o) for o in (*session.new, *session.dirty, *session.deleted)):
+        session.info["categorias_padrao_alteradas"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_catalogo(session: Session) -> None:
+    if session.info.pop("categorias_padrao_alteradas", False):
+        catalogo_categorias.invalidar()
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_marca(session: Session) -> None:
+    session.info.pop("categorias_padrao_alteradas", None)
@@ -0,0 +1,287 @@
+"""
+Notificacoes de alteracao dos dados de cada usuario (server-sent events).
+
+Toda escrita passa por `crud_versao.incrementar_versao` (listener de flush ou chamada
+explicita nas escritas em massa), que anota na sessao o que mudou para o usuario.
+No commit, cada usuario afetado recebe um evento compacto:
+
+    {"meses": ["2026-10"], "categorias": false, "cadastros": true, "alertas": false}
+
+`meses` sao os meses com transacoes alteradas (null quando sao muitos: recarregar
+tudo), `cadastros` cobre contas, metas e orcamentos e `alertas` indica alertas de
+orcamento novos. Rollback descarta as anotacoes.
+
+O `Broker` entrega os eventos as conexoes abertas (`GET /eventos`): cada conexao e
+uma fila asyncio limitada, sem thread nem conexao de banco enquanto ociosa. Os
+backends decidem o alcance da publicacao: memoria (apenas o processo atual) ou
+PostgreSQL (`NOTIFY`/`LISTEN`, entre todos os workers do gunicorn).
+"""
+import asyncio
+import itertools
+import json
+import logging
+import select
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_CHAVE_PENDENTES = "eventos_pendentes"
+LIMITE_MESES = 60
+EVENTO_RESYNC = {"resync": True}
+
+Entregar = Callable[[int, dict], None]
+
+
+@dataclass
+class Alteracoes:
+    meses: set[tuple[int, int]] = field(default_factory=set)
+    categorias: bool = False
+    cadastros: bool = False
+    alertas: bool = False
+
+    def como_evento(self) -> dict:
+        meses = None
+        if len(self.meses) <= LIMITE_MESES:
+            meses = [f"{ano:04d}-{mes:02d}" for ano, mes in sorted(self.meses)]
+        return {"meses": meses, "categorias": self.categorias, "cadastros": self.cadastros, "alertas": self.alertas}
+
+
+def _pendentes(session: Session, user_id: int) -> Alteracoes:
+    return session.info.setdefault(_CHAVE_PENDENTES, {}).setdefault(user_id, Alteracoes())
+
+
+def anotar_alteracao(
+    session: Session,
+    user_id: int,
+    meses: set[tuple[int, int]],
+    categorias: bool = False,
+    cadastros: bool = False,
+) -> None:
+    """Registra o que mudou para o usuario; publicado no commit da sessao."""
+    alteracoes = _pendentes(session, user_id)
+    alteracoes.meses |= meses
+    alteracoes.categorias |= categorias
+    alteracoes.cadastros |= cadastros
+
+
+def anotar_alertas(session: Session, user_id: int) -> None:
+    _pendentes(session, user_id).alertas = True
+
+
+def formatar_evento(evento_id: int, dados: dict, nome: str = "alteracao") -> str:
+    """Um evento no formato `text/event-stream`."""
+    return f"id: {evento_id}\nevent: {nome}\ndata: {json.dumps(dados, separators=(',', ':'))}\n\n"
+
+
+class Assinatura:
+    """Conexao aberta de um usuario: fila limitada consumida no event loop do servidor."""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, tamanho_fila: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.fila: asyncio.Queue[dict] = asyncio.Queue(maxsize=tamanho_fila)
+
+    def enfileirar(self, evento: dict) -> None:
+        """Pode ser chamado de qualquer thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._colocar, evento)
+        except RuntimeError:
+            # Loop encerrado: a conexao ja terminou.
+            pass
+
+    def _colocar(self, evento: dict) -> None:
+        if self.fila.full():
+            # Cliente lento: descarta o acumulado e pede para recarregar tudo.
+            while not self.fila.empty():
+                self.fila.get_nowait()
+            evento = EVENTO_RESYNC
+        self.fila.put_nowait(evento)
+
+    async def proximo(self, espera_segundos: float) -> Optional[dict]:
+        """Proximo evento, ou None se nada chegar dentro da espera (hora do heartbeat)."""
+        try:
+            return await asyncio.wait_for(self.fila.get(), espera_segundos)
+        except asyncio.TimeoutError:
+            return None
+
+
+class BackendMemoria:
+    """Entrega apenas as conexoes do proprio processo."""
+
+    def iniciar(self, entregar: Entregar) -> None:
+        self._entregar = entregar
+
+    def publicar(self, user_id: int, evento: dict) -> None:
+        entregar = getattr(self, "_entregar", None)
+        if entregar is not None:
+            entregar(user_id, evento)
+
+    def encerrar(self) -> None:
+        self._entregar = None
+
+
+class BackendPostgres:
+    """
+    `pg_notify` na publicacao e uma conexao `LISTEN` por processo (thread daemon), que
+    repassa as notificacoes de todos os workers as conexoes locais.
+    """
+
+    CANAL = "financas_eventos"
+
+    def __init__(self, database_url: str, intervalo_segundos: float = 5.0):
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.intervalo_segundos = intervalo_segundos
+        self._conexao_publicacao = None
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _conectar(self):
+        import psycopg2
+
+        conexao = psycopg2.connect(self.dsn)
+        conexao.autocommit = True
+        return conexao
+
+    def iniciar(self, entregar: Entregar) -> None:
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._escutar, args=(entregar,), name="eventos-listen", daemon=True)
+        self._thread.start()
+
+    def _escutar(self, entregar: Entregar) -> None:
+        while not self._parar.is_set():
+            try:
+                conexao = self._conectar()
+                with conexao.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.CANAL}")
+                while not self._parar.is_set():
+                    if select.select([conexao], [], [], self.intervalo_segundos) == ([], [], []):
+                        continue
+                    conexao.poll()
+                    while conexao.notifies:
+                        mensagem = json.loads(conexao.notifies.pop(0).payload)
+                        entregar(mensagem["user_id"], mensagem["evento"])
+                conexao.close()
+            except Exception:
+                logger.exception("Falha na escuta de eventos; reconectando")
+                self._parar.wait(self.intervalo_segundos)
+
+    def publicar(self, user_id: int, evento: dict) -> None:
+        payload = json.dumps({"user_id": user_id, "evento": evento}, separators=(",", ":"))
+        with self._lock:
+            try:
+                if self._conexao_publicacao is None or self._conexao_publicacao.closed:
+                    self._conexao_publicacao = self._conectar()
+                with self._conexao_publicacao.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s)", (self.CANAL, payload))
+            except Exception:
+                # Notificacao e melhor esforco: a escrita ja foi confirmada.
+                logger.exception("Falha ao publicar evento")
+                self._conexao_publicacao = None
+
+    def encerrar(self) -> None:
+        self._parar.set()
+        with self._lock:
+            if self._conexao_publicacao is not None:
+                self._conexao_publicacao.close()
+                self._conexao_publicacao = None
+
+
+class ConexoesEsgotadasError(RuntimeError):
+    pass
+
+
+class Broker:
+    def __init__(self, backend, tamanho_fila: int, max_conexoes: int):
+        self.backend = backend
+        self.tamanho_fila = tamanho_fila
+        self.max_conexoes = max_conexoes
+        self._assinaturas: dict[int, set[Assinatura]] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self._iniciado = False
+        self._sequencia = itertools.count(1)
+
+    def proximo_id(self) -> int:
+        return next(self._sequencia)
+
+    @property
+    def total_conexoes(self) -> int:
+        return self._total
+
+    def _iniciar(self) -> None:
+        if not self._iniciado:
+            self.backend.iniciar(self.entregar)
+            self._iniciado = True
+
+    def publicar(self, user_id: int, evento: dict) -> None:
+        with self._lock:
+            self._iniciar()
+        self.backend.publicar(user_id, evento)
+
+    def entregar(self, user_id: int, evento: dict) -> None:
+        """Chamado pelo backend (qualquer thread) para as conexoes locais do usuario."""
+        with self._lock:
+            assinaturas = list(self._assinaturas.get(user_id, ()))
+        for assinatura in assinaturas:
+            assinatura.enfileirar(evento)
+
+    def assinar(self, user_id: int) -> Assinatura:
+        """Registra uma conexao; chamar dentro do event loop que vai consumi-la."""
+        assinatura = Assinatura(user_id, asyncio.get_running_loop(), self.tamanho_fila)
+        with self._lock:
+            if self._total >= self.max_conexoes:
+                raise ConexoesEsgotadasError("Limite de conexoes de eventos atingido")
+            self._iniciar()
+            self._assinaturas.setdefault(user_id, set()).add(assinatura)
+            self._total += 1
+        return assinatura
+
+    def cancelar(self, assinatura: Assinatura) -> None:
+        with self._lock:
+            assinaturas = self._assinaturas.get(assinatura.user_id)
+            if assinaturas and assinatura in assinaturas:
+                assinaturas.discard(assinatura)
+                self._total -= 1
+                if not assinaturas:
+                    del self._assinaturas[assinatura.user_id]
+
+    def encerrar(self) -> None:
+        with self._lock:
+            if self._iniciado:
+                self.backend.encerrar()
+                self._iniciado = False
+
+
+def criar_broker() -> Broker:
+    backend = settings.EVENTOS_BACKEND
+    if backend == "postgres":
+        implementacao = BackendPostgres(settings.DATABASE_URL)
+    else:
+        implementacao = BackendMemoria()
+    return Broker(implementacao, settings.EVENTOS_TAMANHO_FILA, settings.EVENTOS_MAX_CONEXOES)
+
+
+broker = criar_broker()
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_pendentes(session: Session) -> None:
+    pendentes = session.info.pop(_CHAVE_PENDENTES, None)
+    if not pendentes or settings.EVENTOS_BACKEND == "desativado":
+        return
+    for user_id, alteracoes in pendentes.items():
+        broker.publicar(user_id, alteracoes.como_evento())
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_pendentes(session: Session) -> None:
+    session.info.pop(_CHAVE_PENDENTES, None)
@@ -0,0 +1,131 @@
+"""
+Cache das exportacoes renderizadas (CSV/PDF do DRE) com despejo LRU limitado por tamanho.
+
+A chave inclui a versao dos dados do periodo (`crud_versao.obter_versao`), entao
+nenhuma invalidacao explicita e necessaria: uma escrita gera chave nova e a entrada
+antiga sai pelo LRU. Backends: memoria do processo ou diretorio local (compartilhado
+entre os workers do gunicorn).
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from uuid import uuid4
+
+from app.core.config import settings
+
+
+class CacheMemoria:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._itens: OrderedDict[str, bytes] = OrderedDict()
+        self._tamanho = 0
+        self._lock = threading.Lock()
+
+    def obter(self, chave: str) -> bytes | None:
+        with self._lock:
+            conteudo = self._itens.get(chave)
+            if conteudo is not None:
+                self._itens.move_to_end(chave)
+            return conteudo
+
+    def guardar(self, chave: str, conteudo: bytes) -> None:
+        if len(conteudo) > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._itens.pop(chave, None)
+            if anterior is not None:
+                self._tamanho -= len(anterior)
+            self._itens[chave] = conteudo
+            self._tamanho += len(conteudo)
+            while self._tamanho > self.max_bytes:
+                _, removido = self._itens.popitem(last=False)
+                self._tamanho -= len(removido)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+            self._tamanho = 0
+
+
+class CacheDisco:
+    """Um arquivo por entrada; o mtime marca o ultimo acesso para o despejo LRU."""
+
+    def __init__(self, diretorio: str | Path, max_bytes: int):
+        self.diretorio = Path(diretorio)
+        self.max_bytes = max_bytes
+
+    def _caminho(self, chave: str) -> Path:
+        return self.diretorio / (hashlib.sha256(chave.encode("utf-8")).hexdigest() + ".bin")
+
+    def obter(self, chave: str) -> bytes | None:
+        caminho = self._caminho(chave)
+        try:
+            conteudo = caminho.read_bytes()
+            os.utime(caminho)
+        except OSError:
+            return None
+        return conteudo
+
+    def guardar(self, chave: str, conteudo: bytes) -> None:
+        if len(conteudo) > self.max_bytes:
+            return
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        temporario = self.diretorio / f".{uuid4().hex}.tmp"
+        temporario.write_bytes(conteudo)
+        os.replace(temporario, self._caminho(chave))
+        self._despejar()
+
+    def _despejar(self) -> None:
+        entradas = []
+        for arquivo in self.diretorio.glob("*.bin"):
+            try:
+                info = arquivo.stat()
+            except OSError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, arquivo))
+        tamanho = sum(e[1] for e in entradas)
+        for _, tamanho_arquivo, arquivo in sorted(entradas, key=lambda e: e[0]):
+            if tamanho <= self.max_bytes:
+                break
+            try:
+                arquivo.unlink()
+            except OSError:
+                continue
+            tamanho -= tamanho_arquivo
+
+    def limpar(self) -> None:
+        for arquivo in self.diretorio.glob("*.bin"):
+            arquivo.unlink(missing_ok=True)
+
+
+def etag_conteudo(conteudo: bytes) -> str:
+    """ETag forte derivado do conteudo (mesmos bytes, mesmo ETag em qualquer worker)."""
+    return '"' + hashlib.sha256(conteudo).hexdigest() + '"'
+
+
+def _sem_prefixo_fraco(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_corresponde(if_none_match: str | None, etag: str) -> bool:
+    """Comparacao fraca (RFC 9110): a resposta comprimida devolve o ETag com `W/`."""
+    if not if_none_match:
+        return False
+    candidatos = {_sem_prefixo_fraco(valor.strip()) for valor in if_none_match.split(",")}
+    return "*" in candidatos or _sem_prefixo_fraco(etag) in candidatos
+
+
+def criar_cache_exportacoes() -> CacheMemoria | CacheDisco | None:
+    backend = settings.EXPORT_CACHE_BACKEND
+    if backend == "memoria":
+        return CacheMemoria(settings.EXPORT_CACHE_MAX_BYTES)
+    if backend == "disco":
+        diretorio = settings.EXPORT_CACHE_DIR or Path(tempfile.gettempdir()) / "financas_exportacoes"
+        return CacheDisco(diretorio, settings.EXPORT_CACHE_MAX_BYTES)
+    return None
+
+
+cache_exportacoes = criar_cache_exportacoes()
@@ -0,0 +1,135 @@
+"""
+Exportacao colunar (Parquet) dos dados de um usuario ou de todos os usuarios.
+
+Cada tabela vira um arquivo Parquet com compressao zstd. O esquema Arrow e derivado
+das colunas do modelo SQLAlchemy (Dinheiro -> decimal128(14, 2), Enum -> dictionary
+de strings, DateTime com fuso -> timestamp UTC). As linhas sao lidas com `yield_per`
+(cursor no servidor no PostgreSQL) e gravadas lote a lote, com memoria constante.
+"""
+import enum
+from pathlib import Path
+from typing import Iterable
+
+from sqlalchemy import Boolean, Date, DateTime, Enum, Float, Integer, Numeric, String, Text, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import Categoria, Conta, Meta, Orcamento, Transacao
+
+# PyArrow e fixado no requirements.txt; a guarda so cobre instalacoes minimas,
+# em que a exportacao colunar fica indisponivel.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
+TABELAS_EXPORTACAO = {
+    "contas": Conta,
+    "categorias": Categoria,
+    "transacoes": Transacao,
+    "orcamentos": Orcamento,
+    "metas": Meta,
+}
+# Colunas derivadas, recalculaveis a partir das demais.
+COLUNAS_EXCLUIDAS = {"busca_normalizada", "nome_normalizado"}
+TAMANHO_LOTE = 50_000
+COMPRESSAO = "zstd"
+
+
+def _tipo_arrow(tipo_coluna):
+    if isinstance(tipo_coluna, Enum):
+        return pa.dictionary(pa.int32(), pa.string())
+    if isinstance(tipo_coluna, Boolean):
+        return pa.bool_()
+    if isinstance(tipo_coluna, Integer):
+        return pa.int64()
+    if isinstance(tipo_coluna, Numeric) and not isinstance(tipo_coluna, Float):
+        return pa.decimal128(tipo_coluna.precision or 38, tipo_coluna.scale or 0)
+    if isinstance(tipo_coluna, Float):
+        return pa.float64()
+    if isinstance(tipo_coluna, DateTime):
+        return pa.timestamp("us", tz="UTC") if tipo_coluna.timezone else pa.timestamp("us")
+    if isinstance(tipo_coluna, Date):
+        return pa.date32()
+    if isinstance(tipo_coluna, (String, Text)):
+        return pa.string()
+    raise TypeError(f"Tipo de coluna sem mapeamento Arrow: {tipo_coluna!r}")
+
+
+def _colunas_exportadas(modelo) -> list:
+    return [c for c in modelo.__table__.columns if c.name not in COLUNAS_EXCLUIDAS]
+
+
+def esquema_arrow(modelo) -> "pa.Schema":
+    """Esquema Arrow tipado a partir das colunas do modelo."""
+    return pa.schema(
+        [pa.field(c.name, _tipo_arrow(c.type), nullable=bool(c.nullable)) for c in _colunas_exportadas(modelo)]
+    )
+
+
+def _expressao_coluna(coluna):
+    # Dinheiro e mapeado com asdecimal=False; para o decimal128 le-se o valor exato.
+    if isinstance(coluna.type, Numeric) and not isinstance(coluna.type, Float):
+        return coluna.cast(Numeric(coluna.type.precision, coluna.type.scale, asdecimal=True)).label(coluna.name)
+    return coluna
+
+
+def _valores(valores: Iterable, tipo_coluna) -> list:
+    if isinstance(tipo_coluna, Enum):
+        return [v.value if isinstance(v, enum.Enum) else v for v in valores]
+    return list(valores)
+
+
+def _filtro_usuario(modelo, user_id: int):
+    if modelo is Categoria:
+        # Categorias padrao do sistema (user_id nulo) acompanham a exportacao do usuario.
+        return or_(Categoria.user_id == user_id, Categoria.user_id.is_(None))
+    return modelo.user_id == user_id
+
+
+def exportar_tabela(
+    db: Session,
+    modelo,
+    destino: Path,
+    user_id: int | None = None,
+    tamanho_lote: int = TAMANHO_LOTE,
+) -> int:
+    """Grava a tabela do modelo em `destino` (Parquet) e retorna o numero de linhas."""
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("PyArrow indisponivel")
+
+    colunas = _colunas_exportadas(modelo)
+    esquema = esquema_arrow(modelo)
+    stmt = select(*[_expressao_coluna(c) for c in colunas]).order_by(modelo.__table__.c.id)
+    if user_id is not None:
+        stmt = stmt.where(_filtro_usuario(modelo, user_id))
+
+    total = 0
+    with pq.ParquetWriter(destino, esquema, compression=COMPRESSAO) as writer:
+        resultado = db.execute(stmt.execution_options(yield_per=tamanho_lote))
+        for lote in resultado.partitions():
+            valores_colunas = list(zip(*lote))
+            arrays = [
+                pa.array(_valores(valores, coluna.type), type=campo.type)
+                for valores, coluna, campo in zip(valores_colunas, colunas, esquema)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=esquema))
+            total += len(lote)
+    return total
+
+
+def exportar_dados(
+    db: Session,
+    diretorio: str | Path,
+    user_id: int | None = None,
+    tamanho_lote: int = TAMANHO_LOTE,
+) -> dict[str, int]:
+    """Exporta todas as tabelas de `TABELAS_EXPORTACAO` para `diretorio/<tabela>.parquet`."""
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    return {
+        nome: exportar_tabela(db, modelo, diretorio / f"{nome}.parquet", user_id=user_id, tamanho_lote=tamanho_lote)
+        for nome, modelo in TABELAS_EXPORTACAO.items()
+    }
@@ -0,0 +1,231 @@
+"""
+Projecao de fluxo de caixa por conta a partir dos lancamentos pendentes.
+
+Os itens em aberto (previsto/atrasado) e as repeticoes mensais dos lancamentos
+fixos/recorrentes sao carregados como arrays compactos (data, valor efetivo em
+centavos com sinal, conta) e o saldo diario de cada conta sai de uma soma acumulada
+vetorizada sobre a matriz conta x dia:
+
+- parcelas ja existem como transacoes futuras e entram como qualquer item pendente;
+- o item entra no vencimento (ou na data, sem vencimento); compras no cartao entram
+  no vencimento da fatura a que pertencem;
+- itens atrasados (data ja passada) entram no primeiro dia da projecao;
+- cada serie fixa/recorrente (conta, tipo, descricao, categoria) repete o valor do
+  ultimo lancamento todo mes depois dele, sem duplicar meses que ja tem transacao.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import false, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.crud.crud_fatura import calcular_vencimento_fatura, fechamento_da_data
+from app.models import Conta, StatusLiquidacao, TipoConta, TipoTransacao, Transacao
+from app.services.analise import centavos, valor_efetivo_centavos
+
+STATUS_PENDENTES = (StatusLiquidacao.PREVISTO, StatusLiquidacao.ATRASADO)
+
+
+@dataclass
+class ItensFluxo:
+    datas: np.ndarray  # datetime64[D]
+    valores: np.ndarray  # int64, centavos com sinal (entradas positivas)
+    contas: np.ndarray  # int64
+
+    @classmethod
+    def vazio(cls) -> "ItensFluxo":
+        return cls(np.empty(0, dtype="datetime64[D]"), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+    def concatenar(self, outro: "ItensFluxo") -> "ItensFluxo":
+        return ItensFluxo(
+            np.concatenate([self.datas, outro.datas]),
+            np.concatenate([self.valores, outro.valores]),
+            np.concatenate([self.contas, outro.contas]),
+        )
+
+    def filtrar(self, mascara: np.ndarray) -> "ItensFluxo":
+        return ItensFluxo(self.datas[mascara], self.valores[mascara], self.contas[mascara])
+
+
+@dataclass
+class FluxoCaixa:
+    datas: np.ndarray  # datetime64[D], um ponto por dia do horizonte
+    conta_ids: np.ndarray
+    conta_nomes: list[str]
+    saldos_atuais: np.ndarray  # int64 (centavos)
+    saldos: np.ndarray  # int64 (centavos), forma (contas, dias)
+    itens_pendentes: int
+    itens_recorrentes: int
+
+
+def _colunas_item():
+    return (
+        Transacao.conta_id,
+        (Transacao.tipo == TipoTransacao.ENTRADA).label("entrada"),
+        Transacao.data,
+        Transacao.data_vencimento,
+        Transacao.valor,
+        Transacao.valor_multa,
+        Transacao.valor_juros,
+        Transacao.valor_desconto,
+    )
+
+
+def itens_de_linhas(linhas, cartoes: set[int] | frozenset = frozenset(), so_valor: bool = False) -> ItensFluxo:
+    """
+    Converte linhas (conta_id, entrada, data, data_vencimento, valor, multa, juros, desconto)
+    em arrays. A data do item e o vencimento (ou a data); no cartao, a data da compra.
+    """
+    if not linhas:
+        return ItensFluxo.vazio()
+    conta_ids, entradas, datas, vencimentos, valor, multa, juros, desconto = zip(*linhas)
+    contas = np.array(conta_ids, dtype=np.int64)
+    datas = np.array(datas, dtype="datetime64[D]")
+    vencimentos = np.array(vencimentos, dtype="datetime64[D]")
+    usa_data = np.isnat(vencimentos) | np.isin(contas, list(cartoes))
+
+    efetivo = centavos(valor)
+    if not so_valor:
+        efetivo = valor_efetivo_centavos(efetivo, centavos(multa), centavos(juros), centavos(desconto))
+    sinal = np.where(np.array(entradas, dtype=bool), 1, -1)
+    return ItensFluxo(np.where(usa_data, datas, vencimentos), efetivo * sinal, contas)
+
+
+def carregar_pendentes(db: Session, user_id: int, fim: date, cartoes: set[int] | frozenset = frozenset()) -> ItensFluxo:
+    """Itens previstos/atrasados com data ou vencimento ate `fim`."""
+    # Consulta Core na conexao da sessao: sem a camada de resultados do ORM por linha.
+    linhas = db.connection().execute(
+        select(*_colunas_item()).where(
+            Transacao.user_id == user_id,
+            Transacao.status_liquidacao.in_(STATUS_PENDENTES),
+            or_(Transacao.data <= fim, Transacao.data_vencimento <= fim),
+        )
+    ).all()
+    return itens_de_linhas(linhas, cartoes)
+
+
+def carregar_series_recorrentes(db: Session, user_id: int, cartoes: set[int] | frozenset = frozenset()) -> ItensFluxo:
+    """Ultimo lancamento de cada serie fixa/recorrente (parcelas e dizimos ficam de fora)."""
+    ultimos = (
+        select(func.max(Transacao.id))
+        .where(
+            Transacao.user_id == user_id,
+            Transacao.status_liquidacao != StatusLiquidacao.CANCELADO,
+            or_(Transacao.recorrente.is_(True), Transacao.fixa.is_(True)),
+            func.coalesce(Transacao.parcelado, false()).is_(False),
+            func.coalesce(Transacao.e_dizimo, false()).is_(False),
+        )
+        .group_by(Transacao.conta_id, Transacao.tipo, Transacao.descricao, Transacao.categoria_id)
+    )
+    linhas = db.connection().execute(select(*_colunas_item()).where(Transacao.id.in_(ultimos))).all()
+    # Multa, juros e desconto sao do lancamento original, nao se repetem.
+    return itens_de_linhas(linhas, cartoes, so_valor=True)
+
+
+def repetir_mensalmente(series: ItensFluxo, ate: date) -> ItensFluxo:
+    """
+    Ocorrencias mensais de cada serie depois da sua data ate `ate` (inclusive), no mesmo
+    dia do mes (ou no ultimo dia, em meses mais curtos).
+    """
+    if not len(series):
+        return ItensFluxo.vazio()
+    mes_base = series.datas.astype("datetime64[M]")
+    dia = (series.datas - mes_base.astype("datetime64[D]")).astype(np.int64)
+    meses = int((np.datetime64(ate, "M") - mes_base.min()).astype(np.int64))
+    if meses < 1:
+        return ItensFluxo.vazio()
+
+    passos = np.arange(1, meses + 1)
+    meses_alvo = mes_base[:, None] + passos[None, :]
+    inicio_mes = meses_alvo.astype("datetime64[D]")
+    ultimo_dia = (meses_alvo + 1).astype("datetime64[D]") - np.timedelta64(1, "D")
+    datas = np.minimum(inicio_mes + dia[:, None], ultimo_dia)
+    mascara = datas <= np.datetime64(ate, "D")
+
+    forma = datas.shape
+    return ItensFluxo(
+        datas[mascara],
+        np.broadcast_to(series.valores[:, None], forma)[mascara],
+        np.broadcast_to(series.contas[:, None], forma)[mascara],
+    )
+
+
+def mover_para_vencimento_fatura(itens: ItensFluxo, cartoes: dict[int, tuple[int, int]]) -> ItensFluxo:
+    """Troca a data da compra no cartao pelo vencimento da fatura (uma conversao por data distinta)."""
+    datas = itens.datas.copy()
+    for conta_id, (dia_fechamento, dia_vencimento) in cartoes.items():
+        mascara = itens.contas == conta_id
+        if not mascara.any():
+            continue
+        unicas, inverso = np.unique(datas[mascara], return_inverse=True)
+        vencimentos = np.array(
+            [calcular_vencimento_fatura(fechamento_da_data(d.item(), dia_fechamento), dia_vencimento) for d in unicas],
+            dtype="datetime64[D]",
+        )
+        datas[mascara] = vencimentos[inverso]
+    return ItensFluxo(datas, itens.valores, itens.contas)
+
+
+def projetar_saldos(
+    conta_ids: np.ndarray,
+    saldos_atuais: np.ndarray,
+    itens: ItensFluxo,
+    inicio: date,
+    dias: int,
+) -> np.ndarray:
+    """
+    Saldo de fechamento de cada conta (linhas, na ordem de `conta_ids`, que deve estar
+    ordenado) em cada dia de `inicio` a `inicio + dias - 1`. Itens antes de `inicio`
+    entram no primeiro dia; depois do ultimo dia, ficam de fora.
+    """
+    indice_dia = np.maximum((itens.datas - np.datetime64(inicio, "D")).astype(np.int64), 0)
+    dentro = (indice_dia < dias) & np.isin(itens.contas, conta_ids)
+    linha = np.searchsorted(conta_ids, itens.contas[dentro])
+    variacoes = np.bincount(
+        linha * dias + indice_dia[dentro],
+        weights=itens.valores[dentro],
+        minlength=len(conta_ids) * dias,
+    )
+    variacoes = np.rint(variacoes).astype(np.int64).reshape(len(conta_ids), dias)
+    return saldos_atuais[:, None] + np.cumsum(variacoes, axis=1)
+
+
+def calcular_fluxo_caixa(db: Session, user_id: int, dias: int, inicio: date | None = None) -> FluxoCaixa:
+    """Projecao diaria do saldo de cada conta do usuario por `dias` dias a partir de `inicio`."""
+    inicio = inicio or date.today()
+    fim = inicio + timedelta(days=dias - 1)
+
+    contas = db.execute(
+        select(Conta.id, Conta.nome, Conta.saldo, Conta.tipo, Conta.dia_fechamento, Conta.dia_vencimento)
+        .where(Conta.user_id == user_id)
+        .order_by(Conta.id)
+    ).all()
+    cartoes = {
+        c.id: (c.dia_fechamento, c.dia_vencimento)
+        for c in contas
+        if c.tipo == TipoConta.CARTAO_CREDITO and c.dia_fechamento is not None and c.dia_vencimento is not None
+    }
+
+    pendentes = carregar_pendentes(db, user_id, fim, set(cartoes))
+    # Compras no cartao vencem depois da data: a repeticao vai ate um mes alem do horizonte.
+    recorrentes = repetir_mensalmente(
+        carregar_series_recorrentes(db, user_id, set(cartoes)), fim + timedelta(days=62 if cartoes else 0)
+    )
+    recorrentes = recorrentes.filtrar(recorrentes.datas >= np.datetime64(inicio, "D"))
+    itens = mover_para_vencimento_fatura(pendentes.concatenar(recorrentes), cartoes)
+
+    conta_ids = np.array([c.id for c in contas], dtype=np.int64)
+    saldos_atuais = centavos([c.saldo or 0 for c in contas])
+    return FluxoCaixa(
+        datas=np.datetime64(inicio, "D") + np.arange(dias),
+        conta_ids=conta_ids,
+        conta_nomes=[c.nome for c in contas],
+        saldos_atuais=saldos_atuais,
+        saldos=projetar_saldos(conta_ids, saldos_atuais, itens, inicio, dias),
+        itens_pendentes=len(pendentes),
+        itens_recorrentes=len(recorrentes),
+    )
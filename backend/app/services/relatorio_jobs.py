@@ -0,0 +1,210 @@
+"""
+Fila de renderizacao de relatorios em um pool de processos limitado.
+
+O estado de cada job fica em disco (`RELATORIO_JOBS_DIR`): qualquer worker do
+gunicorn consegue consultar e servir o arquivo, nao apenas o que recebeu o pedido.
+Para cada job existem ate tres arquivos:
+
+- `<id>.json`: metadados (dono, nome do arquivo, criacao), gravado no envio;
+- `<id>.bin`: resultado, renomeado atomicamente quando a renderizacao termina;
+- `<id>.erro`: mensagem de falha da renderizacao.
+"""
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import partial
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+from uuid import uuid4
+
+from app.core.config import settings
+
+STATUS_PENDENTE = "pendente"
+STATUS_CONCLUIDO = "concluido"
+STATUS_ERRO = "erro"
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class FilaRelatoriosCheiaError(RuntimeError):
+    pass
+
+
+@dataclass
+class RelatorioJob:
+    id: str
+    user_id: int
+    filename: str
+    media_type: str
+    criado_em: datetime
+    status: str
+    erro: str | None = None
+
+
+def _executar_job(caminho_saida: str, render: Callable[..., bytes], *args: Any) -> None:
+    """Roda no processo filho: renderiza e publica o resultado com rename atomico."""
+    try:
+        conteudo = render(*args)
+    except Exception as exc:
+        Path(caminho_saida).with_suffix(".erro").write_text(str(exc) or exc.__class__.__name__, encoding="utf-8")
+        return
+    temporario = f"{caminho_saida}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho_saida)
+
+
+class GerenciadorRelatorios:
+    def __init__(self, diretorio: str | Path, max_workers: int, max_pendentes: int, ttl_segundos: int):
+        self.diretorio = Path(diretorio)
+        self.max_workers = max_workers
+        self.max_pendentes = max_pendentes
+        self.ttl_segundos = ttl_segundos
+        self._executor: ProcessPoolExecutor | None = None
+        self._pendentes = 0
+        self._lock = threading.Lock()
+
+    def _obter_executor(self) -> ProcessPoolExecutor:
+        # "spawn" evita herdar conexoes de banco e threads do processo da API.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _caminho(self, job_id: str, sufixo: str) -> Path:
+        return self.diretorio / f"{job_id}{sufixo}"
+
+    def _finalizar(self, job_id: str, executor: ProcessPoolExecutor, future: Future) -> None:
+        """Libera a vaga na fila e registra as falhas que o processo filho nao gravou."""
+        exc = None if future.cancelled() else future.exception()
+        with self._lock:
+            self._pendentes -= 1
+            # Um pool quebrado recusa qualquer submit; o proximo envio cria outro.
+            if isinstance(exc, BrokenProcessPool) and self._executor is executor:
+                self._executor = None
+
+        if future.cancelled():
+            erro = "Renderizacao cancelada"
+        elif isinstance(exc, BrokenProcessPool):
+            erro = "Processo de renderizacao encerrado inesperadamente"
+        elif exc is not None:
+            erro = str(exc) or exc.__class__.__name__
+        else:
+            return
+        try:
+            self._caminho(job_id, ".erro").write_text(erro, encoding="utf-8")
+        except OSError:
+            pass
+
+    def submeter(
+        self,
+        user_id: int,
+        filename: str,
+        media_type: str,
+        render: Callable[..., bytes],
+        *args: Any,
+    ) -> RelatorioJob:
+        """Enfileira `render(*args)`; `render` e os argumentos precisam ser picklable."""
+        self.limpar_expirados()
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            if self._pendentes >= self.max_pendentes:
+                raise FilaRelatoriosCheiaError("Fila de relatorios cheia")
+            self._pendentes += 1
+
+        job = RelatorioJob(
+            id=uuid4().hex,
+            user_id=user_id,
+            filename=filename,
+            media_type=media_type,
+            criado_em=datetime.now(timezone.utc),
+            status=STATUS_PENDENTE,
+        )
+        metadados = {
+            "user_id": job.user_id,
+            "filename": job.filename,
+            "media_type": job.media_type,
+            "criado_em": job.criado_em.isoformat(),
+        }
+        try:
+            self._caminho(job.id, ".json").write_text(json.dumps(metadados), encoding="utf-8")
+            with self._lock:
+                executor = self._obter_executor()
+                try:
+                    future = executor.submit(_executar_job, str(self._caminho(job.id, ".bin")), render, *args)
+                except BrokenProcessPool:
+                    # O pool quebrou antes do callback do job anterior descarta-lo.
+                    self._executor = None
+                    executor = self._obter_executor()
+                    future = executor.submit(_executar_job, str(self._caminho(job.id, ".bin")), render, *args)
+        except Exception:
+            with self._lock:
+                self._pendentes -= 1
+            raise
+        future.add_done_callback(partial(self._finalizar, job.id, executor))
+        return job
+
+    def obter(self, job_id: str, user_id: int) -> RelatorioJob | None:
+        """Retorna o job somente para o seu dono; `None` se nao existir ou tiver expirado."""
+        if not _JOB_ID.match(job_id):
+            return None
+        try:
+            metadados = json.loads(self._caminho(job_id, ".json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if metadados.get("user_id") != user_id:
+            return None
+
+        job = RelatorioJob(
+            id=job_id,
+            user_id=user_id,
+            filename=metadados["filename"],
+            media_type=metadados["media_type"],
+            criado_em=datetime.fromisoformat(metadados["criado_em"]),
+            status=STATUS_PENDENTE,
+        )
+        if self._caminho(job_id, ".bin").exists():
+            job.status = STATUS_CONCLUIDO
+        elif self._caminho(job_id, ".erro").exists():
+            job.status = STATUS_ERRO
+            job.erro = self._caminho(job_id, ".erro").read_text(encoding="utf-8")
+        return job
+
+    def caminho_resultado(self, job: RelatorioJob) -> Path:
+        return self._caminho(job.id, ".bin")
+
+    def limpar_expirados(self) -> None:
+        if not self.diretorio.exists():
+            return
+        limite = time.time() - self.ttl_segundos
+        for arquivo in self.diretorio.iterdir():
+            try:
+                if arquivo.stat().st_mtime < limite:
+                    arquivo.unlink()
+            except OSError:
+                continue
+
+    def encerrar(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+gerenciador_relatorios = GerenciadorRelatorios(
+    diretorio=settings.RELATORIO_JOBS_DIR or Path(tempfile.gettempdir()) / "financas_relatorios",
+    max_workers=settings.RELATORIO_JOBS_WORKERS,
+    max_pendentes=settings.RELATORIO_JOBS_MAX_PENDENTES,
+    ttl_segundos=settings.RELATORIO_JOBS_TTL_SEGUNDOS,
+)
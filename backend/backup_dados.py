@@ -0,0 +1,80 @@
+"""
+Backup e restauração dos dados de um usuário em NDJSON (gzip se o arquivo terminar em .gz).
+
+Uso:
+python backup_dados.py backup --user-id 7 --arquivo usuario7.ndjson.gz
+python backup_dados.py restaurar --user-id 12 --arquivo usuario7.ndjson.gz
+
+A restauração acrescenta os dados ao usuário de destino (que já deve existir),
+com novos IDs e UUIDs, numa única transação.
+"""
+
+import argparse
+import gzip
+import sys
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models import User
+from app.services.backup import escrever_backup, restaurar_backup
+
+
+def _abrir(arquivo: str, modo: str):
+    if arquivo == "-":
+        return sys.stdout if "w" in modo else sys.stdin
+    if arquivo.endswith(".gz"):
+        return gzip.open(arquivo, modo + "t", encoding="utf-8")
+    return open(arquivo, modo, encoding="utf-8")
+
+
+def backup(user_id: int, arquivo: str) -> None:
+    db: Session = SessionLocal()
+    try:
+        if not db.get(User, user_id):
+            raise SystemExit(f"❌ Usuário {user_id} não encontrado")
+        destino = _abrir(arquivo, "w")
+        try:
+            escrever_backup(db, user_id, destino)
+        finally:
+            if destino is not sys.stdout:
+                destino.close()
+        print(f"✅ Backup do usuário {user_id} gravado em {arquivo}", file=sys.stderr)
+    finally:
+        db.close()
+
+
+def restaurar(user_id: int, arquivo: str) -> None:
+    db: Session = SessionLocal()
+    try:
+        if not db.get(User, user_id):
+            raise SystemExit(f"❌ Usuário {user_id} não encontrado")
+        origem = _abrir(arquivo, "r")
+        try:
+            totais = restaurar_backup(db, origem, user_id)
+        finally:
+            if origem is not sys.stdin:
+                origem.close()
+        for tabela, quantidade in totais.items():
+            print(f"📥 {tabela:22} {quantidade:>8}", file=sys.stderr)
+        print(f"✅ Backup restaurado no usuário {user_id}", file=sys.stderr)
+    except Exception as e:
+        print(f"❌ Erro ao restaurar: {e}", file=sys.stderr)
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backup e restauração de dados de um usuário (NDJSON).")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    for comando in ("backup", "restaurar"):
+        sub = subparsers.add_parser(comando)
+        sub.add_argument("--user-id", type=int, required=True)
+        sub.add_argument("--arquivo", required=True, help="caminho do arquivo (.ndjson ou .ndjson.gz) ou - para stdin/stdout")
+    args = parser.parse_args()
+
+    if args.comando == "backup":
+        backup(args.user_id, args.arquivo)
+    else:
+        restaurar(args.user_id, args.arquivo)
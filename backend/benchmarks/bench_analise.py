@@ -0,0 +1,191 @@
+"""
+Benchmark: relatorios sobre o nucleo colunar (`app.services.analise`) versus os
+caminhos anteriores.
+
+- DRE mensal: laco sobre objetos ORM acumulando em dicionarios x colunas NumPy com
+  mascaras e soma por categoria;
+- orcamentos: uma consulta agregada por orcamento (N+1) x uma consulta para todos,
+  somada por (categoria, mes).
+
+Usa SQLite em memoria com N transacoes de um usuario espalhadas por 12 meses e
+categorias, e confere que os dois caminhos dao o mesmo resultado antes de medir.
+
+Uso:
+    cd backend
+    python benchmarks/bench_analise.py [--transacoes 100000] [--categorias 20] [--repeticoes 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from calendar import monthrange
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.api.v1.endpoints.relatorios import _calcular_dre_mensal  # noqa: E402
+from app.core.money import valor_efetivo_centavos  # noqa: E402
+from app.crud.crud_orcamento import _calcular_valor_gasto_orcamento, _preencher_valores_gastos  # noqa: E402
+from app.db.session import Base  # noqa: E402
+from app.models import (  # noqa: E402
+    Categoria,
+    Conta,
+    Orcamento,
+    StatusLiquidacao,
+    TipoConta,
+    TipoTransacao,
+    Transacao,
+    User,
+)
+
+ANO = 2026
+STATUS = (StatusLiquidacao.LIQUIDADO, StatusLiquidacao.PREVISTO, StatusLiquidacao.ATRASADO, StatusLiquidacao.CANCELADO)
+
+
+def _popular(sessao, transacoes: int, categorias: int) -> int:
+    user = User(email=f"bench_{uuid.uuid4().hex[:8]}@example.com", nome="Bench", hashed_password="x")
+    sessao.add(user)
+    sessao.flush()
+    conta = Conta(user_id=user.id, nome="Conta", tipo=TipoConta.CONTA_CORRENTE, saldo=0.0, saldo_inicial=0.0)
+    sessao.add(conta)
+    cats = [Categoria(user_id=user.id, nome=f"Categoria {i}", tipo="saida") for i in range(categorias)]
+    sessao.add_all(cats)
+    sessao.flush()
+    sessao.execute(
+        insert(Transacao.__table__),
+        [
+            {
+                "user_id": user.id,
+                "conta_id": conta.id,
+                "categoria_id": cats[i % categorias].id if i % 13 else None,
+                "descricao": f"Lancamento {i}",
+                "valor": 10.0 + (i % 1000) / 10,
+                "tipo": TipoTransacao.ENTRADA if i % 5 == 0 else TipoTransacao.SAIDA,
+                "data": date(ANO, i % 12 + 1, i % 28 + 1),
+                "status_liquidacao": STATUS[i % len(STATUS)],
+                "fixa": False,
+                "recorrente": False,
+                "confirmada": True,
+                "transacao_uuid": str(uuid.uuid4()),
+                "tem_dizimo": False,
+                "percentual_dizimo": 10.0,
+                "e_dizimo": False,
+                "parcelado": False,
+                "e_emprestimo": False,
+                "valor_multa": 1.5 if i % 7 == 0 else 0.0,
+                "valor_juros": 0.0,
+                "valor_desconto": 0.25 if i % 11 == 0 else 0.0,
+            }
+            for i in range(transacoes)
+        ],
+    )
+    sessao.add_all(
+        Orcamento(user_id=user.id, categoria_id=c.id, mes=mes, ano=ANO, valor_planejado=1000.0)
+        for c in cats
+        for mes in range(1, 13)
+    )
+    sessao.commit()
+    return user.id
+
+
+def _dre_laco(Sessao, user_id: int, mes: int) -> dict:
+    inicio = date(ANO, mes, 1)
+    fim = date(ANO, mes, monthrange(ANO, mes)[1])
+    with Sessao() as sessao:
+        transacoes = sessao.query(Transacao).filter(
+            Transacao.user_id == user_id,
+            Transacao.data >= inicio,
+            Transacao.data <= fim,
+            Transacao.status_liquidacao != StatusLiquidacao.CANCELADO,
+        ).all()
+        nomes = dict(sessao.query(Categoria.id, Categoria.nome).filter(Categoria.user_id == user_id).all())
+        totais = {"entradas_liquidadas": 0, "entradas_previstas": 0, "saidas_liquidadas": 0, "saidas_previstas": 0}
+        por_categoria = {"entradas": {}, "saidas": {}}
+        for t in transacoes:
+            valor = valor_efetivo_centavos(t.valor, t.valor_multa, t.valor_juros, t.valor_desconto)
+            lado = "entradas" if t.tipo == TipoTransacao.ENTRADA else "saidas"
+            estado = "liquidadas" if t.status_liquidacao == StatusLiquidacao.LIQUIDADO else "previstas"
+            totais[f"{lado}_{estado}"] += valor
+            nome = nomes.get(t.categoria_id, "Sem categoria")
+            por_categoria[lado][nome] = por_categoria[lado].get(nome, 0) + valor
+        return {
+            **{chave: valor / 100 for chave, valor in totais.items()},
+            **{lado: {n: v / 100 for n, v in itens.items()} for lado, itens in por_categoria.items()},
+        }
+
+
+def _dre_vetorizado(Sessao, user_id: int, mes: int) -> dict:
+    with Sessao() as sessao:
+        dre = _calcular_dre_mensal(sessao, user_id, mes, ANO)
+        return {
+            "entradas_liquidadas": dre.entradas_liquidadas,
+            "entradas_previstas": dre.entradas_previstas,
+            "saidas_liquidadas": dre.saidas_liquidadas,
+            "saidas_previstas": dre.saidas_previstas,
+            "entradas": {i.categoria_nome: i.valor for i in dre.entradas_por_categoria},
+            "saidas": {i.categoria_nome: i.valor for i in dre.saidas_por_categoria},
+        }
+
+
+def _orcamentos_n_mais_1(Sessao, user_id: int) -> dict[int, float]:
+    with Sessao() as sessao:
+        orcamentos = sessao.query(Orcamento).filter(Orcamento.user_id == user_id).all()
+        return {o.id: _calcular_valor_gasto_orcamento(sessao, o) for o in orcamentos}
+
+
+def _orcamentos_agrupados(Sessao, user_id: int) -> dict[int, float]:
+    with Sessao() as sessao:
+        orcamentos = sessao.query(Orcamento).filter(Orcamento.user_id == user_id).all()
+        _preencher_valores_gastos(sessao, user_id, orcamentos)
+        return {o.id: o.valor_gasto for o in orcamentos}
+
+
+def _medir(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transacoes", type=int, nargs="+", default=[100000])
+    parser.add_argument("--categorias", type=int, default=20)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Sessao = sessionmaker(bind=engine, autoflush=False)
+
+    for transacoes in args.transacoes:
+        with Sessao() as sessao:
+            user_id = _popular(sessao, transacoes, args.categorias)
+        assert _dre_laco(Sessao, user_id, 6) == _dre_vetorizado(Sessao, user_id, 6)
+        assert _orcamentos_n_mais_1(Sessao, user_id) == _orcamentos_agrupados(Sessao, user_id)
+
+        medicoes = [
+            ("DRE", _medir(lambda: _dre_laco(Sessao, user_id, 6), args.repeticoes),
+             _medir(lambda: _dre_vetorizado(Sessao, user_id, 6), args.repeticoes)),
+            (f"{args.categorias * 12} orcamentos", _medir(lambda: _orcamentos_n_mais_1(Sessao, user_id), args.repeticoes),
+             _medir(lambda: _orcamentos_agrupados(Sessao, user_id), args.repeticoes)),
+        ]
+        for nome, antes_ms, depois_ms in medicoes:
+            print(
+                f"{transacoes:>7} transacoes  {nome:<16} antes={antes_ms:8.1f}ms  vetorizado={depois_ms:8.1f}ms  "
+                f"({antes_ms / depois_ms:4.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark: projecao de fluxo de caixa vetorizada (arrays NumPy + soma acumulada) versus
+um laco sobre objetos ORM acumulando variacoes por conta e dia em dicionarios.
+
+Usa SQLite em memoria com N itens pendentes de um usuario, distribuidos entre contas
+correntes e um cartao, e mede consulta + projecao diaria de todas as contas.
+
+Uso:
+    cd backend
+    python benchmarks/bench_fluxo_caixa.py [--itens 100000] [--dias 365] [--repeticoes 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.money import para_centavos, valor_efetivo_centavos  # noqa: E402
+from app.crud.crud_fatura import calcular_vencimento_fatura, fechamento_da_data  # noqa: E402
+from app.db.session import Base  # noqa: E402
+from app.models import Conta, StatusLiquidacao, TipoConta, TipoTransacao, Transacao, User  # noqa: E402
+from app.services.fluxo_caixa import STATUS_PENDENTES, calcular_fluxo_caixa  # noqa: E402
+
+
+def _popular(sessao, itens: int, dias: int) -> int:
+    user = User(email=f"bench_{uuid.uuid4().hex[:8]}@example.com", nome="Bench", hashed_password="x")
+    sessao.add(user)
+    sessao.flush()
+    contas = [
+        Conta(user_id=user.id, nome=f"Conta {i}", tipo=TipoConta.CONTA_CORRENTE, saldo=1000.0 * i, saldo_inicial=0.0)
+        for i in range(4)
+    ]
+    contas.append(
+        Conta(
+            user_id=user.id, nome="Cartao", tipo=TipoConta.CARTAO_CREDITO, saldo=0.0, saldo_inicial=0.0,
+            dia_fechamento=20, dia_vencimento=28,
+        )
+    )
+    sessao.add_all(contas)
+    sessao.flush()
+    hoje = date.today()
+    sessao.execute(
+        insert(Transacao.__table__),
+        [
+            {
+                "user_id": user.id,
+                "conta_id": contas[i % len(contas)].id,
+                "descricao": f"Pendente {i}",
+                "valor": 10.0 + (i % 1000) / 10,
+                "tipo": TipoTransacao.ENTRADA if i % 3 == 0 and i % len(contas) != 4 else TipoTransacao.SAIDA,
+                "data": hoje + timedelta(days=(i % (dias + 30)) - 30),
+                "data_vencimento": hoje + timedelta(days=(i % (dias + 30)) - 25) if i % 2 else None,
+                "status_liquidacao": StatusLiquidacao.PREVISTO if i % 4 else StatusLiquidacao.ATRASADO,
+                "fixa": False,
+                "recorrente": False,
+                "confirmada": True,
+                "transacao_uuid": str(uuid.uuid4()),
+                "tem_dizimo": False,
+                "percentual_dizimo": 10.0,
+                "e_dizimo": False,
+                "parcelado": False,
+                "e_emprestimo": False,
+                "valor_multa": 1.5 if i % 7 == 0 else 0.0,
+                "valor_juros": 0.0,
+                "valor_desconto": 0.25 if i % 11 == 0 else 0.0,
+            }
+            for i in range(itens)
+        ],
+    )
+    sessao.commit()
+    return user.id
+
+
+def _caminho_laco(Sessao, user_id: int, dias: int, inicio: date) -> dict[int, list[int]]:
+    fim = inicio + timedelta(days=dias - 1)
+    with Sessao() as sessao:
+        contas = sessao.query(Conta).filter(Conta.user_id == user_id).order_by(Conta.id).all()
+        variacoes = {c.id: {} for c in contas}
+        transacoes = sessao.query(Transacao).filter(
+            Transacao.user_id == user_id,
+            Transacao.status_liquidacao.in_(STATUS_PENDENTES),
+        ).all()
+        cartoes = {c.id: c for c in contas if c.tipo == TipoConta.CARTAO_CREDITO}
+        for t in transacoes:
+            cartao = cartoes.get(t.conta_id)
+            if cartao is not None:
+                data = calcular_vencimento_fatura(fechamento_da_data(t.data, cartao.dia_fechamento), cartao.dia_vencimento)
+            else:
+                data = t.data_vencimento or t.data
+            if data > fim:
+                continue
+            valor = valor_efetivo_centavos(t.valor, t.valor_multa, t.valor_juros, t.valor_desconto)
+            if t.tipo != TipoTransacao.ENTRADA:
+                valor = -valor
+            dia = max((data - inicio).days, 0)
+            variacoes[t.conta_id][dia] = variacoes[t.conta_id].get(dia, 0) + valor
+
+        saldos = {}
+        for conta in contas:
+            saldo = para_centavos(conta.saldo)
+            serie = []
+            for dia in range(dias):
+                saldo += variacoes[conta.id].get(dia, 0)
+                serie.append(saldo)
+            saldos[conta.id] = serie
+        return saldos
+
+
+def _caminho_vetorizado(Sessao, user_id: int, dias: int, inicio: date) -> dict[int, list[int]]:
+    with Sessao() as sessao:
+        fluxo = calcular_fluxo_caixa(sessao, user_id, dias, inicio)
+        return dict(zip(fluxo.conta_ids.tolist(), fluxo.saldos.tolist()))
+
+
+def _medir(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--itens", type=int, nargs="+", default=[100000])
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Sessao = sessionmaker(bind=engine, autoflush=False)
+
+    hoje = date.today()
+    for itens in args.itens:
+        with Sessao() as sessao:
+            user_id = _popular(sessao, itens, args.dias)
+        assert _caminho_laco(Sessao, user_id, args.dias, hoje) == _caminho_vetorizado(Sessao, user_id, args.dias, hoje)
+
+        laco_ms = _medir(lambda: _caminho_laco(Sessao, user_id, args.dias, hoje), args.repeticoes)
+        vetor_ms = _medir(lambda: _caminho_vetorizado(Sessao, user_id, args.dias, hoje), args.repeticoes)
+        print(
+            f"{itens:>7} itens  {args.dias} dias  laco ORM={laco_ms:8.1f}ms  vetorizado={vetor_ms:8.1f}ms  "
+            f"({laco_ms / vetor_ms:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
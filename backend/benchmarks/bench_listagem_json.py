@@ -0,0 +1,125 @@
+"""
+Benchmark: listagem de transacoes pelo caminho ORM + Pydantic versus o caminho rapido
+(tuplas de colunas + `JSONRapidoResponse`).
+
+Usa SQLite em memoria com N transacoes de um usuario e mede, para cada caminho, a
+consulta + montagem + serializacao para bytes JSON (o que a rota entrega ao servidor).
+
+Uso:
+    cd backend
+    python benchmarks/bench_listagem_json.py [--linhas 1000 10000] [--repeticoes 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core import json_rapido  # noqa: E402
+from app.crud import crud_transacao  # noqa: E402
+from app.db.session import Base  # noqa: E402
+from app.models import Conta, StatusLiquidacao, TipoConta, TipoTransacao, Transacao, User  # noqa: E402
+from app.schemas.transacao import TransacaoResponse  # noqa: E402
+
+
+def _popular(sessao, linhas: int) -> int:
+    user = User(email=f"bench_{uuid.uuid4().hex[:8]}@example.com", nome="Bench", hashed_password="x")
+    sessao.add(user)
+    sessao.flush()
+    conta = Conta(user_id=user.id, nome="Conta", tipo=TipoConta.CONTA_CORRENTE, saldo=0.0, saldo_inicial=0.0)
+    sessao.add(conta)
+    sessao.flush()
+    hoje = date.today()
+    sessao.execute(
+        insert(Transacao.__table__),
+        [
+            {
+                "user_id": user.id,
+                "conta_id": conta.id,
+                "descricao": f"Transacao {i}",
+                "valor": 10.0 + i % 100,
+                "tipo": TipoTransacao.SAIDA if i % 3 else TipoTransacao.ENTRADA,
+                "data": hoje - timedelta(days=i % 365),
+                "status_liquidacao": StatusLiquidacao.LIQUIDADO if i % 2 else StatusLiquidacao.PREVISTO,
+                "fixa": False,
+                "recorrente": False,
+                "confirmada": True,
+                "transacao_uuid": str(uuid.uuid4()),
+                "tem_dizimo": False,
+                "percentual_dizimo": 10.0,
+                "e_dizimo": False,
+                "parcelado": False,
+                "e_emprestimo": False,
+                "observacoes": "Observacao de exemplo " * 3,
+                "tags": "casa, mercado",
+                "valor_multa": 0.0,
+                "valor_juros": 0.0,
+                "valor_desconto": 0.0,
+            }
+            for i in range(linhas)
+        ],
+    )
+    sessao.commit()
+    return user.id
+
+
+def _caminho_pydantic(Sessao, user_id: int, limite: int) -> bytes:
+    with Sessao() as sessao:
+        transacoes = crud_transacao.get_transacoes(sessao, user_id, limit=limite)
+        modelos = [TransacaoResponse.model_validate(t) for t in transacoes]
+        return json.dumps(jsonable_encoder(modelos), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _caminho_rapido(Sessao, user_id: int, limite: int) -> bytes:
+    with Sessao() as sessao:
+        return json_rapido.dumps(crud_transacao.get_transacoes_linhas(sessao, user_id, limit=limite))
+
+
+def _medir(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Sessao = sessionmaker(bind=engine, autoflush=False)
+
+    codificador = "orjson" if json_rapido.ORJSON_AVAILABLE else "json (stdlib)"
+    print(f"codificador rapido: {codificador}")
+    for linhas in args.linhas:
+        with Sessao() as sessao:
+            user_id = _popular(sessao, linhas)
+        assert json.loads(_caminho_pydantic(Sessao, user_id, linhas)) == json.loads(_caminho_rapido(Sessao, user_id, linhas))
+
+        pydantic_ms = _medir(lambda: _caminho_pydantic(Sessao, user_id, linhas), args.repeticoes)
+        rapido_ms = _medir(lambda: _caminho_rapido(Sessao, user_id, linhas), args.repeticoes)
+        print(
+            f"{linhas:>6} linhas  ORM+Pydantic={pydantic_ms:8.1f}ms  rapido={rapido_ms:8.1f}ms  "
+            f"({pydantic_ms / rapido_ms:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: latencia da API enquanto 50 PDFs de DRE sao renderizados.
+
+Compara a renderizacao no proprio processo da API (como o endpoint sincrono
+`/dre-mensal/export-pdf`, que roda no threadpool e disputa o GIL) com a fila de
+jobs em pool de processos. Em paralelo, mede a latencia de `GET /health`.
+
+Uso:
+    cd backend
+    python benchmarks/bench_relatorio_jobs.py [--pdfs 50] [--workers 2]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.schemas.relatorio import DRECategoriaResumo, DREMensalResponse  # noqa: E402
+from app.services.relatorio_jobs import STATUS_PENDENTE, GerenciadorRelatorios  # noqa: E402
+from app.services.relatorio_pdf import renderizar_dre_pdf  # noqa: E402
+
+
+def _dre_exemplo() -> dict:
+    categorias = [
+        DRECategoriaResumo(categoria_id=i, categoria_nome=f"Categoria {i}", valor=100.0 + i) for i in range(40)
+    ]
+    total = sum(c.valor for c in categorias)
+    return DREMensalResponse(
+        mes=1,
+        ano=2026,
+        entradas_liquidadas=total,
+        entradas_previstas=0.0,
+        entradas_total=total,
+        saidas_liquidadas=total,
+        saidas_previstas=0.0,
+        saidas_total=total,
+        resultado_liquidado=0.0,
+        resultado_previsto=0.0,
+        resultado_total=0.0,
+        entradas_por_categoria=categorias,
+        saidas_por_categoria=categorias,
+    ).model_dump()
+
+
+def _medir_latencias(client: TestClient, parar: threading.Event) -> list[float]:
+    latencias = []
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        client.get("/health")
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        time.sleep(0.005)
+    return latencias
+
+
+def _resumo(nome: str, latencias: list[float], duracao: float) -> None:
+    ordenadas = sorted(latencias)
+    p99 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))]
+    print(
+        f"{nome:<22} requisicoes={len(ordenadas):>5}  p50={statistics.median(ordenadas):7.2f}ms  "
+        f"p99={p99:7.2f}ms  duracao={duracao:6.2f}s"
+    )
+
+
+def _cenario(client: TestClient, carga) -> tuple[list[float], float]:
+    parar = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as sonda:
+        futuro = sonda.submit(_medir_latencias, client, parar)
+        inicio = time.perf_counter()
+        carga()
+        duracao = time.perf_counter() - inicio
+        parar.set()
+        return futuro.result(), duracao
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdfs", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    dre = _dre_exemplo()
+    client = TestClient(app)
+
+    base, duracao = _cenario(client, lambda: time.sleep(2))
+    _resumo("ocioso", base, duracao)
+
+    def carga_sincrona():
+        # Mesmo modelo do endpoint sincrono: threadpool do servidor (40 threads no Starlette).
+        with ThreadPoolExecutor(max_workers=40) as pool:
+            list(pool.map(lambda _: renderizar_dre_pdf(dre), range(args.pdfs)))
+
+    sincrono, duracao = _cenario(client, carga_sincrona)
+    _resumo("sincrono (threads)", sincrono, duracao)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        gerenciador = GerenciadorRelatorios(diretorio, args.workers, args.pdfs, ttl_segundos=3600)
+        # Aquece o pool para nao medir a subida dos processos.
+        aquecimento = gerenciador.submeter(0, "aquecimento.pdf", "application/pdf", renderizar_dre_pdf, dre)
+        while gerenciador.obter(aquecimento.id, 0).status == STATUS_PENDENTE:
+            time.sleep(0.05)
+
+        def carga_jobs():
+            jobs = [
+                gerenciador.submeter(0, f"dre_{i}.pdf", "application/pdf", renderizar_dre_pdf, dre)
+                for i in range(args.pdfs)
+            ]
+            for job in jobs:
+                while gerenciador.obter(job.id, 0).status == STATUS_PENDENTE:
+                    time.sleep(0.05)
+
+        jobs, duracao = _cenario(client, carga_jobs)
+        gerenciador.encerrar()
+    _resumo(f"jobs ({args.workers} processos)", jobs, duracao)
+
+
+if __name__ == "__main__":
+    main()
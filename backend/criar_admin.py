@@ -0,0 +1,44 @@
+"""
+Cria ou promove um usuário administrador.
+
+O cadastro pela API só cria usuários comuns; administradores (ex.: quem chama
+POST /admin/reconciliacao-saldos) são provisionados por este comando.
+
+Uso:
+python criar_admin.py admin@dominio.com                  # promove um usuário existente
+python criar_admin.py admin@dominio.com --nome "Admin"   # cria o usuário (pede a senha)
+"""
+
+import argparse
+import getpass
+
+from sqlalchemy.orm import Session
+
+from app.crud.crud_user import get_user_by_email, provisionar_admin
+from app.db.session import SessionLocal
+
+
+def criar_admin(email: str, nome: str | None = None) -> None:
+    db: Session = SessionLocal()
+
+    try:
+        senha = None
+        if get_user_by_email(db, email) is None:
+            senha = getpass.getpass(f"Senha para o novo administrador {email}: ")
+        user = provisionar_admin(db, email, password=senha, nome=nome)
+        print(f"✅ {user.email} (id {user.id}) agora é administrador")
+    except Exception as e:
+        print(f"❌ Erro ao provisionar administrador: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cria ou promove um usuário administrador.")
+    parser.add_argument("email", help="email do usuário")
+    parser.add_argument("--nome", default=None, help="nome, se o usuário for criado")
+    args = parser.parse_args()
+
+    criar_admin(args.email, nome=args.nome)
@@ -0,0 +1,57 @@
+"""
+Exporta os dados financeiros em Parquet (um arquivo por tabela, compressão zstd).
+
+Requer pyarrow (`pip install pyarrow`).
+
+Uso:
+python exportar_parquet.py --destino /dados/export                 # todos os usuários
+python exportar_parquet.py --destino /dados/export --user-id 7     # um usuário
+python exportar_parquet.py --destino /dados/export --por-usuario   # um diretório por usuário
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models import User
+from app.services.export_colunar import PYARROW_AVAILABLE, exportar_dados
+
+
+def exportar_parquet(destino: str, user_id: int | None = None, por_usuario: bool = False) -> dict[str, int]:
+    if not PYARROW_AVAILABLE:
+        raise SystemExit("❌ pyarrow não instalado (pip install pyarrow)")
+
+    db: Session = SessionLocal()
+    inicio = time.perf_counter()
+
+    try:
+        if por_usuario and user_id is None:
+            totais: dict[str, int] = {}
+            for (uid,) in db.query(User.id).order_by(User.id).all():
+                for tabela, linhas in exportar_dados(db, Path(destino) / f"user_{uid}", user_id=uid).items():
+                    totais[tabela] = totais.get(tabela, 0) + linhas
+        else:
+            totais = exportar_dados(db, destino, user_id=user_id)
+
+        for tabela, linhas in totais.items():
+            print(f"📦 {tabela:12} {linhas:>10} linhas")
+        print(f"✅ Exportação concluída em {time.perf_counter() - inicio:.1f}s → {destino}")
+        return totais
+    except Exception as e:
+        print(f"❌ Erro ao exportar: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta os dados financeiros em Parquet.")
+    parser.add_argument("--destino", required=True, help="diretório de saída")
+    parser.add_argument("--user-id", type=int, default=None, help="exporta apenas um usuário")
+    parser.add_argument("--por-usuario", action="store_true", help="gera um diretório por usuário")
+    args = parser.parse_args()
+
+    exportar_parquet(args.destino, user_id=args.user_id, por_usuario=args.por_usuario)
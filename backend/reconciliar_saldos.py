@@ -0,0 +1,53 @@
+"""
+Reconcilia o saldo das contas com as transações liquidadas.
+
+Uso:
+python reconciliar_saldos.py              # apenas relatório
+python reconciliar_saldos.py --corrigir   # grava o saldo esperado nas contas divergentes
+python reconciliar_saldos.py --user-id 7  # restringe a um usuário
+
+Pensado para rodar periodicamente (ex.: cron noturno).
+"""
+
+import argparse
+
+from sqlalchemy.orm import Session
+
+from app.crud.crud_reconciliacao import calcular_divergencias, corrigir_divergencias
+from app.db.session import SessionLocal
+
+
+def reconciliar_saldos(corrigir: bool = False, user_id: int | None = None) -> int:
+    db: Session = SessionLocal()
+
+    try:
+        total_contas, divergencias = calcular_divergencias(db, user_id=user_id)
+
+        print(f"🔎 Contas verificadas: {total_contas}")
+        print(f"⚠️  Contas divergentes: {len(divergencias)}")
+        for d in divergencias:
+            print(
+                f"  conta {d.conta_id:>6} (usuario {d.user_id}) {d.conta_nome[:30]:30} "
+                f"atual={d.saldo_atual:.2f} esperado={d.saldo_esperado:.2f} diferenca={d.diferenca:+.2f}"
+            )
+
+        if corrigir and divergencias:
+            corrigidas = corrigir_divergencias(db, divergencias)
+            print(f"✅ Contas corrigidas: {corrigidas}")
+
+        return len(divergencias)
+    except Exception as e:
+        print(f"❌ Erro ao reconciliar saldos: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcilia Conta.saldo com as transações liquidadas.")
+    parser.add_argument("--corrigir", action="store_true", help="grava o saldo esperado nas contas divergentes")
+    parser.add_argument("--user-id", type=int, default=None, help="restringe a reconciliação a um usuário")
+    args = parser.parse_args()
+
+    reconciliar_saldos(corrigir=args.corrigir, user_id=args.user_id)
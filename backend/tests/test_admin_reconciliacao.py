@@ -0,0 +1,219 @@
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import TestingSessionLocal
+
+from app.crud.crud_user import provisionar_admin
+from app.models import Conta, SaldoDiario, User, UserRole
+
+
+def _register_user(client, email: str, password: str = "senha123", role: str = "user"):
+    return client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "nome": "Usuario Teste",
+            "role": role,
+        },
+    )
+
+
+def _login_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": password},
+    )
+
+
+def _auth_headers(client, admin: bool = False):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    register_response = _register_user(client, email)
+    assert register_response.status_code == 201
+    if admin:
+        db = TestingSessionLocal()
+        try:
+            db.query(User).filter(User.email == email).update({User.role: UserRole.ADMIN})
+            db.commit()
+        finally:
+            db.close()
+    login_response = _login_user(client, email)
+    assert login_response.status_code == 200
+    token = login_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_registro_nao_permite_papel_admin(client):
+    response = _register_user(client, f"admin_{uuid.uuid4().hex[:8]}@example.com", role="admin")
+    assert response.status_code == 403
+
+
+def test_reconciliacao_exige_admin(client):
+    headers = _auth_headers(client)
+    response = client.post("/api/v1/admin/reconciliacao-saldos", headers=headers)
+    assert response.status_code == 403
+
+
+def test_reconciliacao_detecta_e_corrige_divergencia(client):
+    headers = _auth_headers(client)
+    admin_headers = _auth_headers(client, admin=True)
+    hoje = date.today().isoformat()
+
+    conta_response = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Drift", "tipo": "conta_corrente", "saldo": 1000.0, "cor": "#10B981", "ativa": True},
+    )
+    conta_id = conta_response.json()["id"]
+    user_id = conta_response.json()["user_id"]
+
+    cria = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta_id,
+            "descricao": "Saida liquidada",
+            "valor": 200.0,
+            "valor_juros": 10.0,
+            "tipo": "saida",
+            "data": hoje,
+            "status_liquidacao": "liquidado",
+            "data_liquidacao": hoje,
+        },
+    )
+    assert cria.status_code == 201
+
+    ajuste_manual = client.put(f"/api/v1/contas/{conta_id}", headers=headers, json={"saldo": 900.0})
+    assert ajuste_manual.status_code == 200
+
+    sem_divergencia = client.post(f"/api/v1/admin/reconciliacao-saldos?user_id={user_id}", headers=admin_headers)
+    assert sem_divergencia.status_code == 200
+    assert sem_divergencia.json()["total_contas"] == 1
+    assert sem_divergencia.json()["total_divergencias"] == 0
+
+    db = TestingSessionLocal()
+    try:
+        db.query(Conta).filter(Conta.id == conta_id).update({Conta.saldo: 850.0})
+        db.commit()
+    finally:
+        db.close()
+
+    relatorio = client.post(f"/api/v1/admin/reconciliacao-saldos?user_id={user_id}", headers=admin_headers)
+    assert relatorio.status_code == 200
+    payload = relatorio.json()
+    assert payload["total_divergencias"] == 1
+    assert payload["corrigidas"] == 0
+    assert payload["divergencias"][0]["saldo_atual"] == 850.0
+    assert payload["divergencias"][0]["saldo_esperado"] == 900.0
+    assert payload["divergencias"][0]["diferenca"] == 50.0
+
+    correcao = client.post(
+        f"/api/v1/admin/reconciliacao-saldos?user_id={user_id}&corrigir=true",
+        headers=admin_headers,
+    )
+    assert correcao.status_code == 200
+    assert correcao.json()["corrigidas"] == 1
+
+    conta = client.get(f"/api/v1/contas/{conta_id}", headers=headers)
+    assert conta.json()["saldo"] == 900.0
+
+
+def test_correcao_entra_no_inicio_do_historico(client):
+    headers = _auth_headers(client)
+    admin_headers = _auth_headers(client, admin=True)
+    hoje = date.today()
+    dia_saida = hoje - timedelta(days=3)
+
+    conta_response = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Historico Drift", "tipo": "conta_corrente", "saldo": 1000.0, "cor": "#10B981", "ativa": True},
+    )
+    conta_id = conta_response.json()["id"]
+    user_id = conta_response.json()["user_id"]
+    cria = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta_id,
+            "descricao": "Aluguel",
+            "valor": 200.0,
+            "tipo": "saida",
+            "data": dia_saida.isoformat(),
+            "status_liquidacao": "liquidado",
+            "data_liquidacao": dia_saida.isoformat(),
+        },
+    )
+    assert cria.status_code == 201
+
+    db = TestingSessionLocal()
+    try:
+        db.query(Conta).filter(Conta.id == conta_id).update({Conta.saldo: 750.0})
+        db.commit()
+    finally:
+        db.close()
+
+    correcao = client.post(
+        f"/api/v1/admin/reconciliacao-saldos?user_id={user_id}&corrigir=true",
+        headers=admin_headers,
+    )
+    assert correcao.json()["corrigidas"] == 1
+
+    inicio = hoje - timedelta(days=4)
+    historico = client.get(
+        f"/api/v1/contas/{conta_id}/saldo-historico?inicio={inicio.isoformat()}&fim={hoje.isoformat()}",
+        headers=headers,
+    )
+    pontos = {p["data"]: p["saldo"] for p in historico.json()["pontos"]}
+    # Sem salto no dia da reconciliacao: os dias anteriores ja refletem o saldo corrigido.
+    assert pontos[inicio.isoformat()] == 0.0
+    assert pontos[dia_saida.isoformat()] == -200.0
+    assert pontos[(hoje - timedelta(days=1)).isoformat()] == -200.0
+    assert pontos[hoje.isoformat()] == 800.0
+
+    # Livro tambem fora de sincronia: o acerto do livro entra no primeiro dia.
+    db = TestingSessionLocal()
+    try:
+        db.query(SaldoDiario).filter(SaldoDiario.conta_id == conta_id, SaldoDiario.data == dia_saida).update(
+            {SaldoDiario.variacao: -150.0}
+        )
+        db.query(Conta).filter(Conta.id == conta_id).update({Conta.saldo: 760.0})
+        db.commit()
+    finally:
+        db.close()
+    client.post(f"/api/v1/admin/reconciliacao-saldos?user_id={user_id}&corrigir=true", headers=admin_headers)
+
+    historico = client.get(
+        f"/api/v1/contas/{conta_id}/saldo-historico?inicio={inicio.isoformat()}&fim={hoje.isoformat()}",
+        headers=headers,
+    )
+    pontos = {p["data"]: p["saldo"] for p in historico.json()["pontos"]}
+    assert pontos[inicio.isoformat()] == 0.0
+    assert pontos[(hoje - timedelta(days=1)).isoformat()] == -200.0
+    assert pontos[hoje.isoformat()] == 800.0
+
+
+def test_provisionar_admin_promove_ou_cria(client):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    assert _register_user(client, email).status_code == 201
+    novo_email = f"admin_{uuid.uuid4().hex[:8]}@example.com"
+
+    db = TestingSessionLocal()
+    try:
+        assert provisionar_admin(db, email).role == UserRole.ADMIN
+        with pytest.raises(ValueError):
+            provisionar_admin(db, novo_email)
+        criado = provisionar_admin(db, novo_email, password="senha123", nome="Admin")
+        assert criado.role == UserRole.ADMIN
+    finally:
+        db.close()
+
+    for admin_email in (email, novo_email):
+        token = _login_user(client, admin_email).json()["access_token"]
+        response = client.post(
+            "/api/v1/admin/reconciliacao-saldos",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 200
@@ -0,0 +1,182 @@
+import random
+import uuid
+from datetime import date
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.money import de_centavos, valor_efetivo_centavos
+from app.models import Transacao
+from app.services import analise
+from conftest import TestingSessionLocal
+
+
+def _register_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "nome": "Usuario Teste",
+            "role": "user",
+        },
+    )
+
+
+def _login_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": password},
+    )
+
+
+def _auth_headers(client):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    register_response = _register_user(client, email)
+    assert register_response.status_code == 201
+    login_response = _login_user(client, email)
+    assert login_response.status_code == 200
+    token = login_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _criar_conta(client, headers) -> int:
+    response = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Analise", "tipo": "conta_corrente", "saldo": 0.0, "cor": "#10B981", "ativa": True},
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _criar_categoria(client, headers, nome: str, tipo: str) -> int:
+    response = client.post(
+        "/api/v1/categorias",
+        headers=headers,
+        json={"nome": nome, "icone": "tag", "cor": "#123ABC", "tipo": tipo},
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _criar_lancamentos(client, headers, conta_id: int, categorias: list[int | None], datas: list[date], quantidade: int):
+    rng = random.Random(11)
+    criadas = []
+    for i in range(quantidade):
+        status = rng.choice(["liquidado", "previsto", "previsto", "cancelado"])
+        data = rng.choice(datas)
+        payload = {
+            "conta_id": conta_id,
+            "categoria_id": rng.choice(categorias),
+            "descricao": f"Lancamento {i}",
+            "valor": round(rng.uniform(0.01, 900), 2),
+            "valor_multa": rng.choice([0.0, 0.0, 1.37]),
+            "valor_juros": rng.choice([0.0, 0.05]),
+            "valor_desconto": rng.choice([0.0, 0.0, 2.49]),
+            "tipo": rng.choice(["entrada", "saida", "saida"]),
+            "data": data.isoformat(),
+            "status_liquidacao": status,
+        }
+        if status == "liquidado":
+            payload["data_liquidacao"] = data.isoformat()
+        response = client.post("/api/v1/transacoes", headers=headers, json=payload)
+        assert response.status_code == 201, response.text
+        criadas.append(response.json()["id"])
+    with TestingSessionLocal() as db:
+        return db.scalars(select(Transacao).where(Transacao.id.in_(criadas))).all()
+
+
+def test_somas_por_grupo_percentuais_e_mes():
+    ids, somas = analise.somar_por(np.array([5, 2, 5, analise.SEM_GRUPO]), np.array([100, 30, 250, 7]))
+    assert ids.tolist() == [analise.SEM_GRUPO, 2, 5]
+    assert somas.tolist() == [7, 30, 350]
+
+    pares = analise.somar_por_pares(np.array([1, 1, 2, 1]), np.array([10, 11, 10, 10]), np.array([5, 6, 7, 8]))
+    assert pares == {(1, 10): 13, (1, 11): 6, (2, 10): 7}
+    assert analise.somar_por_pares(np.array([]), np.array([]), np.array([])) == {}
+
+    assert analise.percentuais(np.array([1, 1, 1])).tolist() == [33.33, 33.33, 33.33]
+    assert analise.percentuais(np.array([0, 0])).tolist() == [0.0, 0.0]
+
+    datas = np.array([date(2025, 12, 31), date(2026, 1, 1), date(2026, 2, 28)], dtype="datetime64[D]")
+    assert analise.chave_mes(datas).tolist() == [
+        analise.chave_mes_de(2025, 12),
+        analise.chave_mes_de(2026, 1),
+        analise.chave_mes_de(2026, 2),
+    ]
+
+    assert analise.centavos([0.1 + 0.2, None, 1.005]).tolist() == [30, 0, 100]
+
+
+def test_dre_vetorizado_confere_com_laco(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+    salario = _criar_categoria(client, headers, "Salario Analise", "entrada")
+    mercado = _criar_categoria(client, headers, "Mercado Analise", "saida")
+    lazer = _criar_categoria(client, headers, "Lazer Analise", "saida")
+    nomes = {salario: "Salario Analise", mercado: "Mercado Analise", lazer: "Lazer Analise", None: "Sem categoria"}
+    hoje = date.today()
+    transacoes = _criar_lancamentos(client, headers, conta_id, [salario, mercado, lazer, None], [hoje], 60)
+
+    totais = {"entrada": {}, "saida": {}}
+    liquidado = {"entrada": 0, "saida": 0}
+    previsto = {"entrada": 0, "saida": 0}
+    for t in transacoes:
+        if t.status_liquidacao.value == "cancelado":
+            continue
+        valor = valor_efetivo_centavos(t.valor, t.valor_multa, t.valor_juros, t.valor_desconto)
+        tipo = t.tipo.value
+        totais[tipo][t.categoria_id] = totais[tipo].get(t.categoria_id, 0) + valor
+        if t.status_liquidacao.value == "liquidado":
+            liquidado[tipo] += valor
+        else:
+            previsto[tipo] += valor
+
+    response = client.get(f"/api/v1/relatorios/dre-mensal?mes={hoje.month}&ano={hoje.year}", headers=headers)
+    assert response.status_code == 200
+    payload = response.json()
+
+    assert payload["entradas_liquidadas"] == de_centavos(liquidado["entrada"])
+    assert payload["entradas_previstas"] == de_centavos(previsto["entrada"])
+    assert payload["saidas_liquidadas"] == de_centavos(liquidado["saida"])
+    assert payload["saidas_previstas"] == de_centavos(previsto["saida"])
+    assert payload["resultado_total"] == de_centavos(
+        liquidado["entrada"] + previsto["entrada"] - liquidado["saida"] - previsto["saida"]
+    )
+    for tipo, chave in (("entrada", "entradas_por_categoria"), ("saida", "saidas_por_categoria")):
+        esperado = {nomes[c]: de_centavos(v) for c, v in totais[tipo].items()}
+        assert {i["categoria_nome"]: i["valor"] for i in payload[chave]} == esperado
+        valores = [i["valor"] for i in payload[chave]]
+        assert valores == sorted(valores, reverse=True)
+        assert abs(sum(i["percentual"] for i in payload[chave]) - 100) < 0.1
+
+
+def test_orcamentos_listados_conferem_com_consulta_individual(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+    categorias = [
+        _criar_categoria(client, headers, "Mercado Orcamento", "saida"),
+        _criar_categoria(client, headers, "Lazer Orcamento", "saida"),
+    ]
+    meses = [(2025, 12), (2026, 1), (2026, 2)]
+    datas = [date(2025, 12, 31), date(2026, 1, 1), date(2026, 1, 31), date(2026, 2, 15), date(2026, 3, 1)]
+    _criar_lancamentos(client, headers, conta_id, categorias + [None], datas, 50)
+
+    for categoria_id in categorias:
+        for ano, mes in meses:
+            response = client.post(
+                "/api/v1/orcamentos",
+                headers=headers,
+                json={"categoria_id": categoria_id, "mes": mes, "ano": ano, "valor_planejado": 500.0},
+            )
+            assert response.status_code == 201
+
+    lista = client.get("/api/v1/orcamentos", headers=headers)
+    assert lista.status_code == 200
+    assert len(lista.json()) == len(categorias) * len(meses)
+    assert any(o["valor_gasto"] for o in lista.json())
+    for orcamento in lista.json():
+        individual = client.get(f"/api/v1/orcamentos/{orcamento['id']}", headers=headers)
+        assert individual.status_code == 200
+        assert orcamento["valor_gasto"] == individual.json()["valor_gasto"], orcamento
@@ -0,0 +1,181 @@
+import io
+import json
+import uuid
+from datetime import date
+
+import pytest
+from conftest import TestingSessionLocal
+
+from app.services.backup import BackupInvalidoError, escrever_backup, restaurar_backup
+
+
+def _register_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "nome": "Usuario Teste",
+            "role": "user",
+        },
+    )
+
+
+def _login_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": password},
+    )
+
+
+def _auth_headers(client):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    register_response = _register_user(client, email)
+    assert register_response.status_code == 201
+    login_response = _login_user(client, email)
+    assert login_response.status_code == 200
+    token = login_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _popular_usuario(client, headers):
+    hoje = date.today().isoformat()
+    conta = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Backup", "tipo": "conta_corrente", "saldo": 1000.0, "cor": "#10B981", "ativa": True},
+    ).json()
+    categoria = client.post(
+        "/api/v1/categorias",
+        headers=headers,
+        json={"nome": "Mercado", "icone": "tag", "cor": "#123ABC", "tipo": "saida"},
+    ).json()
+    meta = client.post(
+        "/api/v1/metas",
+        headers=headers,
+        json={"nome": "Reserva", "valor_alvo": 5000.0, "data_inicio": hoje, "cor": "#10B981"},
+    ).json()
+    client.post(
+        "/api/v1/orcamentos",
+        headers=headers,
+        json={"categoria_id": categoria["id"], "mes": date.today().month, "ano": date.today().year, "valor_planejado": 800.0},
+    )
+
+    salario = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta["id"],
+            "descricao": "Salario",
+            "valor": 3000.0,
+            "tipo": "entrada",
+            "data": hoje,
+            "status_liquidacao": "liquidado",
+            "data_liquidacao": hoje,
+            "tem_dizimo": True,
+            "percentual_dizimo": 10.0,
+            "meta_id": meta["id"],
+        },
+    )
+    assert salario.status_code == 201
+    parcelada = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta["id"],
+            "categoria_id": categoria["id"],
+            "descricao": "Geladeira",
+            "valor": 300.0,
+            "tipo": "saida",
+            "data": hoje,
+            "parcelado": True,
+            "total_parcelas": 3,
+            "tags": "casa, eletro",
+        },
+    )
+    assert parcelada.status_code == 201
+    return conta
+
+
+def _resumo(client, headers):
+    transacoes = client.get("/api/v1/transacoes", headers=headers).json()
+    contas = client.get("/api/v1/contas", headers=headers).json()
+    metas = client.get("/api/v1/metas", headers=headers).json()
+    orcamentos = client.get("/api/v1/orcamentos", headers=headers).json()
+    return transacoes, contas, metas, orcamentos
+
+
+def test_backup_e_restauracao_preservam_vinculos_saldos_e_acumulados(client):
+    origem = _auth_headers(client)
+    destino = _auth_headers(client)
+    conta_origem = _popular_usuario(client, origem)
+    conta_destino_user = client.post(
+        "/api/v1/contas",
+        headers=destino,
+        json={"nome": "Existente", "tipo": "conta_corrente", "saldo": 0.0, "cor": "#10B981", "ativa": True},
+    ).json()["user_id"]
+
+    db = TestingSessionLocal()
+    try:
+        buffer = io.StringIO()
+        escrever_backup(db, conta_origem["user_id"], buffer)
+        linhas = buffer.getvalue().splitlines()
+        assert json.loads(linhas[0])["formato"] == "financas-backup"
+
+        totais = restaurar_backup(db, iter(linhas), conta_destino_user, tamanho_lote=2)
+    finally:
+        db.close()
+
+    assert totais["transacoes"] == 5
+    assert totais["contas"] == 1
+
+    transacoes_o, contas_o, metas_o, orcamentos_o = _resumo(client, origem)
+    transacoes_d, contas_d, metas_d, orcamentos_d = _resumo(client, destino)
+
+    conta_restaurada = next(c for c in contas_d if c["nome"] == "Conta Backup")
+    assert conta_restaurada["saldo"] == contas_o[0]["saldo"]
+    assert metas_d[0]["valor_atual"] == metas_o[0]["valor_atual"]
+    assert orcamentos_d[0]["valor_gasto"] == orcamentos_o[0]["valor_gasto"] > 0
+
+    uuids_origem = {t["transacao_uuid"] for t in transacoes_o}
+    assert uuids_origem.isdisjoint({t["transacao_uuid"] for t in transacoes_d})
+
+    parcelas = [t for t in transacoes_d if t["descricao"].startswith("Geladeira")]
+    assert len(parcelas) == 3
+    assert len({t["grupo_parcelamento_uuid"] for t in parcelas}) == 1
+
+    salario = next(t for t in transacoes_d if t["descricao"] == "Salario")
+    dizimo = next(t for t in transacoes_d if t["e_dizimo"])
+    assert dizimo["transacao_dizimo_uuid"] == salario["transacao_dizimo_uuid"] is not None
+    assert dizimo["entrada_origem_id"] == salario["id"]
+    assert dizimo["conta_id"] == conta_restaurada["id"]
+
+    por_tag = client.get("/api/v1/transacoes?tag=eletro", headers=destino).json()
+    assert len(por_tag) == 3
+
+
+def test_restauracao_rejeita_backup_invalido_sem_gravar(client):
+    headers = _auth_headers(client)
+    user_id = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta", "tipo": "conta_corrente", "saldo": 0.0, "cor": "#10B981", "ativa": True},
+    ).json()["user_id"]
+    cabecalho = json.dumps({"formato": "financas-backup", "versao": 1})
+    transacao_orfa = json.dumps(
+        {
+            "tabela": "transacoes",
+            "dados": {"id": 1, "conta_id": 12345, "descricao": "x", "valor": 1.0, "tipo": "saida", "data": "2026-01-01"},
+        }
+    )
+
+    db = TestingSessionLocal()
+    try:
+        with pytest.raises(BackupInvalidoError):
+            restaurar_backup(db, [cabecalho, transacao_orfa], user_id)
+        with pytest.raises(BackupInvalidoError):
+            restaurar_backup(db, ["{}"], user_id)
+    finally:
+        db.close()
+
+    assert client.get("/api/v1/transacoes", headers=headers).json() == []
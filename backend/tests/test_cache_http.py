@@ -0,0 +1,164 @@
+import gzip
+import uuid
+from datetime import date
+
+from app.core.compressao import escolher_codificacao
+
+
+def _register_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "nome": "Usuario Teste",
+            "role": "user",
+        },
+    )
+
+
+def _login_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": password},
+    )
+
+
+def _auth_headers(client):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    register_response = _register_user(client, email)
+    assert register_response.status_code == 201
+    login_response = _login_user(client, email)
+    assert login_response.status_code == 200
+    token = login_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _criar_conta(client, headers) -> int:
+    response = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={
+            "nome": "Conta Cache",
+            "tipo": "conta_corrente",
+            "saldo": 1000.0,
+            "cor": "#10B981",
+            "ativa": True,
+        },
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _criar_transacoes(client, headers, conta_id: int, quantidade: int):
+    for i in range(quantidade):
+        response = client.post(
+            "/api/v1/transacoes",
+            headers=headers,
+            json={
+                "conta_id": conta_id,
+                "descricao": f"Compra {i}",
+                "valor": 10.0 + i,
+                "tipo": "saida",
+                "data": date.today().isoformat(),
+                "status_liquidacao": "previsto",
+            },
+        )
+        assert response.status_code == 201
+
+
+def test_escolher_codificacao_respeita_q():
+    assert escolher_codificacao("gzip, deflate") == "gzip"
+    assert escolher_codificacao("gzip;q=0, identity") is None
+    assert escolher_codificacao("*") in {"br", "gzip"}
+    assert escolher_codificacao("") is None
+
+
+def test_listagem_grande_e_comprimida_com_gzip(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+    _criar_transacoes(client, headers, conta_id, 10)
+
+    identidade = client.get("/api/v1/transacoes", headers={**headers, "Accept-Encoding": "identity"})
+    assert identidade.status_code == 200
+    assert "content-encoding" not in identidade.headers
+
+    comprimida = client.get("/api/v1/transacoes", headers={**headers, "Accept-Encoding": "gzip"})
+    assert comprimida.status_code == 200
+    assert comprimida.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in comprimida.headers["vary"]
+    assert comprimida.json() == identidade.json()
+
+    # Resposta pequena fica abaixo do tamanho minimo.
+    pequena = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in pequena.headers
+
+
+def test_csv_em_streaming_e_comprimido_por_blocos(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+    _criar_transacoes(client, headers, conta_id, 5)
+
+    with client.stream(
+        "GET", "/api/v1/transacoes/export.csv", headers={**headers, "Accept-Encoding": "gzip"}
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        bruto = b"".join(response.iter_raw())
+
+    texto = gzip.decompress(bruto).decode("utf-8-sig")
+    assert "Compra 4" in texto
+
+
+def test_listagens_respondem_304_com_etag_da_versao(client):
+    headers = _auth_headers(client)
+    _criar_conta(client, headers)
+
+    for rota in ("/api/v1/contas", "/api/v1/categorias", "/api/v1/metas", "/api/v1/orcamentos", "/api/v1/transacoes"):
+        primeira = client.get(rota, headers=headers)
+        assert primeira.status_code == 200
+        etag = primeira.headers["etag"]
+        assert etag.startswith('W/"')
+        assert primeira.headers["cache-control"] == "private, no-cache"
+
+        repetida = client.get(rota, headers={**headers, "If-None-Match": etag})
+        assert repetida.status_code == 304, rota
+        assert repetida.content == b""
+        assert repetida.headers["etag"] == etag
+
+
+def test_etag_muda_apos_escrita_e_por_filtro(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+
+    etag_contas = client.get("/api/v1/contas", headers=headers).headers["etag"]
+    etag_transacoes = client.get("/api/v1/transacoes", headers=headers).headers["etag"]
+    etag_filtrada = client.get("/api/v1/transacoes?tipo=saida", headers=headers).headers["etag"]
+    assert etag_filtrada != etag_transacoes
+
+    _criar_transacoes(client, headers, conta_id, 1)
+
+    assert client.get(
+        "/api/v1/transacoes", headers={**headers, "If-None-Match": etag_transacoes}
+    ).status_code == 200
+    # O saldo da conta pode mudar com a transacao: a versao e do usuario inteiro.
+    assert client.get("/api/v1/contas", headers={**headers, "If-None-Match": etag_contas}).status_code == 200
+
+    etag_contas = client.get("/api/v1/contas", headers=headers).headers["etag"]
+    meta = client.post(
+        "/api/v1/metas",
+        headers=headers,
+        json={"nome": "Reserva", "valor_alvo": 1000.0, "data_inicio": date.today().isoformat()},
+    )
+    assert meta.status_code == 201, meta.text
+    assert client.get("/api/v1/contas", headers=headers).headers["etag"] != etag_contas
+
+
+def test_outro_usuario_nao_reaproveita_etag(client):
+    headers_a = _auth_headers(client)
+    headers_b = _auth_headers(client)
+
+    etag_a = client.get("/api/v1/categorias", headers=headers_a).headers["etag"]
+    resposta_b = client.get("/api/v1/categorias", headers={**headers_b, "If-None-Match": etag_a})
+    assert resposta_b.status_code == 200
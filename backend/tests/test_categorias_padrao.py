@@ -0,0 +1,176 @@
+import uuid
+from datetime import date
+
+import pytest
+from conftest import TestingSessionLocal
+from sqlalchemy import insert
+
+from app.models import Categoria, TipoTransacao
+from app.services.catalogo_categorias import CatalogoCategorias, catalogo_categorias
+
+
+def _register_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "nome": "Usuario Teste",
+            "role": "user",
+        },
+    )
+
+
+def _login_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": password},
+    )
+
+
+def _auth_headers(client):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    register_response = _register_user(client, email)
+    assert register_response.status_code == 201
+    login_response = _login_user(client, email)
+    assert login_response.status_code == 200
+    token = login_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def categorias_padrao():
+    """Semeia categorias padrao (como o seed_categorias.py) e remove ao final."""
+    db = TestingSessionLocal()
+    try:
+        categorias = [
+            Categoria(user_id=None, nome="Salário", icone="$", cor="#10B981", tipo=TipoTransacao.ENTRADA, padrao=True),
+            Categoria(user_id=None, nome="Dízimo", icone="", cor="#8B5CF6", tipo=TipoTransacao.SAIDA, padrao=True),
+        ]
+        db.add_all(categorias)
+        db.commit()
+        ids = [c.id for c in categorias]
+    finally:
+        db.close()
+
+    yield ids
+
+    db = TestingSessionLocal()
+    try:
+        db.query(Categoria).filter(Categoria.user_id.is_(None)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+    catalogo_categorias.invalidar()
+
+
+def test_listagem_combina_catalogo_padrao_e_categorias_do_usuario(client, categorias_padrao):
+    headers = _auth_headers(client)
+    propria = client.post("/api/v1/categorias", headers=headers, json={"nome": "Pets", "tipo": "saida"})
+    assert propria.status_code == 201
+
+    response = client.get("/api/v1/categorias", headers=headers)
+    assert response.status_code == 200
+    ids = [c["id"] for c in response.json()]
+    assert ids == [*categorias_padrao, propria.json()["id"]]
+    padrao = response.json()[0]
+    assert padrao["user_id"] is None
+    assert padrao["padrao"] is True
+    assert padrao["nome"] == "Salário"
+
+
+def test_dizimo_usa_categoria_padrao_do_catalogo(client, categorias_padrao):
+    headers = _auth_headers(client)
+    conta = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta", "tipo": "conta_corrente", "saldo": 0.0, "cor": "#3B82F6", "ativa": True},
+    )
+    assert conta.status_code == 201
+
+    entrada = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta.json()["id"],
+            "descricao": "Recebimento",
+            "valor": 1000.0,
+            "tipo": "entrada",
+            "data": date.today().isoformat(),
+            "tem_dizimo": True,
+            "percentual_dizimo": 10.0,
+        },
+    )
+    assert entrada.status_code == 201
+
+    transacoes = client.get("/api/v1/transacoes", headers=headers).json()
+    dizimo = next(t for t in transacoes if t["e_dizimo"])
+    assert dizimo["categoria_id"] == categorias_padrao[1]
+    # Nenhuma categoria "Dizimo" propria foi criada.
+    categorias = client.get("/api/v1/categorias", headers=headers).json()
+    assert [c["id"] for c in categorias] == categorias_padrao
+
+
+def test_catalogo_detecta_reseed_de_outro_processo(categorias_padrao):
+    catalogo = CatalogoCategorias(intervalo_verificacao=0)
+    db = TestingSessionLocal()
+    try:
+        assert [c.id for c in catalogo.listar(db)] == categorias_padrao
+        assert catalogo.buscar(db, TipoTransacao.SAIDA, "DIZIMO").id == categorias_padrao[1]
+        assert catalogo.buscar(db, TipoTransacao.ENTRADA, "dizimo") is None
+
+        # Insert em massa (sem flush do ORM), como faria outro processo.
+        db.execute(
+            insert(Categoria),
+            [
+                {
+                    "user_id": None,
+                    "nome": "Mercado",
+                    "nome_normalizado": "mercado",
+                    "cor": "#F59E0B",
+                    "tipo": TipoTransacao.SAIDA,
+                    "padrao": True,
+                }
+            ],
+        )
+        db.commit()
+        assert [c.nome for c in catalogo.listar(db)] == ["Salário", "Dízimo", "Mercado"]
+    finally:
+        db.close()
+
+
+def test_catalogo_e_invalidado_no_commit_de_categoria_padrao(categorias_padrao):
+    catalogo_categorias.invalidar()
+    db = TestingSessionLocal()
+    try:
+        assert len(catalogo_categorias.listar(db)) == 2
+        categoria = db.query(Categoria).filter(Categoria.id == categorias_padrao[0]).one()
+        categoria.cor = "#000000"
+        db.commit()
+        assert catalogo_categorias.obter(db, categorias_padrao[0]).cor == "#000000"
+    finally:
+        db.close()
+
+
+def test_reseed_do_catalogo_invalida_etag_da_listagem(client, categorias_padrao, monkeypatch):
+    headers = _auth_headers(client)
+    primeira = client.get("/api/v1/categorias", headers=headers)
+    etag = primeira.headers["etag"]
+    assert client.get("/api/v1/categorias", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    # Reseed por outro processo: insert em massa, sem invalidacao local do catalogo.
+    monkeypatch.setattr(catalogo_categorias, "intervalo_verificacao", 0)
+    db = TestingSessionLocal()
+    try:
+        db.execute(
+            insert(Categoria),
+            [{"user_id": None, "nome": "Mercado", "nome_normalizado": "mercado", "tipo": TipoTransacao.SAIDA, "padrao": True}],
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    resposta = client.get("/api/v1/categorias", headers={**headers, "If-None-Match": etag})
+    assert resposta.status_code == 200
+    assert resposta.headers["etag"] != etag
+    assert [c["nome"] for c in resposta.json()] == ["Salário", "Dízimo", "Mercado"]
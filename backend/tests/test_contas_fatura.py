@@ -172,8 +172,25 @@ def test_pagar_fatura_liquida_itens_e_debita_conta_pagamento(client):
         },
     )
     assert pagar.status_code == 200
-    assert pagar.json()["total_itens"] == 0
-    assert pagar.json()["valor_total"] == 0
+    resultado = pagar.json()
+    assert resultado["conta_pagamento_id"] == conta_pagamento_id
+    assert resultado["saldo_conta_pagamento"] == 1790.0
+    assert resultado["valor_total_pago"] == 210.0
+    (pagamento,) = resultado["pagamentos"]
+    assert pagamento["conta_id"] == conta_cartao_id
+    assert pagamento["periodo_inicio"] == fatura_inicial.json()["periodo_inicio"]
+    assert pagamento["data_vencimento_fatura"] == fatura_inicial.json()["data_vencimento_fatura"]
+    assert (pagamento["itens_pagos"], pagamento["valor_pago"]) == (2, 210.0)
+    assert [
+        (i["transacao_id"], i["descricao"], i["status_liquidacao"], i["valor_juros"], i["valor_efetivo"])
+        for i in pagamento["itens"]
+    ] == [
+        (id_1, "Compra A", "liquidado", 0, 120.0),
+        (id_2, "Compra B", "liquidado", 10.0, 90.0),
+    ]
+
+    atualizada = client.get(f"/api/v1/contas/{conta_cartao_id}/fatura-atual", headers=headers).json()
+    assert (atualizada["total_itens"], atualizada["valor_total"]) == (0, 0)
 
     contas = client.get("/api/v1/contas", headers=headers)
     assert contas.status_code == 200
@@ -198,3 +215,223 @@ def test_pagar_fatura_liquida_itens_e_debita_conta_pagamento(client):
     assert transferencia["valor"] == 210.0
     assert transferencia["status_liquidacao"] == "liquidado"
     assert transferencia["data_liquidacao"] == pagamento_data
+
+
+def _criar_saida(client, headers, conta_id: int, data: str, valor: float):
+    response = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta_id,
+            "descricao": f"Compra {data}",
+            "valor": valor,
+            "tipo": "saida",
+            "data": data,
+            "status_liquidacao": "previsto",
+        },
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _faturas(client, headers, conta_id: int, inicio: str = "2026-01-01", fim: str = "2026-06-30"):
+    response = client.get(
+        f"/api/v1/contas/{conta_id}/faturas",
+        headers=headers,
+        params={"inicio": inicio, "fim": fim},
+    )
+    assert response.status_code == 200
+    return {f["periodo_fim"]: f for f in response.json()["faturas"]}
+
+
+def test_faturas_cobrem_periodos_passados_e_futuros(client):
+    from conftest import TestingSessionLocal
+    from app.crud import crud_fatura
+    from app.models import Conta
+
+    headers = _auth_headers(client)
+    conta_cartao_id = _criar_conta_cartao(client, headers)
+
+    _criar_saida(client, headers, conta_cartao_id, "2026-01-10", 100.0)
+    _criar_saida(client, headers, conta_cartao_id, "2026-01-20", 50.0)
+    _criar_saida(client, headers, conta_cartao_id, "2026-01-21", 30.0)
+    _criar_saida(client, headers, conta_cartao_id, "2026-05-05", 200.0)
+
+    faturas = _faturas(client, headers, conta_cartao_id)
+    assert list(faturas) == [
+        "2026-01-20", "2026-02-20", "2026-03-20", "2026-04-20", "2026-05-20", "2026-06-20", "2026-07-20",
+    ]
+
+    janeiro = faturas["2026-01-20"]
+    assert janeiro["periodo_inicio"] == "2025-12-21"
+    assert janeiro["data_vencimento"] == "2026-01-28"
+    assert janeiro["quantidade_itens"] == 2
+    assert janeiro["itens_em_aberto"] == 2
+    assert janeiro["valor_total"] == 150.0
+    assert janeiro["valor_em_aberto"] == 150.0
+    assert janeiro["valor_pago"] == 0
+
+    assert faturas["2026-02-20"]["valor_total"] == 30.0
+    assert faturas["2026-03-20"]["quantidade_itens"] == 0
+    assert faturas["2026-05-20"]["valor_em_aberto"] == 200.0
+
+    with TestingSessionLocal() as db:
+        conta = db.get(Conta, conta_cartao_id)
+        armazenadas = crud_fatura.listar_faturas(db, conta, date(2026, 1, 1), date(2026, 6, 30))
+        calculadas = crud_fatura.calcular_faturas(db, conta, date(2026, 1, 1), date(2026, 6, 30))
+        assert armazenadas == calculadas
+
+
+def test_faturas_armazenadas_acompanham_alteracoes(client):
+    headers = _auth_headers(client)
+    conta_cartao_id = _criar_conta_cartao(client, headers)
+    conta_pagamento_id = _criar_conta_pagamento(client, headers)
+
+    compra_id = _criar_saida(client, headers, conta_cartao_id, "2026-02-10", 80.0)
+    _criar_saida(client, headers, conta_cartao_id, "2026-02-15", 20.0)
+    assert _faturas(client, headers, conta_cartao_id)["2026-02-20"]["valor_total"] == 100.0
+
+    movida = client.put(
+        f"/api/v1/transacoes/{compra_id}",
+        headers=headers,
+        json={"data": "2026-03-10"},
+    )
+    assert movida.status_code == 200
+    faturas = _faturas(client, headers, conta_cartao_id)
+    assert faturas["2026-02-20"]["valor_total"] == 20.0
+    assert faturas["2026-03-20"]["valor_total"] == 80.0
+
+    assert client.delete(f"/api/v1/transacoes/{compra_id}", headers=headers).status_code == 204
+    assert _faturas(client, headers, conta_cartao_id)["2026-03-20"]["quantidade_itens"] == 0
+
+    atual = client.get(f"/api/v1/contas/{conta_cartao_id}/fatura-atual", headers=headers).json()
+    _criar_saida(client, headers, conta_cartao_id, atual["periodo_inicio"], 60.0)
+    pagar = client.post(
+        f"/api/v1/contas/{conta_cartao_id}/pagar-fatura",
+        headers=headers,
+        json={"conta_pagamento_id": conta_pagamento_id},
+    )
+    assert pagar.status_code == 200
+    paga = _faturas(client, headers, conta_cartao_id, atual["periodo_inicio"], atual["periodo_fim"])
+    assert paga[atual["periodo_fim"]]["valor_em_aberto"] == 0
+    assert paga[atual["periodo_fim"]]["valor_pago"] == 60.0
+
+    alterada = client.put(f"/api/v1/contas/{conta_cartao_id}", headers=headers, json={"dia_fechamento": 5})
+    assert alterada.status_code == 200
+    faturas = _faturas(client, headers, conta_cartao_id)
+    assert faturas["2026-03-05"]["valor_total"] == 20.0
+    assert faturas["2026-03-05"]["periodo_inicio"] == "2026-02-06"
+
+
+def test_faturas_exige_cartao_e_periodo_valido(client):
+    headers = _auth_headers(client)
+    conta_pagamento_id = _criar_conta_pagamento(client, headers)
+    conta_cartao_id = _criar_conta_cartao(client, headers)
+
+    nao_cartao = client.get(f"/api/v1/contas/{conta_pagamento_id}/faturas", headers=headers)
+    assert nao_cartao.status_code == 400
+
+    invertido = client.get(
+        f"/api/v1/contas/{conta_cartao_id}/faturas",
+        headers=headers,
+        params={"inicio": "2026-06-01", "fim": "2026-01-01"},
+    )
+    assert invertido.status_code == 400
+
+    padrao = client.get(f"/api/v1/contas/{conta_cartao_id}/faturas", headers=headers)
+    assert padrao.status_code == 200
+    assert len(padrao.json()["faturas"]) >= 18
+
+
+def test_pagar_faturas_liquida_varios_cartoes_numa_transacao(client):
+    headers = _auth_headers(client)
+    cartao_a = _criar_conta_cartao(client, headers)
+    cartao_b = _criar_conta_cartao(client, headers)
+    cartao_vazio = _criar_conta_cartao(client, headers)
+    conta_pagamento_id = _criar_conta_pagamento(client, headers, saldo=1000.0)
+
+    atual = client.get(f"/api/v1/contas/{cartao_a}/fatura-atual", headers=headers).json()
+    _criar_saida(client, headers, cartao_a, atual["periodo_inicio"], 100.0)
+    _criar_saida(client, headers, cartao_a, atual["periodo_fim"], 50.5)
+    _criar_saida(client, headers, cartao_b, atual["periodo_inicio"], 200.0)
+
+    pagar = client.post(
+        "/api/v1/contas/pagar-faturas",
+        headers=headers,
+        json={"conta_ids": [cartao_a, cartao_b, cartao_vazio, cartao_a], "conta_pagamento_id": conta_pagamento_id},
+    )
+    assert pagar.status_code == 200
+    payload = pagar.json()
+    assert payload["valor_total_pago"] == 350.5
+    assert payload["saldo_conta_pagamento"] == 649.5
+    assert [(p["conta_id"], p["itens_pagos"], p["valor_pago"]) for p in payload["pagamentos"]] == [
+        (cartao_a, 2, 150.5),
+        (cartao_b, 1, 200.0),
+        (cartao_vazio, 0, 0.0),
+    ]
+    assert [i["valor_efetivo"] for i in payload["pagamentos"][0]["itens"]] == [100.0, 50.5]
+    assert all(i["status_liquidacao"] == "liquidado" for p in payload["pagamentos"] for i in p["itens"])
+    assert payload["pagamentos"][2]["itens"] == []
+
+    for cartao_id in (cartao_a, cartao_b):
+        fatura = client.get(f"/api/v1/contas/{cartao_id}/fatura-atual", headers=headers).json()
+        assert fatura["total_itens"] == 0
+        armazenada = _faturas(client, headers, cartao_id, atual["periodo_inicio"], atual["periodo_fim"])
+        assert armazenada[atual["periodo_fim"]]["valor_em_aberto"] == 0
+
+    transacoes = client.get("/api/v1/transacoes", headers=headers).json()
+    transferencias = [t for t in transacoes if t["tipo"] == "transferencia" and t["conta_id"] == conta_pagamento_id]
+    assert sorted(t["valor"] for t in transferencias) == [150.5, 200.0]
+    assert all(t["status_liquidacao"] == "liquidado" for t in transferencias)
+
+    repetido = client.post(
+        "/api/v1/contas/pagar-faturas",
+        headers=headers,
+        json={"conta_ids": [cartao_a, cartao_b], "conta_pagamento_id": conta_pagamento_id},
+    )
+    assert repetido.status_code == 400
+
+    contas = client.get("/api/v1/contas", headers=headers).json()
+    assert next(c for c in contas if c["id"] == conta_pagamento_id)["saldo"] == 649.5
+
+
+def test_pagar_faturas_rejeita_conta_que_nao_e_cartao(client):
+    headers = _auth_headers(client)
+    cartao_id = _criar_conta_cartao(client, headers)
+    conta_pagamento_id = _criar_conta_pagamento(client, headers)
+
+    response = client.post(
+        "/api/v1/contas/pagar-faturas",
+        headers=headers,
+        json={"conta_ids": [cartao_id, conta_pagamento_id], "conta_pagamento_id": conta_pagamento_id},
+    )
+    assert response.status_code == 400
+
+
+def test_resumo_cartoes_consolida_limite_utilizado(client):
+    headers = _auth_headers(client)
+    cartao_id = _criar_conta_cartao(client, headers)
+    _criar_conta_pagamento(client, headers)
+
+    atual = client.get(f"/api/v1/contas/{cartao_id}/fatura-atual", headers=headers).json()
+    periodo_fim = date.fromisoformat(atual["periodo_fim"])
+    _criar_saida(client, headers, cartao_id, atual["periodo_inicio"], 300.0)
+    _criar_saida(client, headers, cartao_id, (periodo_fim + timedelta(days=1)).isoformat(), 200.0)
+    _criar_saida(client, headers, cartao_id, (periodo_fim + timedelta(days=95)).isoformat(), 100.0)
+
+    response = client.get("/api/v1/contas/cartoes/resumo", headers=headers)
+    assert response.status_code == 200
+    payload = response.json()
+    assert [c["conta_id"] for c in payload["cartoes"]] == [cartao_id]
+
+    cartao = payload["cartoes"][0]
+    assert cartao["faturas_fechadas"] == 300.0
+    assert cartao["fatura_aberta"] + cartao["faturas_futuras"] == 300.0
+    assert cartao["faturas_futuras"] >= 100.0
+    assert cartao["limite_utilizado"] == 600.0
+    assert cartao["limite_disponivel"] == 4400.0
+    assert cartao["percentual_utilizado"] == 12.0
+    assert payload["limite_total"] == 5000.0
+    assert payload["limite_disponivel"] == 4400.0
+
+    assert client.get("/api/v1/contas/cartoes/resumo", headers={**headers, "If-None-Match": response.headers["etag"]}).status_code == 304
@@ -0,0 +1,166 @@
+import uuid
+from datetime import date, timedelta
+
+from app.models import SaldoDiario
+from conftest import TestingSessionLocal
+
+
+def _register_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "nome": "Usuario Teste",
+            "role": "user",
+        },
+    )
+
+
+def _login_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": password},
+    )
+
+
+def _auth_headers(client):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    register_response = _register_user(client, email)
+    assert register_response.status_code == 201
+    login_response = _login_user(client, email)
+    assert login_response.status_code == 200
+    token = login_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _criar_liquidada(client, headers, conta_id: int, descricao: str, valor: float, tipo: str, data_iso: str):
+    response = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta_id,
+            "descricao": descricao,
+            "valor": valor,
+            "tipo": tipo,
+            "data": data_iso,
+            "status_liquidacao": "liquidado",
+            "data_liquidacao": data_iso,
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_saldo_historico_diario_reflete_liquidacoes(client):
+    headers = _auth_headers(client)
+    hoje = date.today()
+
+    conta_response = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Historico", "tipo": "conta_corrente", "saldo": 1000.0, "cor": "#10B981", "ativa": True},
+    )
+    assert conta_response.status_code == 201
+    conta_id = conta_response.json()["id"]
+
+    dia_saida = hoje - timedelta(days=4)
+    dia_entrada = hoje - timedelta(days=2)
+    saida = _criar_liquidada(client, headers, conta_id, "Aluguel", 200.0, "saida", dia_saida.isoformat())
+    _criar_liquidada(client, headers, conta_id, "Salario", 500.0, "entrada", dia_entrada.isoformat())
+
+    inicio = hoje - timedelta(days=5)
+    response = client.get(
+        f"/api/v1/contas/{conta_id}/saldo-historico?inicio={inicio.isoformat()}&fim={hoje.isoformat()}",
+        headers=headers,
+    )
+    assert response.status_code == 200
+    pontos = {p["data"]: p["saldo"] for p in response.json()["pontos"]}
+    # O saldo inicial da conta entra como variacao do dia de criacao (hoje).
+    assert len(pontos) == 6
+    assert pontos[(hoje - timedelta(days=5)).isoformat()] == 0.0
+    assert pontos[dia_saida.isoformat()] == -200.0
+    assert pontos[(hoje - timedelta(days=3)).isoformat()] == -200.0
+    assert pontos[dia_entrada.isoformat()] == 300.0
+    assert pontos[(hoje - timedelta(days=1)).isoformat()] == 300.0
+    assert pontos[hoje.isoformat()] == 1300.0
+
+    delete = client.delete(f"/api/v1/transacoes/{saida['id']}", headers=headers)
+    assert delete.status_code == 204
+
+    response = client.get(
+        f"/api/v1/contas/{conta_id}/saldo-historico?inicio={inicio.isoformat()}&fim={hoje.isoformat()}",
+        headers=headers,
+    )
+    pontos = {p["data"]: p["saldo"] for p in response.json()["pontos"]}
+    assert pontos[dia_saida.isoformat()] == 0.0
+    assert pontos[hoje.isoformat()] == 1500.0
+
+
+def test_saldo_historico_mensal_e_ajuste_manual(client):
+    headers = _auth_headers(client)
+    hoje = date.today()
+
+    conta_response = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Mensal", "tipo": "poupanca", "saldo": 100.0, "cor": "#10B981", "ativa": True},
+    )
+    conta_id = conta_response.json()["id"]
+
+    ajuste = client.put(f"/api/v1/contas/{conta_id}", headers=headers, json={"saldo": 250.0})
+    assert ajuste.status_code == 200
+    assert ajuste.json()["saldo"] == 250.0
+
+    inicio = date(hoje.year, hoje.month, 1) - timedelta(days=40)
+    response = client.get(
+        f"/api/v1/contas/{conta_id}/saldo-historico?inicio={inicio.isoformat()}&granularidade=mes",
+        headers=headers,
+    )
+    assert response.status_code == 200
+    pontos = response.json()["pontos"]
+    assert pontos[-1] == {"data": hoje.isoformat(), "saldo": 250.0}
+    assert all(p["saldo"] == 0.0 for p in pontos[:-1])
+
+
+def test_varias_variacoes_no_mesmo_dia_somam_sem_alterar_o_dono(client):
+    headers = _auth_headers(client)
+    ontem = (date.today() - timedelta(days=1)).isoformat()
+
+    conta_response = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Dia", "tipo": "conta_corrente", "saldo": 0.0, "cor": "#10B981", "ativa": True},
+    )
+    assert conta_response.status_code == 201
+    conta_id = conta_response.json()["id"]
+    user_id = conta_response.json()["user_id"]
+
+    _criar_liquidada(client, headers, conta_id, "Salario", 500.0, "entrada", ontem)
+    _criar_liquidada(client, headers, conta_id, "Mercado", 120.5, "saida", ontem)
+    _criar_liquidada(client, headers, conta_id, "Farmacia", 30.25, "saida", ontem)
+
+    with TestingSessionLocal() as db:
+        registros = (
+            db.query(SaldoDiario.user_id, SaldoDiario.data, SaldoDiario.variacao)
+            .filter(SaldoDiario.conta_id == conta_id)
+            .all()
+        )
+    assert len(registros) == 1
+    assert registros[0].user_id == user_id
+    assert registros[0].data.isoformat() == ontem
+    assert registros[0].variacao == 349.25
+
+
+def test_saldo_historico_conta_de_outro_usuario_retorna_404(client):
+    headers = _auth_headers(client)
+    outro = _auth_headers(client)
+    conta_response = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Privada", "tipo": "carteira", "saldo": 10.0, "cor": "#10B981", "ativa": True},
+    )
+    conta_id = conta_response.json()["id"]
+
+    response = client.get(f"/api/v1/contas/{conta_id}/saldo-historico", headers=outro)
+    assert response.status_code == 404
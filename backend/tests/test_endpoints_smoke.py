@@ -1,5 +1,5 @@
 import uuid
-from datetime import date
+from datetime import date, timedelta
 
 
 def _register_user(client, email: str, password: str = "senha123"):
@@ -85,6 +85,32 @@ def test_categorias_crud_usuario_e_bloqueio_padrao(client):
     assert bloqueio_response.status_code == 404
 
 
+def test_categoria_nome_duplicado_ignora_acento_e_caixa(client):
+    headers = _auth_headers(client)
+
+    saude = client.post("/api/v1/categorias", headers=headers, json={"nome": "Saúde", "tipo": "saida"})
+    assert saude.status_code == 201
+
+    duplicada = client.post("/api/v1/categorias", headers=headers, json={"nome": "  SAUDE ", "tipo": "saida"})
+    assert duplicada.status_code == 400
+
+    outro_tipo = client.post("/api/v1/categorias", headers=headers, json={"nome": "saude", "tipo": "entrada"})
+    assert outro_tipo.status_code == 201
+
+    lazer = client.post("/api/v1/categorias", headers=headers, json={"nome": "Lazer", "tipo": "saida"})
+    assert lazer.status_code == 201
+    renomeia = client.put(
+        f"/api/v1/categorias/{lazer.json()['id']}",
+        headers=headers,
+        json={"nome": "saúde"},
+    )
+    assert renomeia.status_code == 400
+
+    # Mudar apenas a caixa do proprio nome nao conflita consigo mesma.
+    caixa = client.put(f"/api/v1/categorias/{saude.json()['id']}", headers=headers, json={"nome": "SAÚDE"})
+    assert caixa.status_code == 200
+
+
 def test_categoria_em_uso_nao_pode_excluir(client):
     headers = _auth_headers(client)
 
@@ -135,6 +161,111 @@ def test_categoria_em_uso_nao_pode_excluir(client):
     assert "Categoria em uso" in delete_response.json()["detail"]
 
 
+def test_contas_listagem_com_resumo(client):
+    headers = _auth_headers(client)
+    hoje = date.today()
+
+    contas_ids = []
+    for nome in ("Conta Resumo", "Conta Parada"):
+        response = client.post(
+            "/api/v1/contas",
+            headers=headers,
+            json={"nome": nome, "tipo": "conta_corrente", "saldo": 1000.0, "cor": "#10B981", "ativa": True},
+        )
+        assert response.status_code == 201
+        contas_ids.append(response.json()["id"])
+    conta_id, conta_parada_id = contas_ids
+
+    for tipo, valor, data, status_liquidacao in (
+        ("entrada", 500.0, hoje, "liquidado"),
+        ("saida", 200.0, hoje, "liquidado"),
+        ("saida", 999.0, hoje, "cancelado"),
+        ("saida", 100.0, hoje + timedelta(days=40), "previsto"),
+    ):
+        response = client.post(
+            "/api/v1/transacoes",
+            headers=headers,
+            json={
+                "conta_id": conta_id,
+                "descricao": f"{tipo} {valor}",
+                "valor": valor,
+                "tipo": tipo,
+                "data": data.isoformat(),
+                "status_liquidacao": status_liquidacao,
+            },
+        )
+        assert response.status_code == 201
+
+    sem_resumo = client.get("/api/v1/contas", headers=headers)
+    assert sem_resumo.status_code == 200
+    assert all(c["resumo"] is None for c in sem_resumo.json())
+
+    com_resumo = client.get("/api/v1/contas", headers=headers, params={"incluir_resumo": "true"})
+    assert com_resumo.status_code == 200
+    contas = {c["id"]: c for c in com_resumo.json()}
+    assert contas[conta_id]["resumo"] == {
+        "entradas_mes": 500.0,
+        "saidas_mes": 200.0,
+        "transferencias_mes": 0.0,
+        "pendente_entradas": 0.0,
+        "pendente_saidas": 100.0,
+        "ultima_movimentacao": hoje.isoformat(),
+    }
+    assert contas[conta_parada_id]["resumo"]["saidas_mes"] == 0.0
+    assert contas[conta_parada_id]["resumo"]["ultima_movimentacao"] is None
+
+
+def test_resumo_das_contas_separa_liquidadas_pendentes_e_transferencias(client):
+    headers = _auth_headers(client)
+    hoje = date.today()
+    mes_passado = (hoje.replace(day=1) - timedelta(days=1)).replace(day=1)
+
+    conta = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Mista", "tipo": "conta_corrente", "saldo": 0.0, "cor": "#10B981", "ativa": True},
+    )
+    assert conta.status_code == 201
+    conta_id = conta.json()["id"]
+
+    for tipo, valor, data, status_liquidacao, data_liquidacao in (
+        # Liquidadas neste mes: entram no mes pela data de liquidacao.
+        ("entrada", 1000.0, hoje, "liquidado", hoje),
+        ("saida", 150.0, mes_passado, "liquidado", hoje),
+        # Liquidada no mes passado: fora do mes.
+        ("saida", 70.0, mes_passado, "liquidado", mes_passado),
+        # Pendentes deste mes: so nas pendencias, nao nas saidas/entradas do mes.
+        ("saida", 40.0, hoje, "previsto", None),
+        ("entrada", 25.0, hoje, "previsto", None),
+        ("saida", 60.0, mes_passado, "atrasado", None),
+        # Transferencia (ex.: pagamento de fatura): total proprio.
+        ("transferencia", 300.0, hoje, "liquidado", hoje),
+    ):
+        payload = {
+            "conta_id": conta_id,
+            "descricao": f"{tipo} {valor}",
+            "valor": valor,
+            "tipo": tipo,
+            "data": data.isoformat(),
+            "status_liquidacao": status_liquidacao,
+        }
+        if data_liquidacao:
+            payload["data_liquidacao"] = data_liquidacao.isoformat()
+        response = client.post("/api/v1/transacoes", headers=headers, json=payload)
+        assert response.status_code == 201
+
+    contas = client.get("/api/v1/contas", headers=headers, params={"incluir_resumo": "true"}).json()
+    resumo = next(c for c in contas if c["id"] == conta_id)["resumo"]
+    assert resumo == {
+        "entradas_mes": 1000.0,
+        "saidas_mes": 150.0,
+        "transferencias_mes": 300.0,
+        "pendente_entradas": 25.0,
+        "pendente_saidas": 100.0,
+        "ultima_movimentacao": hoje.isoformat(),
+    }
+
+
 def test_metas_crud_smoke(client):
     headers = _auth_headers(client)
     hoje = date.today().isoformat()
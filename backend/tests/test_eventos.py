@@ -0,0 +1,218 @@
+import asyncio
+import json
+import threading
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.deps import AccessContext
+from app.api.v1.endpoints.eventos import stream_eventos
+from app.models import Categoria, Delegacao, DelegacaoStatus
+from app.services import eventos
+from app.services.eventos import EVENTO_RESYNC, BackendMemoria, Broker, ConexoesEsgotadasError
+from conftest import TestingSessionLocal
+
+
+def _register_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "nome": "Usuario Teste",
+            "role": "user",
+        },
+    )
+
+
+def _login_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": password},
+    )
+
+
+def _auth_headers(client):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    register_response = _register_user(client, email)
+    assert register_response.status_code == 201
+    login_response = _login_user(client, email)
+    assert login_response.status_code == 200
+    token = login_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+class BackendGravador:
+    """Backend que so guarda as publicacoes, para conferir o que as escritas geram."""
+
+    def __init__(self):
+        self.publicados: list[tuple[int, dict]] = []
+
+    def iniciar(self, entregar) -> None:
+        pass
+
+    def publicar(self, user_id: int, evento: dict) -> None:
+        self.publicados.append((user_id, evento))
+
+    def encerrar(self) -> None:
+        pass
+
+
+@pytest.fixture
+def gravador(monkeypatch):
+    backend = BackendGravador()
+    monkeypatch.setattr(eventos, "broker", Broker(backend, tamanho_fila=8, max_conexoes=10))
+    return backend
+
+
+def test_broker_entrega_por_usuario_entre_threads():
+    async def cenario():
+        broker = Broker(BackendMemoria(), tamanho_fila=2, max_conexoes=2)
+        primeira = broker.assinar(1)
+        outra = broker.assinar(2)
+        with pytest.raises(ConexoesEsgotadasError):
+            broker.assinar(3)
+
+        # Publicacao vinda de uma thread de requisicao (sessao sincrona).
+        thread = threading.Thread(target=broker.publicar, args=(1, {"meses": ["2026-10"]}))
+        thread.start()
+        thread.join()
+        assert await primeira.proximo(1) == {"meses": ["2026-10"]}
+        assert await outra.proximo(0.05) is None
+
+        # Fila cheia: o acumulado vira um unico pedido de resync.
+        for n in range(3):
+            broker.publicar(1, {"n": n})
+        await asyncio.sleep(0)
+        assert await primeira.proximo(1) is EVENTO_RESYNC
+        assert await primeira.proximo(0.05) is None
+
+        broker.cancelar(primeira)
+        broker.cancelar(primeira)
+        assert broker.total_conexoes == 1
+        broker.publicar(1, {"depois": True})
+        await asyncio.sleep(0)
+        assert primeira.fila.empty()
+        broker.encerrar()
+
+    asyncio.run(cenario())
+
+
+def test_escritas_publicam_no_commit_e_rollback_descarta(client, gravador):
+    headers = _auth_headers(client)
+    conta = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Eventos", "tipo": "conta_corrente", "saldo": 100.0, "cor": "#10B981", "ativa": True},
+    )
+    assert conta.status_code == 201
+    user_id = conta.json()["user_id"]
+    assert gravador.publicados == [
+        (user_id, {"meses": [], "categorias": False, "cadastros": True, "alertas": False})
+    ]
+
+    categoria = client.post(
+        "/api/v1/categorias",
+        headers=headers,
+        json={"nome": "Mercado Eventos", "icone": "tag", "cor": "#123ABC", "tipo": "saida"},
+    ).json()
+    hoje = date.today()
+    orcamento = client.post(
+        "/api/v1/orcamentos",
+        headers=headers,
+        json={"categoria_id": categoria["id"], "mes": hoje.month, "ano": hoje.year, "valor_planejado": 50.0},
+    )
+    assert orcamento.status_code == 201
+    gravador.publicados.clear()
+
+    transacao = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta.json()["id"],
+            "categoria_id": categoria["id"],
+            "descricao": "Compra",
+            "valor": 45.0,
+            "tipo": "saida",
+            "data": hoje.isoformat(),
+            "status_liquidacao": "liquidado",
+            "data_liquidacao": hoje.isoformat(),
+        },
+    )
+    assert transacao.status_code == 201
+    assert gravador.publicados == [
+        (user_id, {"meses": [f"{hoje:%Y-%m}"], "categorias": False, "cadastros": True, "alertas": True})
+    ]
+
+    gravador.publicados.clear()
+    with TestingSessionLocal() as db:
+        db.add(Categoria(user_id=user_id, nome="Descartada", tipo="saida"))
+        db.flush()
+        db.rollback()
+        db.add(Categoria(user_id=user_id, nome="Confirmada", tipo="saida"))
+        db.commit()
+    assert gravador.publicados == [
+        (user_id, {"meses": [], "categorias": True, "cadastros": False, "alertas": False})
+    ]
+
+
+def test_escrita_de_delegado_notifica_o_titular(client, gravador):
+    titular = _auth_headers(client)
+    delegado = _auth_headers(client)
+    titular_id = client.get("/api/v1/auth/me", headers=titular).json()["id"]
+    delegado_me = client.get("/api/v1/auth/me", headers=delegado).json()
+    with TestingSessionLocal() as db:
+        db.add(
+            Delegacao(
+                owner_user_id=titular_id,
+                delegate_user_id=delegado_me["id"],
+                invited_email=delegado_me["email"],
+                status=DelegacaoStatus.ACTIVE,
+                can_write=True,
+            )
+        )
+        db.commit()
+    gravador.publicados.clear()
+
+    resposta = client.post(
+        "/api/v1/contas",
+        headers={**delegado, "X-Act-As-User": str(titular_id)},
+        json={"nome": "Conta Titular", "tipo": "carteira", "saldo": 0.0, "cor": "#10B981", "ativa": True},
+    )
+    assert resposta.status_code == 201
+    assert [user_id for user_id, _ in gravador.publicados] == [titular_id]
+
+
+def test_stream_envia_conectado_alteracoes_e_encerra_assinatura(monkeypatch):
+    broker = Broker(BackendMemoria(), tamanho_fila=8, max_conexoes=1)
+    monkeypatch.setattr("app.api.v1.endpoints.eventos.broker", broker)
+    usuario = SimpleNamespace(id=42)
+    contexto = AccessContext(actor_user=usuario, effective_user=usuario, delegated=False, can_write=True)
+
+    async def cenario():
+        resposta = await stream_eventos(request=None, access_ctx=contexto)
+        assert resposta.media_type == "text/event-stream"
+        assert resposta.headers["x-accel-buffering"] == "no"
+        corpo = resposta.body_iterator
+        assert await corpo.__anext__() == "retry: 5000\n\n"
+        assert "event: conectado" in await corpo.__anext__()
+
+        broker.publicar(42, {"meses": ["2026-10"], "categorias": False, "cadastros": True, "alertas": False})
+        linhas = (await corpo.__anext__()).strip().split("\n")
+        assert linhas[1] == "event: alteracao"
+        assert json.loads(linhas[2].removeprefix("data: "))["meses"] == ["2026-10"]
+
+        with pytest.raises(Exception) as excecao:
+            await stream_eventos(request=None, access_ctx=contexto)
+        assert excecao.value.status_code == 503
+
+        await corpo.aclose()
+        assert broker.total_conexoes == 0
+
+    asyncio.run(cenario())
+
+
+def test_stream_exige_autenticacao(client):
+    assert client.get("/api/v1/eventos").status_code == 401
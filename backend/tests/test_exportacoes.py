@@ -0,0 +1,95 @@
+import io
+import uuid
+import zipfile
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.services import export_colunar
+
+
+def _register_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "nome": "Usuario Teste",
+            "role": "user",
+        },
+    )
+
+
+def _login_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": password},
+    )
+
+
+def _auth_headers(client):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    register_response = _register_user(client, email)
+    assert register_response.status_code == 201
+    login_response = _login_user(client, email)
+    assert login_response.status_code == 200
+    token = login_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _criar_conta_com_transacao(client, headers, valor: float):
+    conta = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Export", "tipo": "conta_corrente", "saldo": 100.0, "cor": "#10B981", "ativa": True},
+    )
+    assert conta.status_code == 201
+    transacao = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta.json()["id"],
+            "descricao": "Compra exportada",
+            "valor": valor,
+            "tipo": "saida",
+            "data": date.today().isoformat(),
+        },
+    )
+    assert transacao.status_code == 201
+    return transacao.json()
+
+
+def test_exportacao_parquet_indisponivel_sem_pyarrow(client, monkeypatch):
+    headers = _auth_headers(client)
+    monkeypatch.setattr(export_colunar, "PYARROW_AVAILABLE", False)
+
+    response = client.get("/api/v1/exportacoes/parquet", headers=headers)
+    assert response.status_code == 501
+
+
+def test_exportacao_parquet_tipada_e_restrita_ao_usuario(client):
+    pq = pytest.importorskip("pyarrow.parquet")
+    pa = pytest.importorskip("pyarrow")
+
+    headers = _auth_headers(client)
+    transacao = _criar_conta_com_transacao(client, headers, 123.45)
+    _criar_conta_com_transacao(client, _auth_headers(client), 999.0)
+
+    response = client.get("/api/v1/exportacoes/parquet", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert set(zf.namelist()) == {f"{nome}.parquet" for nome in export_colunar.TABELAS_EXPORTACAO}
+        tabela = pq.read_table(io.BytesIO(zf.read("transacoes.parquet")))
+
+    assert tabela.schema.field("valor").type == pa.decimal128(14, 2)
+    assert tabela.schema.field("data").type == pa.date32()
+    assert pa.types.is_dictionary(tabela.schema.field("tipo").type)
+    assert "busca_normalizada" not in tabela.column_names
+
+    linhas = tabela.to_pylist()
+    assert [linha["id"] for linha in linhas] == [transacao["id"]]
+    assert linhas[0]["valor"] == Decimal("123.45")
+    assert linhas[0]["tipo"] == "saida"
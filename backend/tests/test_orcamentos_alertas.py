@@ -0,0 +1,181 @@
+import uuid
+from datetime import date
+
+from app.models import Orcamento
+from conftest import TestingSessionLocal
+
+
+def _register_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "nome": "Usuario Teste",
+            "role": "user",
+        },
+    )
+
+
+def _login_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": password},
+    )
+
+
+def _auth_headers(client):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    register_response = _register_user(client, email)
+    assert register_response.status_code == 201
+    login_response = _login_user(client, email)
+    assert login_response.status_code == 200
+    token = login_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _preparar(client, headers):
+    conta = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Alertas", "tipo": "conta_corrente", "saldo": 5000.0, "cor": "#10B981", "ativa": True},
+    )
+    assert conta.status_code == 201
+    categoria = client.post(
+        "/api/v1/categorias",
+        headers=headers,
+        json={"nome": "Mercado Alertas", "icone": "tag", "cor": "#123ABC", "tipo": "saida"},
+    )
+    assert categoria.status_code == 201
+    return conta.json()["id"], categoria.json()["id"]
+
+
+def _criar_saida(client, headers, conta_id: int, categoria_id: int, valor: float, **extra):
+    response = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta_id,
+            "categoria_id": categoria_id,
+            "descricao": "Compra",
+            "valor": valor,
+            "tipo": "saida",
+            "data": date.today().isoformat(),
+            "status_liquidacao": "previsto",
+            **extra,
+        },
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _criar_orcamento(client, headers, categoria_id: int, valor_planejado: float):
+    hoje = date.today()
+    response = client.post(
+        "/api/v1/orcamentos",
+        headers=headers,
+        json={"categoria_id": categoria_id, "mes": hoje.month, "ano": hoje.year, "valor_planejado": valor_planejado},
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def _alertas(client, headers, **params):
+    response = client.get("/api/v1/orcamentos/alertas", headers=headers, params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def _gasto_gravado(orcamento_id: int) -> float:
+    with TestingSessionLocal() as db:
+        return db.get(Orcamento, orcamento_id).valor_gasto
+
+
+def test_alertas_disparam_ao_cruzar_limiares_nas_escritas(client):
+    headers = _auth_headers(client)
+    conta_id, categoria_id = _preparar(client, headers)
+    orcamento = _criar_orcamento(client, headers, categoria_id, 1000.0)
+
+    primeira = _criar_saida(client, headers, conta_id, categoria_id, 700.0)
+    assert _alertas(client, headers)["alertas"] == []
+    assert _gasto_gravado(orcamento["id"]) == 700.0
+
+    segunda = _criar_saida(client, headers, conta_id, categoria_id, 100.0, valor_multa=5.0)
+    alertas = _alertas(client, headers)["alertas"]
+    assert [(a["limiar"], a["percentual"], a["valor_gasto"]) for a in alertas] == [(80, 80.5, 805.0)]
+    assert alertas[0]["orcamento_id"] == orcamento["id"]
+    assert alertas[0]["categoria_nome"] == "Mercado Alertas"
+
+    # Edicao que passa de 100% gera so o alerta novo.
+    editada = client.put(f"/api/v1/transacoes/{segunda['id']}", headers=headers, json={"valor": 400.0})
+    assert editada.status_code == 200
+    assert [a["limiar"] for a in _alertas(client, headers)["alertas"]] == [80, 100]
+    assert _gasto_gravado(orcamento["id"]) == 1105.0
+
+    # Cancelar baixa o gasto sem alertar; voltar acima dos limiares alerta de novo.
+    cancelada = client.put(
+        f"/api/v1/transacoes/{primeira['id']}", headers=headers, json={"status_liquidacao": "cancelado"}
+    )
+    assert cancelada.status_code == 200
+    assert _gasto_gravado(orcamento["id"]) == 405.0
+    assert len(_alertas(client, headers)["alertas"]) == 2
+
+    _criar_saida(client, headers, conta_id, categoria_id, 300.0, total_parcelas=2)
+    assert _gasto_gravado(orcamento["id"]) == 705.0
+    removida = client.delete(f"/api/v1/transacoes/{primeira['id']}", headers=headers)
+    assert removida.status_code == 204
+    _criar_saida(client, headers, conta_id, categoria_id, 400.0)
+    assert [a["limiar"] for a in _alertas(client, headers)["alertas"]] == [80, 100, 80, 100]
+
+    # O gasto mantido por variacao confere com a soma das transacoes do mes.
+    individual = client.get(f"/api/v1/orcamentos/{orcamento['id']}", headers=headers)
+    assert _gasto_gravado(orcamento["id"]) == individual.json()["valor_gasto"] == 1105.0
+
+
+def test_alertas_na_criacao_e_edicao_do_orcamento(client):
+    headers = _auth_headers(client)
+    conta_id, categoria_id = _preparar(client, headers)
+    _criar_saida(client, headers, conta_id, categoria_id, 450.0)
+
+    orcamento = _criar_orcamento(client, headers, categoria_id, 500.0)
+    assert orcamento["valor_gasto"] == 450.0
+    assert [a["limiar"] for a in _alertas(client, headers)["alertas"]] == [80]
+
+    reduzido = client.put(f"/api/v1/orcamentos/{orcamento['id']}", headers=headers, json={"valor_planejado": 400.0})
+    assert reduzido.status_code == 200
+    assert [a["limiar"] for a in _alertas(client, headers)["alertas"]] == [80, 100]
+
+    removido = client.delete(f"/api/v1/orcamentos/{orcamento['id']}", headers=headers)
+    assert removido.status_code == 204
+    assert _alertas(client, headers)["alertas"] == []
+
+
+def test_alertas_cursor_etag_e_marcar_lidos(client):
+    headers = _auth_headers(client)
+    outro = _auth_headers(client)
+    conta_id, categoria_id = _preparar(client, headers)
+    _criar_orcamento(client, headers, categoria_id, 100.0)
+    _criar_saida(client, headers, conta_id, categoria_id, 120.0)
+
+    primeira = _alertas(client, headers)
+    assert len(primeira["alertas"]) == 2
+    assert primeira["cursor"] == primeira["alertas"][-1]["id"]
+    assert _alertas(client, outro) == {"alertas": [], "cursor": 0}
+
+    seguinte = client.get("/api/v1/orcamentos/alertas", headers=headers, params={"desde": primeira["cursor"]})
+    assert seguinte.json() == {"alertas": [], "cursor": primeira["cursor"]}
+    repetida = client.get(
+        "/api/v1/orcamentos/alertas",
+        headers={**headers, "If-None-Match": seguinte.headers["ETag"]},
+        params={"desde": primeira["cursor"]},
+    )
+    assert repetida.status_code == 304
+
+    lidos = client.post(
+        "/api/v1/orcamentos/alertas/lidos", headers=headers, json={"ate_id": primeira["alertas"][0]["id"]}
+    )
+    assert lidos.status_code == 200
+    assert lidos.json() == {"atualizados": 1}
+    nao_lidos = _alertas(client, headers, apenas_nao_lidos=True)["alertas"]
+    assert [a["limiar"] for a in nao_lidos] == [100]
+    assert _alertas(client, headers, limite=1)["alertas"][0]["lido"] is True
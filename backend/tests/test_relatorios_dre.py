@@ -1,6 +1,11 @@
+import os
+import time
 import uuid
 from datetime import date
 
+from app.services.export_cache import CacheDisco, CacheMemoria
+from app.services.relatorio_jobs import GerenciadorRelatorios, gerenciador_relatorios
+
 
 def _register_user(client, email: str, password: str = "senha123"):
     return client.post(
@@ -152,3 +157,128 @@ def test_dre_mensal_export_pdf(client):
     content_disposition = response.headers.get("content-disposition", "")
     assert f'dre_mensal_{ano}_{mes:02d}.pdf' in content_disposition
     assert response.content.startswith(b"%PDF-")
+
+
+def test_dre_mensal_pdf_job_assincrono(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(gerenciador_relatorios, "diretorio", tmp_path)
+    headers = _auth_headers(client)
+    hoje = date.today()
+    mes = hoje.month
+    ano = hoje.year
+
+    enfileira = client.post(f"/api/v1/relatorios/dre-mensal/export-pdf/jobs?mes={mes}&ano={ano}", headers=headers)
+    assert enfileira.status_code == 202
+    job = enfileira.json()
+    assert job["status"] in {"pendente", "concluido"}
+    assert job["filename"] == f"dre_mensal_{ano}_{mes:02d}.pdf"
+
+    outro_usuario = _auth_headers(client)
+    assert client.get(f"/api/v1/relatorios/jobs/{job['job_id']}", headers=outro_usuario).status_code == 404
+
+    limite = time.monotonic() + 60
+    while job["status"] == "pendente" and time.monotonic() < limite:
+        time.sleep(0.2)
+        job = client.get(f"/api/v1/relatorios/jobs/{job['job_id']}", headers=headers).json()
+    assert job["status"] == "concluido"
+
+    download = client.get(f"/api/v1/relatorios/jobs/{job['job_id']}/download", headers=headers)
+    assert download.status_code == 200
+    assert "application/pdf" in download.headers.get("content-type", "")
+    assert f'dre_mensal_{ano}_{mes:02d}.pdf' in download.headers.get("content-disposition", "")
+    assert download.content.startswith(b"%PDF-")
+
+    assert client.get("/api/v1/relatorios/jobs/nao-existe", headers=headers).status_code == 404
+
+
+def _aguardar_job(gerenciador, job_id: str, user_id: int):
+    limite = time.monotonic() + 30
+    job = gerenciador.obter(job_id, user_id)
+    while job.status == "pendente" and time.monotonic() < limite:
+        time.sleep(0.1)
+        job = gerenciador.obter(job_id, user_id)
+    return job
+
+
+def test_relatorio_job_falha_do_worker_vira_erro_e_pool_e_recriado(tmp_path):
+    gerenciador = GerenciadorRelatorios(tmp_path, max_workers=1, max_pendentes=4, ttl_segundos=3600)
+    try:
+        # Render nao picklable: a falha acontece fora do processo filho.
+        nao_picklable = gerenciador.submeter(1, "a.pdf", "application/pdf", lambda: b"")
+        job = _aguardar_job(gerenciador, nao_picklable.id, 1)
+        assert job.status == "erro"
+        assert job.erro
+
+        # Worker morto no meio da renderizacao quebra o pool inteiro.
+        morto = gerenciador.submeter(1, "b.pdf", "application/pdf", os._exit, 1)
+        job = _aguardar_job(gerenciador, morto.id, 1)
+        assert job.status == "erro"
+        assert "encerrado" in job.erro
+
+        seguinte = gerenciador.submeter(1, "c.pdf", "application/pdf", bytes, b"ok")
+        job = _aguardar_job(gerenciador, seguinte.id, 1)
+        assert job.status == "concluido"
+        assert gerenciador.caminho_resultado(job).read_bytes() == b"ok"
+        limite = time.monotonic() + 5
+        while gerenciador._pendentes and time.monotonic() < limite:
+            time.sleep(0.05)
+        assert gerenciador._pendentes == 0
+    finally:
+        gerenciador.encerrar()
+
+
+def test_dre_mensal_export_cache_etag_e_versao(client):
+    headers = _auth_headers(client)
+    hoje = date.today()
+    mes = hoje.month
+    ano = hoje.year
+    url = f"/api/v1/relatorios/dre-mensal/export?mes={mes}&ano={ano}"
+
+    conta_response = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Conta Cache", "tipo": "conta_corrente", "saldo": 0.0, "cor": "#10B981", "ativa": True},
+    )
+    assert conta_response.status_code == 201
+    conta_id = conta_response.json()["id"]
+
+    primeira = client.get(url, headers=headers)
+    assert primeira.status_code == 200
+    etag = primeira.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    nao_modificado = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert nao_modificado.status_code == 304
+    assert nao_modificado.headers["etag"] == etag
+    assert nao_modificado.content == b""
+
+    cria = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta_id,
+            "descricao": "Entrada cache",
+            "valor": 250.0,
+            "tipo": "entrada",
+            "data": hoje.isoformat(),
+            "status_liquidacao": "previsto",
+        },
+    )
+    assert cria.status_code == 201
+
+    depois = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert depois.status_code == 200
+    assert depois.headers["etag"] != etag
+    assert "250.00" in depois.text
+
+
+def test_export_cache_lru_limitado_por_tamanho(tmp_path):
+    for cache in (CacheMemoria(max_bytes=10), CacheDisco(tmp_path, max_bytes=10)):
+        cache.guardar("a", b"aaaa")
+        cache.guardar("b", b"bbbb")
+        assert cache.obter("a") == b"aaaa"  # "a" passa a ser o mais recente
+        cache.guardar("c", b"cccc")
+        assert cache.obter("b") is None
+        assert cache.obter("a") == b"aaaa"
+        assert cache.obter("c") == b"cccc"
+        cache.guardar("grande", b"x" * 11)
+        assert cache.obter("grande") is None
@@ -0,0 +1,173 @@
+import uuid
+from calendar import monthrange
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.crud.crud_fatura import calcular_vencimento_fatura, fechamento_da_data
+from app.services.fluxo_caixa import ItensFluxo, projetar_saldos, repetir_mensalmente
+
+
+def _register_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "nome": "Usuario Teste",
+            "role": "user",
+        },
+    )
+
+
+def _login_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": password},
+    )
+
+
+def _auth_headers(client):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    register_response = _register_user(client, email)
+    assert register_response.status_code == 201
+    login_response = _login_user(client, email)
+    assert login_response.status_code == 200
+    token = login_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _add_months(base: date, months: int) -> date:
+    month_index = (base.month - 1) + months
+    year = base.year + (month_index // 12)
+    month = (month_index % 12) + 1
+    return date(year, month, min(base.day, monthrange(year, month)[1]))
+
+
+def _criar_transacao(client, headers, **dados):
+    payload = {"descricao": "Lancamento", "status_liquidacao": "previsto", **dados}
+    payload["data"] = payload["data"].isoformat()
+    if "data_vencimento" in payload:
+        payload["data_vencimento"] = payload["data_vencimento"].isoformat()
+    response = client.post("/api/v1/transacoes", headers=headers, json=payload)
+    assert response.status_code == 201, response.text
+
+
+def test_projecao_vetorizada_confere_com_laco():
+    rng = np.random.default_rng(7)
+    inicio = date(2026, 1, 1)
+    dias = 120
+    conta_ids = np.array([3, 8, 15], dtype=np.int64)
+    saldos_atuais = np.array([10_000, -500, 0], dtype=np.int64)
+    itens = ItensFluxo(
+        datas=np.datetime64(inicio, "D") + rng.integers(-10, dias + 10, 2_000),
+        valores=rng.integers(-50_000, 50_000, 2_000),
+        contas=rng.choice(conta_ids, 2_000),
+    )
+
+    saldos = projetar_saldos(conta_ids, saldos_atuais, itens, inicio, dias)
+
+    esperado = {int(c): [int(s)] * dias for c, s in zip(conta_ids, saldos_atuais)}
+    for data, valor, conta in zip(itens.datas.tolist(), itens.valores.tolist(), itens.contas.tolist()):
+        indice = max((data - inicio).days, 0)
+        for dia in range(indice, dias):
+            esperado[conta][dia] += valor
+    assert saldos.tolist() == [esperado[int(c)] for c in conta_ids]
+
+
+def test_repeticao_mensal_usa_ultimo_dia_em_meses_curtos():
+    series = ItensFluxo(
+        datas=np.array([date(2026, 1, 31), date(2026, 3, 10)], dtype="datetime64[D]"),
+        valores=np.array([-100, 500], dtype=np.int64),
+        contas=np.array([1, 2], dtype=np.int64),
+    )
+
+    repeticoes = repetir_mensalmente(series, date(2026, 5, 15))
+
+    pares = sorted(zip(repeticoes.datas.tolist(), repeticoes.valores.tolist(), repeticoes.contas.tolist()))
+    assert pares == [
+        (date(2026, 2, 28), -100, 1),
+        (date(2026, 3, 31), -100, 1),
+        (date(2026, 4, 10), 500, 2),
+        (date(2026, 4, 30), -100, 1),
+        (date(2026, 5, 10), 500, 2),
+    ]
+
+
+def test_fluxo_caixa_projeta_pendentes_parcelas_recorrentes_e_cartao(client):
+    headers = _auth_headers(client)
+    hoje = date.today()
+    dias = 90
+
+    conta = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={"nome": "Corrente", "tipo": "conta_corrente", "saldo": 1000.0, "cor": "#10B981", "ativa": True},
+    )
+    assert conta.status_code == 201
+    conta_id = conta.json()["id"]
+    cartao = client.post(
+        "/api/v1/contas",
+        headers=headers,
+        json={
+            "nome": "Cartao",
+            "tipo": "cartao_credito",
+            "saldo": 0,
+            "dia_fechamento": 20,
+            "dia_vencimento": 28,
+            "limite_credito": 5000,
+            "cor": "#3B82F6",
+            "ativa": True,
+        },
+    )
+    assert cartao.status_code == 201
+    cartao_id = cartao.json()["id"]
+
+    _criar_transacao(client, headers, conta_id=conta_id, tipo="entrada", valor=500.0, data=hoje + timedelta(days=10))
+    _criar_transacao(client, headers, conta_id=conta_id, tipo="saida", valor=200.0, data=hoje - timedelta(days=5))
+    _criar_transacao(
+        client, headers, conta_id=conta_id, tipo="saida", valor=100.0, data=hoje,
+        status_liquidacao="liquidado", recorrente=True, descricao="Assinatura",
+    )
+    _criar_transacao(client, headers, conta_id=conta_id, tipo="saida", valor=30.0, data=hoje, total_parcelas=3)
+    _criar_transacao(client, headers, conta_id=cartao_id, tipo="saida", valor=300.0, data=hoje)
+
+    response = client.get("/api/v1/relatorios/fluxo-caixa", headers=headers, params={"dias": dias})
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["inicio"] == hoje.isoformat()
+    assert payload["fim"] == (hoje + timedelta(days=dias - 1)).isoformat()
+
+    fim = hoje + timedelta(days=dias - 1)
+    eventos = [(hoje, 900.0), (hoje, -200.0), (hoje + timedelta(days=10), 500.0)]
+    eventos += [(_add_months(hoje, n), -30.0) for n in range(3)]
+    eventos += [(d, -100.0) for d in (_add_months(hoje, n) for n in range(1, 5)) if d <= fim]
+
+    def saldo_esperado(dia: date) -> float:
+        return round(sum(valor for data, valor in eventos if data <= dia), 2)
+
+    contas = {c["conta_id"]: c for c in payload["contas"]}
+    corrente = contas[conta_id]
+    assert len(corrente["pontos"]) == dias
+    assert corrente["saldo_atual"] == 900.0
+    for ponto in corrente["pontos"]:
+        assert ponto["saldo"] == saldo_esperado(date.fromisoformat(ponto["data"])), ponto
+    assert corrente["saldo_final"] == saldo_esperado(fim)
+    assert corrente["saldo_minimo"] == min(p["saldo"] for p in corrente["pontos"])
+
+    vencimento = calcular_vencimento_fatura(fechamento_da_data(hoje, 20), 28)
+    pontos_cartao = {p["data"]: p["saldo"] for p in contas[cartao_id]["pontos"]}
+    if vencimento <= fim:
+        assert pontos_cartao[(vencimento - timedelta(days=1)).isoformat()] == 0.0
+        assert pontos_cartao[vencimento.isoformat()] == -300.0
+
+    mensal = client.get(
+        "/api/v1/relatorios/fluxo-caixa", headers=headers, params={"dias": dias, "granularidade": "mes"}
+    )
+    assert mensal.status_code == 200
+    pontos_mensais = mensal.json()["contas"][0]["pontos"]
+    assert pontos_mensais[-1] == {"data": fim.isoformat(), "saldo": saldo_esperado(fim)}
+    assert len(pontos_mensais) == (fim.year - hoje.year) * 12 + fim.month - hoje.month + 1
+    assert mensal.json()["total"][-1]["saldo"] == round(
+        sum(c["pontos"][-1]["saldo"] for c in mensal.json()["contas"]), 2
+    )
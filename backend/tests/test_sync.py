@@ -0,0 +1,298 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from conftest import TestingSessionLocal
+
+from app.models import Conta, Meta, RegistroExcluido, Transacao
+
+
+def _register_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": email,
+            "password": password,
+            "nome": "Usuario Teste",
+            "role": "user",
+        },
+    )
+
+
+def _login_user(client, email: str, password: str = "senha123"):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": password},
+    )
+
+
+def _auth_headers(client):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    register_response = _register_user(client, email)
+    assert register_response.status_code == 201
+    login_response = _login_user(client, email)
+    assert login_response.status_code == 200
+    token = login_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _versao(client, headers) -> int:
+    response = client.get("/api/v1/sync/versao", headers=headers)
+    assert response.status_code == 200
+    return response.json()["versao"]
+
+
+def _versao_mes(client, headers, ano: int, mes: int) -> int:
+    response = client.get(f"/api/v1/sync/versao?ano={ano}&mes={mes}", headers=headers)
+    assert response.status_code == 200
+    return response.json()["versao_mes"]
+
+
+def _criar_conta(client, headers, **extra) -> int:
+    payload = {
+        "nome": "Conta Sync",
+        "tipo": "conta_corrente",
+        "saldo": 1000.0,
+        "cor": "#10B981",
+        "ativa": True,
+    }
+    payload.update(extra)
+    response = client.post("/api/v1/contas", headers=headers, json=payload)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_versao_cresce_em_cada_escrita_dos_cadastros(client):
+    headers = _auth_headers(client)
+    versao = _versao(client, headers)
+    assert versao == 0
+
+    def _apos(resposta, esperado: int):
+        nonlocal versao
+        assert resposta.status_code == esperado, resposta.text
+        nova = _versao(client, headers)
+        assert nova > versao
+        versao = nova
+        return resposta
+
+    conta_id = _criar_conta(client, headers)
+    assert _versao(client, headers) > versao
+    versao = _versao(client, headers)
+    _apos(client.put(f"/api/v1/contas/{conta_id}", headers=headers, json={"nome": "Conta Renomeada"}), 200)
+
+    categoria = _apos(
+        client.post("/api/v1/categorias", headers=headers, json={"nome": "Sync", "tipo": "saida"}),
+        201,
+    ).json()
+    _apos(client.put(f"/api/v1/categorias/{categoria['id']}", headers=headers, json={"cor": "#111111"}), 200)
+
+    meta = _apos(
+        client.post(
+            "/api/v1/metas",
+            headers=headers,
+            json={"nome": "Reserva", "valor_alvo": 500.0, "data_inicio": date.today().isoformat()},
+        ),
+        201,
+    ).json()
+    _apos(client.put(f"/api/v1/metas/{meta['id']}", headers=headers, json={"nome": "Reserva 2"}), 200)
+    _apos(client.delete(f"/api/v1/metas/{meta['id']}", headers=headers), 204)
+
+    hoje = date.today()
+    orcamento = _apos(
+        client.post(
+            "/api/v1/orcamentos",
+            headers=headers,
+            json={"categoria_id": categoria["id"], "mes": hoje.month, "ano": hoje.year, "valor_planejado": 100.0},
+        ),
+        201,
+    ).json()
+    _apos(client.delete(f"/api/v1/orcamentos/{orcamento['id']}", headers=headers), 204)
+    _apos(client.delete(f"/api/v1/categorias/{categoria['id']}", headers=headers), 204)
+    _apos(client.delete(f"/api/v1/contas/{conta_id}", headers=headers), 204)
+
+    # Escrita rejeitada nao altera a versao.
+    falha = client.put("/api/v1/contas/999999", headers=headers, json={"nome": "X"})
+    assert falha.status_code == 404
+    assert _versao(client, headers) == versao
+
+
+def test_versao_mes_acompanha_transacoes_do_mes(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+
+    assert _versao_mes(client, headers, 2026, 3) == 0
+    criada = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta_id,
+            "descricao": "Mercado",
+            "valor": 50.0,
+            "tipo": "saida",
+            "data": "2026-03-10",
+            "status_liquidacao": "previsto",
+        },
+    )
+    assert criada.status_code == 201
+    transacao_id = criada.json()["id"]
+    marco = _versao_mes(client, headers, 2026, 3)
+    abril = _versao_mes(client, headers, 2026, 4)
+    assert marco > 0
+
+    # Mover para abril altera os dois meses.
+    movida = client.put(f"/api/v1/transacoes/{transacao_id}", headers=headers, json={"data": "2026-04-02"})
+    assert movida.status_code == 200
+    assert _versao_mes(client, headers, 2026, 3) > marco
+    assert _versao_mes(client, headers, 2026, 4) > abril
+
+    # Escrita em outro mes nao altera marco.
+    marco = _versao_mes(client, headers, 2026, 3)
+    assert client.delete(f"/api/v1/transacoes/{transacao_id}", headers=headers).status_code == 204
+    assert _versao_mes(client, headers, 2026, 3) == marco
+    assert _versao_mes(client, headers, 2026, 4) > abril
+
+
+def test_pagar_fatura_incrementa_versao(client):
+    headers = _auth_headers(client)
+    conta_cartao_id = _criar_conta(
+        client,
+        headers,
+        nome="Cartao Sync",
+        tipo="cartao_credito",
+        saldo=0,
+        dia_fechamento=20,
+        dia_vencimento=28,
+        limite_credito=5000,
+    )
+    conta_pagamento_id = _criar_conta(client, headers)
+    fatura = client.get(f"/api/v1/contas/{conta_cartao_id}/fatura-atual", headers=headers).json()
+    compra = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta_cartao_id,
+            "descricao": "Compra",
+            "valor": 40.0,
+            "tipo": "saida",
+            "data": fatura["periodo_inicio"],
+            "status_liquidacao": "previsto",
+        },
+    )
+    assert compra.status_code == 201
+
+    data_compra = date.fromisoformat(fatura["periodo_inicio"])
+    versao = _versao(client, headers)
+    versao_mes = _versao_mes(client, headers, data_compra.year, data_compra.month)
+    pagar = client.post(
+        f"/api/v1/contas/{conta_cartao_id}/pagar-fatura",
+        headers=headers,
+        json={"conta_pagamento_id": conta_pagamento_id},
+    )
+    assert pagar.status_code == 200
+    assert _versao(client, headers) > versao
+    assert _versao_mes(client, headers, data_compra.year, data_compra.month) > versao_mes
+
+
+def test_versao_exige_mes_e_ano_juntos_e_e_por_usuario(client):
+    headers_a = _auth_headers(client)
+    headers_b = _auth_headers(client)
+
+    assert client.get("/api/v1/sync/versao?mes=3", headers=headers_a).status_code == 400
+
+    _criar_conta(client, headers_a)
+    assert _versao(client, headers_a) > 0
+    assert _versao(client, headers_b) == 0
+    response = client.get("/api/v1/sync/versao", headers=headers_b)
+    assert response.headers["cache-control"] == "no-store"
+
+
+def _envelhecer_registros(user_id: int, horas: int = 2):
+    # Simula dados gravados antes do cursor (updated_at tem precisao de segundos no SQLite).
+    antigo = datetime.now(timezone.utc) - timedelta(hours=horas)
+    db = TestingSessionLocal()
+    try:
+        for modelo in (Conta, Meta, Transacao):
+            db.query(modelo).filter(modelo.user_id == user_id).update(
+                {modelo.updated_at: antigo}, synchronize_session=False
+            )
+        db.query(RegistroExcluido).filter(RegistroExcluido.user_id == user_id).update(
+            {RegistroExcluido.excluido_em: antigo}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_sync_retorna_retrato_completo_e_depois_apenas_alteracoes(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+    conta_extra_id = _criar_conta(client, headers, nome="Conta Extra")
+    meta = client.post(
+        "/api/v1/metas",
+        headers=headers,
+        json={"nome": "Viagem", "valor_alvo": 800.0, "data_inicio": date.today().isoformat()},
+    ).json()
+    transacao = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta_id,
+            "descricao": "Aluguel",
+            "valor": 900.0,
+            "tipo": "saida",
+            "data": date.today().isoformat(),
+            "status_liquidacao": "previsto",
+        },
+    ).json()
+
+    completo = client.get("/api/v1/sync", headers=headers)
+    assert completo.status_code == 200
+    payload = completo.json()
+    assert payload["completo"] is True
+    assert {c["id"] for c in payload["contas"]} == {conta_id, conta_extra_id}
+    assert [m["id"] for m in payload["metas"]] == [meta["id"]]
+    assert [t["id"] for t in payload["transacoes"]] == [transacao["id"]]
+    assert payload["cursor"].endswith("Z")
+
+    _envelhecer_registros(payload["contas"][0]["user_id"])
+    cursor = (datetime.fromisoformat(payload["cursor"]) - timedelta(minutes=1)).isoformat().replace("+00:00", "Z")
+
+    sem_mudancas = client.get("/api/v1/sync", headers=headers, params={"since": cursor}).json()
+    assert sem_mudancas["completo"] is False
+    assert sem_mudancas["contas"] == []
+    assert sem_mudancas["transacoes"] == []
+
+    assert client.put(f"/api/v1/contas/{conta_extra_id}", headers=headers, json={"nome": "Renomeada"}).status_code == 200
+    assert client.delete(f"/api/v1/metas/{meta['id']}", headers=headers).status_code == 204
+    assert client.delete(f"/api/v1/transacoes/{transacao['id']}", headers=headers).status_code == 204
+
+    delta = client.get("/api/v1/sync", headers=headers, params={"since": cursor}).json()
+    assert delta["completo"] is False
+    # A transacao prevista excluida nao mexe no saldo: so a conta renomeada volta.
+    assert [c["id"] for c in delta["contas"]] == [conta_extra_id]
+    assert delta["metas"] == []
+    assert delta["excluidos"]["metas"] == [meta["id"]]
+    assert delta["excluidos"]["transacoes"] == [transacao["id"]]
+    assert delta["excluidos"]["contas"] == []
+
+
+def test_sync_cursor_invalido_ou_antigo(client):
+    headers = _auth_headers(client)
+    _criar_conta(client, headers)
+
+    assert client.get("/api/v1/sync", headers=headers, params={"since": "ontem"}).status_code == 400
+
+    antigo = client.get("/api/v1/sync", headers=headers, params={"since": "2000-01-01T00:00:00Z"})
+    assert antigo.status_code == 200
+    assert antigo.json()["completo"] is True
+    assert len(antigo.json()["contas"]) == 1
+
+
+def test_sync_nao_expoe_exclusoes_de_outro_usuario(client):
+    headers_a = _auth_headers(client)
+    headers_b = _auth_headers(client)
+    conta_id = _criar_conta(client, headers_a)
+    assert client.delete(f"/api/v1/contas/{conta_id}", headers=headers_a).status_code == 204
+
+    desde = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat().replace("+00:00", "Z")
+    assert client.get("/api/v1/sync", headers=headers_a, params={"since": desde}).json()["excluidos"]["contas"] == [conta_id]
+    assert client.get("/api/v1/sync", headers=headers_b, params={"since": desde}).json()["excluidos"]["contas"] == []
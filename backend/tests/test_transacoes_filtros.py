@@ -1,6 +1,15 @@
+import csv
+import io
 import uuid
 from datetime import date
 
+import pytest
+from conftest import TestingSessionLocal
+
+from app.core import json_rapido
+from app.crud import crud_transacao
+from app.schemas.transacao import TransacaoResponse
+
 
 def _register_user(client, email: str, password: str = "senha123"):
     return client.post(
@@ -191,3 +200,251 @@ def test_filtro_valor_ref_invalido_retorna_400(client):
     response = client.get("/api/v1/transacoes?valor_modo=gte&valor_ref=abc", headers=headers)
     assert response.status_code == 400
     assert "valor_ref invalido" in response.json()["detail"]
+
+
+def test_filtro_busca_ignora_acentos_e_cobre_observacoes_e_tags(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+    hoje = date.today().isoformat()
+
+    cafe = _criar_transacao(client, headers, conta_id, "Café da manhã", 20.0, hoje)
+    _criar_transacao(client, headers, conta_id, "Mercado", 200.0, hoje)
+    com_tag = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta_id,
+            "descricao": "Padaria",
+            "valor": 15.0,
+            "tipo": "saida",
+            "data": hoje,
+            "observacoes": "Pão e café",
+            "tags": "Lanche",
+        },
+    )
+    assert com_tag.status_code == 201
+
+    response = client.get("/api/v1/transacoes?busca=CAFE", headers=headers)
+    assert response.status_code == 200
+    ids = {item["id"] for item in response.json()}
+    assert ids == {cafe["id"], com_tag.json()["id"]}
+
+    response_tag = client.get("/api/v1/transacoes?busca=lanche", headers=headers)
+    assert {item["id"] for item in response_tag.json()} == {com_tag.json()["id"]}
+
+
+def test_busca_ranqueada_por_relevancia(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+    hoje = date.today().isoformat()
+
+    exata = _criar_transacao(client, headers, conta_id, "Farmácia", 30.0, hoje)
+    parcial = _criar_transacao(client, headers, conta_id, "Farmácia do bairro compra de remédios variados", 40.0, hoje)
+    _criar_transacao(client, headers, conta_id, "Academia", 90.0, hoje)
+
+    response = client.get("/api/v1/transacoes/busca?q=farmacia", headers=headers)
+    assert response.status_code == 200
+    ids = [item["id"] for item in response.json()]
+    assert ids == [exata["id"], parcial["id"]]
+
+    curto = client.get("/api/v1/transacoes/busca?q=ac", headers=headers)
+    assert curto.status_code == 200
+    assert {item["id"] for item in curto.json()} >= {exata["id"], parcial["id"]}
+
+
+def test_filtro_tag_e_relatorio_por_tag(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+    hoje = date.today()
+
+    def _criar_com_tags(descricao: str, valor: float, tags: str | None):
+        payload = {
+            "conta_id": conta_id,
+            "descricao": descricao,
+            "valor": valor,
+            "tipo": "saida",
+            "data": hoje.isoformat(),
+        }
+        if tags is not None:
+            payload["tags"] = tags
+        response = client.post("/api/v1/transacoes", headers=headers, json=payload)
+        assert response.status_code == 201
+        return response.json()
+
+    viagem_1 = _criar_com_tags("Hotel", 300.0, "Viagem, Férias")
+    viagem_2 = _criar_com_tags("Passagem", 700.0, "viagem")
+    sem_tag = _criar_com_tags("Mercado", 50.0, None)
+
+    response = client.get("/api/v1/transacoes?tag=VIAGEM", headers=headers)
+    assert response.status_code == 200
+    assert {item["id"] for item in response.json()} == {viagem_1["id"], viagem_2["id"]}
+
+    relatorio = client.get(f"/api/v1/relatorios/tags?mes={hoje.month}&ano={hoje.year}", headers=headers)
+    assert relatorio.status_code == 200
+    assert relatorio.json() == [
+        {"tag": "viagem", "quantidade": 2, "valor_total": 1000.0},
+        {"tag": "ferias", "quantidade": 1, "valor_total": 300.0},
+    ]
+
+    atualiza = client.put(f"/api/v1/transacoes/{sem_tag['id']}", headers=headers, json={"tags": "viagem"})
+    assert atualiza.status_code == 200
+    remove = client.put(f"/api/v1/transacoes/{viagem_1['id']}", headers=headers, json={"tags": "ferias"})
+    assert remove.status_code == 200
+
+    response = client.get("/api/v1/transacoes?tag=viagem", headers=headers)
+    assert {item["id"] for item in response.json()} == {viagem_2["id"], sem_tag["id"]}
+
+
+def test_filtro_com_varias_tags_exige_todas(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+    hoje = date.today()
+
+    ids = {}
+    for descricao, tags in (("Hotel", "viagem, ferias"), ("Passagem", "viagem"), ("Museu", "ferias")):
+        response = client.post(
+            "/api/v1/transacoes",
+            headers=headers,
+            json={
+                "conta_id": conta_id,
+                "descricao": descricao,
+                "valor": 10.0,
+                "tipo": "saida",
+                "data": hoje.isoformat(),
+                "tags": tags,
+            },
+        )
+        assert response.status_code == 201
+        ids[descricao] = response.json()["id"]
+
+    repetidas = client.get("/api/v1/transacoes?tag=viagem&tag=Férias", headers=headers)
+    assert repetidas.status_code == 200
+    assert [item["id"] for item in repetidas.json()] == [ids["Hotel"]]
+
+    separadas = client.get("/api/v1/transacoes?tag=viagem,ferias", headers=headers)
+    assert [item["id"] for item in separadas.json()] == [ids["Hotel"]]
+
+    sem_resultado = client.get("/api/v1/transacoes?tag=viagem&tag=trabalho", headers=headers)
+    assert sem_resultado.json() == []
+
+    export = client.get("/api/v1/transacoes/export.csv?tag=viagem&tag=ferias", headers=headers)
+    assert export.status_code == 200
+    assert "Hotel" in export.text
+    assert "Passagem" not in export.text and "Museu" not in export.text
+
+
+def test_export_csv_aplica_filtros_da_listagem(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+    categoria_id = _criar_categoria(client, headers, "Mercado")
+    hoje = date.today().isoformat()
+
+    saida = _criar_transacao(client, headers, conta_id, "Compra; mercado", 120.5, hoje, categoria_id=categoria_id)
+    _criar_transacao(client, headers, conta_id, "Salario", 3000.0, hoje, tipo="entrada")
+
+    response = client.get("/api/v1/transacoes/export.csv?tipo=saida", headers=headers)
+    assert response.status_code == 200
+    assert "text/csv" in response.headers.get("content-type", "")
+    assert 'filename="transacoes.csv"' in response.headers.get("content-disposition", "")
+
+    linhas = list(csv.reader(io.StringIO(response.text), delimiter=";"))
+    assert linhas[0][:4] == ["id", "data", "descricao", "tipo"]
+    assert len(linhas) == 2
+    registro = dict(zip(linhas[0], linhas[1]))
+    assert registro["id"] == str(saida["id"])
+    assert registro["descricao"] == "Compra; mercado"
+    assert registro["categoria"] == "Mercado"
+    assert registro["conta"] == "Conta Teste"
+    assert registro["valor_efetivo"] == "120.50"
+
+    todas = client.get("/api/v1/transacoes/export.csv", headers=headers)
+    assert len(list(csv.reader(io.StringIO(todas.text), delimiter=";"))) == 3
+
+    invalido = client.get("/api/v1/transacoes/export.csv?valor_modo=igual&valor_ref=abc", headers=headers)
+    assert invalido.status_code == 400
+
+
+@pytest.mark.parametrize("usar_orjson", [True, False])
+def test_listagem_rapida_igual_a_resposta_pydantic(client, monkeypatch, usar_orjson):
+    if usar_orjson:
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(json_rapido, "ORJSON_AVAILABLE", usar_orjson)
+
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+    categoria_id = _criar_categoria(client, headers, "Casa")
+    _criar_transacao(client, headers, conta_id, "Aluguel", 1500.0, "2020-01-10", categoria_id=categoria_id)
+    _criar_transacao(client, headers, conta_id, "Salário", 3000.0, date.today().isoformat(), tipo="entrada")
+    parcelada = client.post(
+        "/api/v1/transacoes",
+        headers=headers,
+        json={
+            "conta_id": conta_id,
+            "descricao": "Sofá",
+            "valor": 400.0,
+            "tipo": "saida",
+            "data": date.today().isoformat(),
+            "data_vencimento": "2020-01-15",
+            "total_parcelas": 2,
+            "tags": "casa",
+        },
+    )
+    assert parcelada.status_code == 201
+
+    response = client.get("/api/v1/transacoes", headers=headers)
+    assert response.status_code == 200
+
+    db = TestingSessionLocal()
+    try:
+        user_id = response.json()[0]["user_id"]
+        esperado = [
+            TransacaoResponse.model_validate(t).model_dump(mode="json")
+            for t in crud_transacao.get_transacoes(db, user_id)
+        ]
+    finally:
+        db.close()
+    assert response.json() == esperado
+    assert any(item["status_liquidacao"] == "atrasado" for item in esperado)
+
+
+def test_listagem_com_fields_retorna_apenas_campos_pedidos(client):
+    headers = _auth_headers(client)
+    conta_id = _criar_conta(client, headers)
+    categoria_id = _criar_categoria(client, headers, "Lazer")
+    criada = _criar_transacao(
+        client, headers, conta_id, "Cinema", 45.0, date.today().isoformat(), categoria_id=categoria_id
+    )
+
+    response = client.get(
+        "/api/v1/transacoes?fields=data,descricao,valor,categoria_id,status_liquidacao&tipo=saida",
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "id": criada["id"],
+            "data": criada["data"],
+            "descricao": "Cinema",
+            "valor": 45.0,
+            "categoria_id": categoria_id,
+            "status_liquidacao": "previsto",
+        }
+    ]
+
+    invalido = client.get("/api/v1/transacoes?fields=descricao,senha", headers=headers)
+    assert invalido.status_code == 422
+    assert "senha" in invalido.json()["detail"]
+
+
+def test_openapi_da_listagem_documenta_resposta_completa_e_projecao(client):
+    schema = client.get("/openapi.json").json()
+    resposta = schema["paths"]["/api/v1/transacoes"]["get"]["responses"]
+    variantes = resposta["200"]["content"]["application/json"]["schema"]["anyOf"]
+    assert [v["items"]["$ref"].rsplit("/", 1)[-1] for v in variantes] == [
+        "TransacaoResponse",
+        "TransacaoParcialResponse",
+    ]
+    assert "422" in resposta
+    parcial = schema["components"]["schemas"]["TransacaoParcialResponse"]
+    assert parcial["required"] == ["id"]
+    assert set(parcial["properties"]) == set(schema["components"]["schemas"]["TransacaoResponse"]["properties"])
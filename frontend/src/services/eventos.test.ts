@@ -0,0 +1,30 @@
+import { describe, expect, it } from 'vitest'
+import { afetaCadastros, extrairEventos } from './eventos'
+
+describe('extrairEventos', () => {
+  it('separa eventos completos e guarda o bloco incompleto', () => {
+    const { eventos, resto } = extrairEventos(
+      'retry: 5000\n\nid: 1\nevent: conectado\ndata: {}\n\n: ping\n\nid: 2\nevent: alteracao\ndata: {"meses"'
+    )
+
+    expect(eventos).toEqual([{ evento: 'conectado', dados: '{}' }])
+    expect(resto).toBe('id: 2\nevent: alteracao\ndata: {"meses"')
+
+    const seguinte = extrairEventos(resto + ':["2026-10"]}\r\n\r\n')
+    expect(seguinte.eventos).toEqual([{ evento: 'alteracao', dados: '{"meses":["2026-10"]}' }])
+    expect(seguinte.resto).toBe('')
+  })
+})
+
+describe('afetaCadastros', () => {
+  it('recarrega em reconexao, resync e alteracoes de cadastros ou transacoes', () => {
+    const alteracao = { meses: [], categorias: true, cadastros: false, alertas: false }
+
+    expect(afetaCadastros({ tipo: 'conectado', reconexao: false })).toBe(false)
+    expect(afetaCadastros({ tipo: 'conectado', reconexao: true })).toBe(true)
+    expect(afetaCadastros({ tipo: 'resync' })).toBe(true)
+    expect(afetaCadastros({ tipo: 'alteracao', dados: alteracao })).toBe(false)
+    expect(afetaCadastros({ tipo: 'alteracao', dados: { ...alteracao, meses: ['2026-10'] } })).toBe(true)
+    expect(afetaCadastros({ tipo: 'alteracao', dados: { ...alteracao, meses: null } })).toBe(true)
+  })
+})
@@ -0,0 +1,96 @@
+// Cliente do stream de alteracoes (GET /eventos, text/event-stream).
+// Usa fetch em vez de EventSource para mandar Authorization e X-Act-As-User.
+
+const API_URL = import.meta.env.VITE_API_URL || '/api/v1'
+const ESPERA_RECONEXAO_MS = 5000
+
+export interface AlteracaoDados {
+  meses: string[] | null
+  categorias: boolean
+  cadastros: boolean
+  alertas: boolean
+}
+
+export type EventoDados =
+  | { tipo: 'conectado'; reconexao: boolean }
+  | { tipo: 'alteracao'; dados: AlteracaoDados }
+  | { tipo: 'resync' }
+
+export interface EventoBruto {
+  evento: string
+  dados: string
+}
+
+// Separa os eventos completos do buffer; o resto fica para o proximo bloco.
+export function extrairEventos(buffer: string): { eventos: EventoBruto[]; resto: string } {
+  const blocos = buffer.replace(/\r\n/g, '\n').split('\n\n')
+  const resto = blocos.pop() ?? ''
+  const eventos: EventoBruto[] = []
+  for (const bloco of blocos) {
+    let evento = 'message'
+    const dados: string[] = []
+    for (const linha of bloco.split('\n')) {
+      if (linha.startsWith('event:')) evento = linha.slice(6).trim()
+      else if (linha.startsWith('data:')) dados.push(linha.slice(5).trim())
+    }
+    if (dados.length) eventos.push({ evento, dados: dados.join('\n') })
+  }
+  return { eventos, resto }
+}
+
+export function assinarEventos(aoReceber: (evento: EventoDados) => void): () => void {
+  const controle = new AbortController()
+  let conectouAntes = false
+
+  async function conectar(): Promise<void> {
+    const headers: Record<string, string> = { Accept: 'text/event-stream' }
+    const token = localStorage.getItem('access_token')
+    if (token) headers.Authorization = `Bearer ${token}`
+    const actAsUser = localStorage.getItem('act_as_user_id')
+    if (actAsUser) headers['X-Act-As-User'] = actAsUser
+
+    const resposta = await fetch(`${API_URL}/eventos`, { headers, signal: controle.signal })
+    if (!resposta.ok || !resposta.body) throw new Error(`Eventos indisponiveis (${resposta.status})`)
+
+    const leitor = resposta.body.pipeThrough(new TextDecoderStream()).getReader()
+    let buffer = ''
+    for (;;) {
+      const { value, done } = await leitor.read()
+      if (done) return
+      const { eventos, resto } = extrairEventos(buffer + value)
+      buffer = resto
+      for (const { evento, dados } of eventos) {
+        if (evento === 'conectado') {
+          aoReceber({ tipo: 'conectado', reconexao: conectouAntes })
+          conectouAntes = true
+        } else if (evento === 'alteracao') {
+          aoReceber({ tipo: 'alteracao', dados: JSON.parse(dados) })
+        } else if (evento === 'resync') {
+          aoReceber({ tipo: 'resync' })
+        }
+      }
+    }
+  }
+
+  async function manter(): Promise<void> {
+    while (!controle.signal.aborted) {
+      try {
+        await conectar()
+      } catch {
+        // Queda, timeout do proxy ou 503: tenta de novo depois da espera.
+      }
+      if (controle.signal.aborted) return
+      await new Promise((resolve) => setTimeout(resolve, ESPERA_RECONEXAO_MS))
+    }
+  }
+
+  manter()
+  return () => controle.abort()
+}
+
+// Evento que pede recarregar os cadastros (contas, metas, orcamentos) ou tudo.
+export function afetaCadastros(evento: EventoDados): boolean {
+  if (evento.tipo === 'conectado') return evento.reconexao
+  if (evento.tipo === 'resync') return true
+  return evento.dados.cadastros || evento.dados.meses === null || evento.dados.meses.length > 0
+}
@@ -27,6 +27,28 @@ export interface Conta {
   limite_credito?: number | null
   cor: string
   ativa: boolean
+  resumo?: ContaResumo | null
+}
+
+export interface ContaResumo {
+  entradas_mes: number
+  saidas_mes: number
+  transferencias_mes: number
+  pendente_entradas: number
+  pendente_saidas: number
+  ultima_movimentacao: string | null
+}
+
+export interface CartaoResumo {
+  conta_id: number
+  conta_nome: string
+  limite_credito: number | null
+  faturas_fechadas: number
+  fatura_aberta: number
+  faturas_futuras: number
+  limite_utilizado: number
+  limite_disponivel: number | null
+  percentual_utilizado: number | null
 }
 
 export interface Categoria {
@@ -117,6 +139,24 @@ export interface FaturaResumo {
   valor_total: number
   itens: FaturaItem[]
 }
+
+export interface FaturaPaga {
+  conta_id: number
+  conta_nome: string
+  periodo_inicio: string
+  periodo_fim: string
+  data_vencimento_fatura: string
+  itens_pagos: number
+  valor_pago: number
+  itens: FaturaItem[]
+}
+
+export interface PagamentoFaturas {
+  conta_pagamento_id: number
+  saldo_conta_pagamento: number
+  valor_total_pago: number
+  pagamentos: FaturaPaga[]
+}
 export interface ApiError {
   detail: string | { loc: string[]; msg: string; type: string }[]
 }